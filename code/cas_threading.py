@@ -0,0 +1,102 @@
+import argparse
+import glob
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from sas_steps import StepGrouper
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+THREAD_SAFE = 'thread-safe'
+BY_PARTITIONABLE = 'by-partitionable'
+SINGLE_THREADED = 'single-threaded'
+
+# (construct, pattern, resolved by BY-group partitioning): order-dependent constructs in a DATA step
+ORDER_CONSTRUCTS: List[Tuple[str, re.Pattern, bool]] = [
+    ('RETAIN', re.compile(r'^\s*retain\b', re.IGNORECASE), True),
+    ('sum statement', re.compile(r'^\s*[A-Za-z_]\w*\s*\+\s*[^=;]+;?\s*$'), True),
+    ('LAG/DIF', re.compile(r'\b(?:lag|dif)\d*\s*\(', re.IGNORECASE), True),
+    ('FIRST./LAST.', re.compile(r'\b(?:first|last)\.\w+', re.IGNORECASE), True),
+    ('_N_', re.compile(r'\b_n_\b', re.IGNORECASE), False),
+    ('INFILE/INPUT', re.compile(r'^\s*(?:infile|input)\b', re.IGNORECASE), False),
+    ('FILE', re.compile(r'^\s*file\b', re.IGNORECASE), False),
+    ('inline data', re.compile(r'^\s*(?:datalines|cards|lines)4?\b', re.IGNORECASE), False),
+    ('POINT=/NOBS=/KEY=', re.compile(r'^\s*(?:set|modify)\b.*\b(?:point|nobs|key)\s*=', re.IGNORECASE | re.DOTALL), False),
+    ('END=', re.compile(r'^\s*(?:set|merge|update|modify)\b.*\bend\s*=', re.IGNORECASE | re.DOTALL), False),
+    ('MODIFY', re.compile(r'^\s*modify\b', re.IGNORECASE), False),
+    ('STOP', re.compile(r'^\s*stop\s*;', re.IGNORECASE), False),
+    ('CALL SYMPUT', re.compile(r'\bcall\s+symputx?\s*\(', re.IGNORECASE), False),
+]
+
+
+def classify_step(step: Dict) -> Dict:
+    """Threading label of one DATA step and the constructs behind it."""
+    has_by = bool(step['by'])
+    blockers, by_resolved = [], []
+    for stmt, line in step['statements']:
+        if re.match(r'^\s*(data|run)\b', stmt, re.IGNORECASE):
+            continue
+        for construct, pattern, needs_by in ORDER_CONSTRUCTS:
+            if pattern.search(stmt):
+                target = by_resolved if needs_by and has_by else blockers
+                target.append(f"{construct}@{line}")
+    merges = [ref for ref in step['inputs'] if ref['role'] in ('merge', 'update')]
+    if merges and not has_by:
+        blockers.append(f"MERGE without BY@{merges[0]['line']}")
+
+    if blockers:
+        label = SINGLE_THREADED
+    elif by_resolved or (merges and has_by):
+        label = BY_PARTITIONABLE
+    else:
+        label = THREAD_SAFE
+    return {
+        'file': step['file'],
+        'line_number': step['start_line'],
+        'outputs': ', '.join(ref['table'] for ref in step['outputs']) or '_null_',
+        'inputs': ', '.join(dict.fromkeys(ref['table'] for ref in step['inputs'])),
+        'by': ' '.join(name for name, _ in step['by']),
+        'label': label,
+        'blockers': ', '.join(dict.fromkeys(blockers)),
+        'by_group_constructs': ', '.join(dict.fromkeys(by_resolved)),
+    }
+
+
+def classify(pattern: str) -> pd.DataFrame:
+    grouper = StepGrouper()
+    rows = []
+    for sas_file in glob.glob(pattern, recursive=True):
+        try:
+            rows.extend(classify_step(step) for step in grouper.file_steps(sas_file) if step['kind'] == 'DATA')
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    return pd.DataFrame(rows)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Classify DATA steps by how they can run on CAS worker threads")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--output', default='cas_threading.xlsx')
+    args = parser.parse_args(argv)
+
+    df = classify(args.pattern)
+    if df.empty:
+        print("No DATA steps found")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== CAS THREADING READINESS ===")
+    print(df['label'].value_counts().to_string())
+    blockers = df['blockers'].str.split(', ').explode().str.replace(r'@\d+$', '', regex=True)
+    print("\nMost common blockers:")
+    print(blockers[blockers != ''].value_counts().head(10).to_string())
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
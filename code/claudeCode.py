@@ -1,10 +1,15 @@
 import re
 import pandas as pd
 import glob
+import hashlib
 import os
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+# The PROC SQL parser is shared with the extractor project
+import extractor_path  # noqa: F401
+from sql_parser import parse_sql, walk
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -86,10 +91,10 @@ class SASAnalyzer:
             r'\b(set|merge)\s+(.*?)(?=\s+(?:by|if|where|end)\b|;)',
             re.IGNORECASE | re.DOTALL
         )
-        # 10. SQL FROM clause
-        self.from_pattern = re.compile(
-            r'\bfrom\s+(.*?)(?=\s+(?:where|group|having|order)\b|;|\s*$)',
-            re.IGNORECASE | re.DOTALL
+        # 10. SQL statements; their tables come from sql_parser
+        self.sql_statement_pattern = re.compile(
+            r'^\s*(?:select|create|insert)\b',
+            re.IGNORECASE
         )
         
         # 11. DATA statement
@@ -98,17 +103,17 @@ class SASAnalyzer:
             re.IGNORECASE
         )
         
-        # 12. CREATE TABLE statement
-        self.create_table_pattern = re.compile(
-            r'\bcreate\s+table\s+([a-zA-Z_]\w*(?:\.[a-zA-Z_]\w*)?)',
-            re.IGNORECASE
-        )
-        
-        # 13. PROC EXPORT
+        # 12. PROC EXPORT
         self.proc_export_pattern = re.compile(
             r'\bproc\s+export\b[^;]*\bdata\s*=\s*([a-zA-Z_]\w*(?:\.[a-zA-Z_]\w*)?)(?:\([^)]*\))?',
             re.IGNORECASE
         )
+
+        # 13. PROC APPEND BASE= (appends to an existing table)
+        self.proc_append_pattern = re.compile(
+            r'\bproc\s+append\b[^;]*\bbase\s*=\s*([a-zA-Z_]\w*(?:\.[a-zA-Z_]\w*)?)',
+            re.IGNORECASE
+        )
         
         # 14. Additional patterns
         self.include_pattern = re.compile(
@@ -179,7 +184,7 @@ class SASAnalyzer:
         return ''.join(result)
     
     KEYWORDS = [
-    r'%let\b', r'%macro\b', r'%mend\b', r'libname\b', r'proc\b', r'data\b',
+    r'%let\b', r'%macro\b', r'%mend\b', r'libname\b', r'proc\b', r'data\b(?!\s*=)',
     r'set\b', r'merge\b', r'%include\b', r'filename\b', r'create\s+table\b', r'connect\s+to\b'
     ]
     KEYWORD_RE = re.compile(r'^\s*(' + '|'.join(KEYWORDS) + r')', re.IGNORECASE)
@@ -201,15 +206,20 @@ class SASAnalyzer:
         paren_count = 0
         in_single_quote = False
         in_double_quote = False
-        line_number = 1
-        stmt_start_line = 1
-        prev_stmt_keyword = None
+        stmt_start_line = None
     
         lines = sas_text.splitlines()
     
         for i, line in enumerate(lines):
             stripped = line.strip()
-            lowered = stripped.lower()
+            if stmt_start_line is None and stripped:
+                stmt_start_line = i + 1
+            # Inside quotes or parentheses the line continues the current statement
+            continuing = in_single_quote or in_double_quote or paren_count > 0
+            line_start = len(current)
+            if current:
+                # Line breaks separate words just like spaces do
+                current.append(' ')
     
             # Track quotes and parens across lines
             for char in line:
@@ -231,29 +241,25 @@ class SASAnalyzer:
                     stmt = part.strip() + ';'
                     if stmt:
                         statements.append((stmt, stmt_start_line))
-                # Start building the next statement
-                current = [parts[-1]]
-                stmt_start_line = i + 1
+                # Start building the next statement; it starts on this line only
+                # if text follows the last semicolon
+                current = [parts[-1]] if parts[-1].strip() else []
+                stmt_start_line = i + 1 if current else None
                 continue
     
-            # Fallback: keyword on new line while previous has no semicolon
-            if (self.KEYWORD_RE.match(stripped)
-                    and current
-                    and not ''.join(current).strip().endswith(';')):
-                # Consider what's already in buffer as one statement
-                stmt = ''.join(current).strip()
-                if stmt:
-                    statements.append((stmt, stmt_start_line))
-                current = []
-                current.append(line)
-                stmt_start_line = i + 1
-            elif i == len(lines) - 1:
+            # Fallback: keyword on new line while previous has no semicolon.
+            # Only the buffer from before this line is a statement of its own.
+            if self.KEYWORD_RE.match(stripped) and not continuing:
+                previous = ''.join(current[:line_start]).strip()
+                if previous:
+                    statements.append((previous, stmt_start_line))
+                    current = current[line_start + 1:]
+                    stmt_start_line = i + 1
+            if i == len(lines) - 1:
                 # End of file
                 stmt = ''.join(current).strip()
                 if stmt:
                     statements.append((stmt, stmt_start_line))
-    
-            line_number += 1
         
         return statements
 
@@ -275,6 +281,9 @@ class SASAnalyzer:
 
         for match in pattern.finditer(stmt_cleaned):
             if table_type in ['SET', 'MERGE']:
+                # set_merge_pattern matches both keywords; keep only the requested one
+                if match.group(1).upper() != table_type:
+                    continue
                 raw_datasets = match.group(2)
             else:
                 raw_datasets = match.group(1)
@@ -328,6 +337,24 @@ class SASAnalyzer:
 
         return tables
 
+    def extract_sql_tables(self, stmt: str) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Input (FROM/JOIN, subqueries included) and output (CREATE TABLE, INSERT INTO)
+        tables of one PROC SQL statement, from the query tree built by sql_parser.
+        """
+        if not self.sql_statement_pattern.match(stmt):
+            return [], []
+        inputs, outputs = [], []
+        for query in parse_sql(stmt):
+            for node in walk(query):
+                inputs.extend({'type': 'FROM', 'table': source['table'], 'line_number': None}
+                              for source in node['sources'] if source['table'])
+            table_type = {'create table': 'CREATE_TABLE', 'insert': 'INSERT_INTO'}.get(query['statement'])
+            if table_type:
+                outputs.extend({'type': table_type, 'table': target, 'line_number': None}
+                               for target in query['targets'])
+        return inputs, outputs
+
     def extract_macro_calls(self, stmt: str) -> List[Dict]:
         """
         Extract both function-style and statement-style macro calls.
@@ -509,7 +536,8 @@ class SASAnalyzer:
         input_tables = []
         input_tables.extend(self.extract_datasets(stmt, self.set_merge_pattern, 'SET'))
         input_tables.extend(self.extract_datasets(stmt, self.set_merge_pattern, 'MERGE'))
-        input_tables.extend(self.extract_datasets(stmt, self.from_pattern, 'FROM'))
+        sql_inputs, sql_outputs = self.extract_sql_tables(stmt)
+        input_tables.extend(sql_inputs)
         
         for table in input_tables:
             table['line_number'] = stmt_line
@@ -518,8 +546,9 @@ class SASAnalyzer:
         # 9. Output tables
         output_tables = []
         output_tables.extend(self.extract_datasets(stmt, self.data_pattern, 'DATA'))
-        output_tables.extend(self.extract_datasets(stmt, self.create_table_pattern, 'CREATE_TABLE'))
         output_tables.extend(self.extract_datasets(stmt, self.proc_export_pattern, 'PROC_EXPORT'))
+        output_tables.extend(self.extract_datasets(stmt, self.proc_append_pattern, 'PROC_APPEND'))
+        output_tables.extend(sql_outputs)
         
         for table in output_tables:
             table['line_number'] = stmt_line
@@ -611,16 +640,25 @@ class SASAnalyzer:
         
         all_results = []
         successful_files = 0
+        parsed_files = {}  # content hash -> combined results of the first file with that content
         
         for sas_file in sas_files:
             logger.info(f"Processing: {os.path.basename(sas_file)}")
             
             try:
-                # Extract info from one file  
-                file_results = self.extract_sas_info(sas_file)
-                
-                # Combine results for this file
-                combined_results = self.combine_results(file_results)
+                with open(sas_file, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+
+                # Byte-identical files are parsed once and fanned out under each name
+                if digest in parsed_files:
+                    combined_results = parsed_files[digest].copy()
+                else:
+                    # Extract info from one file
+                    file_results = self.extract_sas_info(sas_file)
+
+                    # Combine results for this file
+                    combined_results = self.combine_results(file_results)
+                    parsed_files[digest] = combined_results.copy()
                 
                 if not combined_results.empty:
                     combined_results['source_file'] = os.path.basename(sas_file)
@@ -633,6 +671,10 @@ class SASAnalyzer:
             except Exception as e:
                 logger.error(f"Failed to process {sas_file}: {str(e)}")
         
+        if sas_files:
+            logger.info(f"Dedup: {len(parsed_files)} unique of {len(sas_files)} files "
+                        f"({1 - len(parsed_files) / len(sas_files):.1%} of parsing skipped)")
+
         # Combine all results
         if all_results:
             try:
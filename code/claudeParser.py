@@ -1,11 +1,16 @@
 import re
 import os
 import glob
+import hashlib
 import pandas as pd
 from typing import List, Dict, Tuple, Optional, Set
 from pathlib import Path
 import logging
 
+# The PROC SQL parser is shared with the extractor project
+import extractor_path  # noqa: F401
+from sql_parser import sql_tables
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -19,6 +24,10 @@ class SASCodeParser:
     def __init__(self):
         self.results = []
         self.current_file = ""
+
+        # Exact-duplicate bodies are parsed once: content hash -> extracted tables
+        self._block_cache = {}
+        self.dedup_stats = {'files': 0, 'unique_files': 0, 'blocks': 0, 'reused_blocks': 0}
         
         # Compiled regex patterns for performance
         self.patterns = {
@@ -30,7 +39,7 @@ class SASCodeParser:
             'libname': re.compile(r'^\s*libname\s+(\w+)\s+([^;]+)', re.IGNORECASE),
             'filename': re.compile(r'^\s*filename\s+(\w+)\s+([^;]+)', re.IGNORECASE),
             'options': re.compile(r'^\s*options\s+([^;]+)', re.IGNORECASE),
-            'run_quit': re.compile(r'^\s*(run|quit)\s*;', re.IGNORECASE),
+            'run_quit': re.compile(r'^\s*(run|quit)\s*(;|$)', re.IGNORECASE),
             'mend': re.compile(r'^\s*%mend', re.IGNORECASE),
             'comment_line': re.compile(r'^\s*(\*|/\*)', re.IGNORECASE),
             'comment_block_end': re.compile(r'\*/', re.IGNORECASE)
@@ -42,10 +51,6 @@ class SASCodeParser:
             'out_equals': re.compile(r'out\s*=\s*([^)\s,;]+)', re.IGNORECASE),
             'set_statement': re.compile(r'set\s+([^;]+)', re.IGNORECASE),
             'merge_statement': re.compile(r'merge\s+([^;]+)', re.IGNORECASE),
-            'sql_from': re.compile(r'from\s+([^;,\s]+)', re.IGNORECASE),
-            'sql_join': re.compile(r'(?:inner|left|right|full)?\s*join\s+([^;,\s]+)', re.IGNORECASE),
-            'sql_into': re.compile(r'into\s+([^;,\s]+)', re.IGNORECASE),
-            'sql_create': re.compile(r'create\s+table\s+([^;,\s(]+)', re.IGNORECASE),
             'output_statement': re.compile(r'output\s+([^;]+)', re.IGNORECASE)
         }
     
@@ -105,23 +110,29 @@ class SASCodeParser:
         
         # Extract tables
         full_block = ' '.join(block_lines)
-        input_tables = set()
-        output_tables = set()
-        
-        # PROC-specific parsing
-        if proc_type == 'SQL':
-            input_tables.update(self._extract_sql_inputs(full_block))
-            output_tables.update(self._extract_sql_outputs(full_block))
+        cache_key = self._block_key('PROC', full_block)
+        cached = self._cached_tables(cache_key)
+        if cached:
+            input_tables, output_tables = cached
         else:
-            # Generic PROC parsing
-            for pattern_name, pattern in self.table_patterns.items():
-                matches = pattern.findall(full_block)
-                for match in matches:
-                    tables = self.extract_table_names(match)
-                    if pattern_name in ['data_equals']:
-                        input_tables.update(tables)
-                    elif pattern_name in ['out_equals']:
-                        output_tables.update(tables)
+            input_tables = set()
+            output_tables = set()
+
+            # PROC-specific parsing
+            if proc_type == 'SQL':
+                input_tables.update(self._extract_sql_inputs(full_block))
+                output_tables.update(self._extract_sql_outputs(full_block))
+            else:
+                # Generic PROC parsing
+                for pattern_name, pattern in self.table_patterns.items():
+                    matches = pattern.findall(full_block)
+                    for match in matches:
+                        tables = self.extract_table_names(match)
+                        if pattern_name in ['data_equals']:
+                            input_tables.update(tables)
+                        elif pattern_name in ['out_equals']:
+                            output_tables.update(tables)
+            self._block_cache[cache_key] = (input_tables, output_tables)
         
         return {
             'block_type': 'PROC',
@@ -133,36 +144,12 @@ class SASCodeParser:
         }
     
     def _extract_sql_inputs(self, sql_text: str) -> Set[str]:
-        """Extract input tables from SQL text."""
-        inputs = set()
-        
-        # FROM clauses
-        from_matches = self.table_patterns['sql_from'].findall(sql_text)
-        for match in from_matches:
-            inputs.update(self.extract_table_names(match))
-        
-        # JOIN clauses
-        join_matches = self.table_patterns['sql_join'].findall(sql_text)
-        for match in join_matches:
-            inputs.update(self.extract_table_names(match))
-        
-        return inputs
+        """Extract input tables from SQL text (FROM/JOIN sources, subqueries included)."""
+        return set(sql_tables(sql_text)[0])
     
     def _extract_sql_outputs(self, sql_text: str) -> Set[str]:
-        """Extract output tables from SQL text."""
-        outputs = set()
-        
-        # CREATE TABLE
-        create_matches = self.table_patterns['sql_create'].findall(sql_text)
-        for match in create_matches:
-            outputs.update(self.extract_table_names(match))
-        
-        # INTO clauses
-        into_matches = self.table_patterns['sql_into'].findall(sql_text)
-        for match in into_matches:
-            outputs.update(self.extract_table_names(match))
-        
-        return outputs
+        """Extract output tables from SQL text (CREATE TABLE/VIEW and INSERT INTO targets)."""
+        return set(sql_tables(sql_text)[1])
     
     def parse_data_step(self, lines: List[str], start_idx: int) -> Optional[Dict]:
         """Parse a DATA step and extract relevant information."""
@@ -171,15 +158,11 @@ class SASCodeParser:
         if not match:
             return None
         
-        # Extract output datasets from DATA statement
-        data_statement = match.group(1)
-        output_tables = self.extract_table_names(data_statement)
-        
         # Collect the full block
         block_lines = [data_line]
+        code_lines = []
         current_idx = start_idx + 1
         in_comment_block = False
-        input_tables = set()
         
         while current_idx < len(lines):
             line = lines[current_idx]
@@ -191,32 +174,55 @@ class SASCodeParser:
                 in_comment_block = False
             
             block_lines.append(line)
+            if not in_comment_block and not self.patterns['comment_line'].match(line):
+                code_lines.append(line)
             
+            # Check for block end
+            if not in_comment_block and self.patterns['run_quit'].match(line):
+                break
+            
+            current_idx += 1
+
+        cache_key = self._block_key('DATA', '\n'.join(block_lines))
+        cached = self._cached_tables(cache_key)
+        if cached:
+            input_tables, output_tables = cached
+        else:
+            # Extract output datasets from DATA statement
+            output_tables = self.extract_table_names(match.group(1))
+
             # Extract input tables from SET, MERGE statements
-            if not in_comment_block and not self.patterns['comment_line'].match(line):
+            input_tables = set()
+            for line in code_lines:
                 set_match = self.table_patterns['set_statement'].search(line)
                 if set_match:
                     input_tables.update(self.extract_table_names(set_match.group(1)))
-                
+
                 merge_match = self.table_patterns['merge_statement'].search(line)
                 if merge_match:
                     input_tables.update(self.extract_table_names(merge_match.group(1)))
-            
-            # Check for block end
-            if not in_comment_block and self.patterns['run_quit'].match(line):
-                break
-            
-            current_idx += 1
+            self._block_cache[cache_key] = (input_tables, output_tables)
         
         return {
             'block_type': 'DATA',
             'block_name': 'DATA STEP',
             'input_tables': list(input_tables),
-            'output_tables': output_tables,
+            'output_tables': list(output_tables),
             'raw_code': '\n'.join(block_lines),
             'end_line': current_idx
         }
     
+    def _block_key(self, block_type: str, body: str) -> Tuple[str, str]:
+        return block_type, hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+    def _cached_tables(self, cache_key: Tuple[str, str]) -> Optional[Tuple[Set[str], Set[str]]]:
+        """Return the tables of an identical block parsed earlier, counting the hit."""
+        self.dedup_stats['blocks'] += 1
+        cached = self._block_cache.get(cache_key)
+        if cached:
+            self.dedup_stats['reused_blocks'] += 1
+        return cached
+
     def parse_macro_definition(self, lines: List[str], start_idx: int) -> Optional[Dict]:
         """Parse a macro definition."""
         macro_line = lines[start_idx]
@@ -440,9 +446,24 @@ class SASCodeParser:
         logger.info(f"Found {len(sas_files)} SAS files to parse")
         
         all_results = []
+        parsed_files = {}  # content hash -> blocks of the first file with that content
         for file_path in sas_files:
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self.dedup_stats['files'] += 1
+
+            # Byte-identical files are parsed once and fanned out under each name
+            if digest in parsed_files:
+                file_name = os.path.basename(file_path)
+                all_results.extend(dict(block, file_name=file_name) for block in parsed_files[digest])
+                continue
+
             file_results = self.parse_file(file_path)
+            parsed_files[digest] = file_results
+            self.dedup_stats['unique_files'] += 1
             all_results.extend(file_results)
+
+        self._log_dedup_stats()
         
         # Convert to DataFrame
         if all_results:
@@ -464,6 +485,18 @@ class SASCodeParser:
             return pd.DataFrame(columns=['file_name', 'block_type', 'block_name', 'input_tables', 'output_tables', 'raw_code'])
 
 
+    def _log_dedup_stats(self):
+        stats = self.dedup_stats
+        if not stats['files']:
+            return
+        block_ratio = stats['reused_blocks'] / stats['blocks'] if stats['blocks'] else 0.0
+        logger.info(
+            f"Dedup: {stats['unique_files']} unique of {stats['files']} files "
+            f"({1 - stats['unique_files'] / stats['files']:.1%} skipped), "
+            f"{stats['reused_blocks']} of {stats['blocks']} DATA/PROC blocks reused ({block_ratio:.1%})"
+        )
+
+
 def main():
     """Main function to run the SAS parser."""
     # Configuration
@@ -0,0 +1,565 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from array import array
+from collections import defaultdict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from sas_steps import StepGrouper, dataset_option, normalize_table
+from sql_parser import parse_sql, query_sources, tokenize
+from where_advisor import condition_variables
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+EDGE_KINDS = ('copy', 'rename', 'derive', 'sql', 'aggregate', 'transpose')
+EXCEL_MAX_ROWS = 1_048_575
+
+# 'x = expr;', 'if cond then x = expr;', 'else x = expr;' (the splitter may join 'then' and the target)
+ASSIGNMENT_RE = re.compile(r'^\s*(?:if\b(?P<cond>.*?)\bthen|else\b)?\s*(?P<target>[A-Za-z_]\w*)\s*'
+                           r'(?P<element>\{[^}]*\}|\[[^\]]*\]|\([^)]*\))?\s*=(?!=)(?P<expr>.*?);?\s*$',
+                           re.IGNORECASE | re.DOTALL)
+SUM_STATEMENT_RE = re.compile(r'^\s*(?P<target>[A-Za-z_]\w*)\s*\+\s*(?P<expr>[^=;]+);?\s*$')
+ARRAY_RE = re.compile(r'^\s*array\s+([A-Za-z_]\w*)', re.IGNORECASE)
+DO_LOOP_RE = re.compile(r'(?:^|\bthen|\belse)\s*do\s+([A-Za-z_]\w*)\s*=', re.IGNORECASE)
+RANGE_RE = re.compile(r'^([A-Za-z_]\w*?)(\d+)\s*-\s*[A-Za-z_]\w*?(\d+)$')
+AS_ALIAS_RE = re.compile(r'\bas\s+([A-Za-z_]\w*)\s*$', re.IGNORECASE)
+COLUMN_REF_RE = re.compile(r'^(?:([A-Za-z_]\w*)\s*\.\s*)?([A-Za-z_]\w*|\*)$')
+
+# Automatic DATA step variables and the FIRST./LAST. prefixes
+AUTOMATIC_VARIABLES = {'_n_', '_error_', '_iorc_', 'first', 'last'}
+# PROCs that copy their input rows unchanged (apart from dataset options)
+COPY_PROCS = {'SORT', 'APPEND', 'COPY'}
+# PROC statements naming columns that reach the output unchanged / summarized
+GROUP_STATEMENTS = {'by', 'class', 'id', 'copy'}
+ANALYSIS_STATEMENTS = {'var', 'tables', 'weight', 'freq'}
+
+Stage = Tuple[Optional[FrozenSet[str]], FrozenSet[str], Dict[str, str]]
+
+
+def variable_list(text: Optional[str]) -> List[str]:
+    """Variable names of a KEEP/DROP list, numbered ranges (x1-x3) expanded."""
+    names = []
+    # Macro code (%do ... %end, &var) generates names that cannot be known here
+    text = re.sub(r'%do\s+\w+\s*=|%\w+|&+[\w.]+|\s-\s(?=&)', ' ', text or '', flags=re.IGNORECASE)
+    for part in re.findall(r'[A-Za-z_]\w*\s*-\s*[A-Za-z_]\w*|[A-Za-z_]\w*', text):
+        numbered = RANGE_RE.match(part)
+        if numbered:
+            prefix, first, last = numbered.group(1), int(numbered.group(2)), int(numbered.group(3))
+            names.extend(f'{prefix}{n}'.lower() for n in range(first, last + 1))
+        else:
+            names.extend(name.lower() for name in re.findall(r'[A-Za-z_]\w*', part))
+    return names
+
+
+def rename_pairs(text: Optional[str]) -> Dict[str, str]:
+    return {old.lower(): new.lower() for old, new in re.findall(r'([A-Za-z_]\w*)\s*=\s*([A-Za-z_]\w*)', text or '')}
+
+
+def make_stage(keep: Optional[str] = None, drop: Optional[str] = None, rename: Optional[str] = None) -> Stage:
+    """KEEP/DROP (applied to the incoming names) followed by RENAME."""
+    return (frozenset(variable_list(keep)) if keep is not None else None,
+            frozenset(variable_list(drop)), rename_pairs(rename))
+
+
+def options_stage(options: Optional[str]) -> Stage:
+    options = options or ''
+    return make_stage(dataset_option(options, 'keep'), dataset_option(options, 'drop'),
+                      dataset_option(options, 'rename'))
+
+
+def forward(stages: Iterable[Stage], column: str) -> Optional[str]:
+    """Name a column gets after passing through the stages, or None when it is dropped."""
+    for keep, drop, rename in stages:
+        if (keep is not None and column not in keep) or column in drop:
+            return None
+        column = rename.get(column, column)
+    return column
+
+
+def backward(stages: Iterable[Stage], name: str) -> Optional[str]:
+    """Column that becomes 'name' after passing through the stages, or None when none can."""
+    for keep, drop, rename in reversed(list(stages)):
+        sources = [old for old, new in rename.items() if new == name]
+        if sources:
+            name = sources[0]
+        elif name in rename:
+            # Renamed away: the old name does not come out of this stage
+            return None
+        if (keep is not None and name not in keep) or name in drop:
+            return None
+    return name
+
+
+class Interner:
+    """Dense integer ids for strings; each distinct string is stored once."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __call__(self, name: str) -> int:
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> str:
+        return self.names[index]
+
+    def get(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+
+class ColumnGraph:
+    """
+    Column lineage edges kept in parallel typed arrays: source and target column ids
+    (interned 'libref.table.column' names), edge kind and site (interned 'program:line').
+    An edge costs 13 bytes instead of a dict per edge. Impact and lineage queries
+    build a CSR adjacency (offsets into the edges sorted by source or target) once
+    and walk it breadth-first with numpy.
+    """
+
+    def __init__(self):
+        self.columns = Interner()
+        self.sites = Interner()
+        self.source = array('i')
+        self.target = array('i')
+        self.kind = array('b')
+        self.site = array('i')
+        self._adjacency: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def add(self, source: str, target: str, kind: str, site: str):
+        self.source.append(self.columns(source))
+        self.target.append(self.columns(target))
+        self.kind.append(EDGE_KINDS.index(kind))
+        self.site.append(self.sites(site))
+        self._adjacency.clear()
+
+    def adjacency(self, direction: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(offsets, neighbours): neighbours[offsets[c]:offsets[c + 1]] are the columns next to c."""
+        if direction not in self._adjacency:
+            source = np.frombuffer(self.source, dtype=np.int32) if len(self) else np.zeros(0, np.int32)
+            target = np.frombuffer(self.target, dtype=np.int32) if len(self) else np.zeros(0, np.int32)
+            keys, others = (source, target) if direction == 'down' else (target, source)
+            order = np.argsort(keys, kind='stable')
+            offsets = np.zeros(len(self.columns) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(keys, minlength=len(self.columns)), out=offsets[1:])
+            self._adjacency[direction] = (offsets, others[order])
+        return self._adjacency[direction]
+
+    def reachable(self, column: str, direction: str = 'down', max_depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Columns reachable from 'column' (downstream impact or upstream lineage) with their distance."""
+        start = self.columns.get(column)
+        if start is None:
+            return []
+        offsets, neighbours = self.adjacency(direction)
+        visited = np.zeros(len(self.columns), dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        found, depth = [], 0
+        while frontier.size and (max_depth is None or depth < max_depth):
+            starts, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+            total = int(counts.sum())
+            if not total:
+                break
+            # Positions of every neighbour of the frontier, without a Python loop per column
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            frontier = np.unique(neighbours[positions])
+            frontier = frontier[~visited[frontier]]
+            visited[frontier] = True
+            depth += 1
+            found.extend((self.columns[int(index)], depth) for index in frontier)
+        return found
+
+    def edges_frame(self) -> pd.DataFrame:
+        if not len(self):
+            return pd.DataFrame(columns=['source_column', 'target_column', 'kind', 'site'])
+        frame = pd.DataFrame({
+            'source': np.frombuffer(self.source, dtype=np.int32),
+            'target': np.frombuffer(self.target, dtype=np.int32),
+            'kind': np.frombuffer(self.kind, dtype=np.int8),
+            'site': np.frombuffer(self.site, dtype=np.int32),
+        }).drop_duplicates(['source', 'target', 'kind'])
+        names = np.array(self.columns.names, dtype=object)
+        return pd.DataFrame({
+            'source_column': names[frame['source'].to_numpy()],
+            'target_column': names[frame['target'].to_numpy()],
+            'kind': np.array(EDGE_KINDS, dtype=object)[frame['kind'].to_numpy()],
+            'site': np.array(self.sites.names, dtype=object)[frame['site'].to_numpy()],
+        })
+
+
+class ColumnLineage:
+    """
+    Column-level lineage of DATA steps (KEEP/DROP/RENAME statements and dataset
+    options, assignments and sum statements), PROC SQL select lists (aliases,
+    expressions, '*' and 'alias.*'), PROC TRANSPOSE and row-copying or summarizing
+    PROCs. Columns that flow through a step unchanged are only known where the code
+    names them, so each step is recorded once as table-to-table transfers and
+    derivations; build() propagates the known columns through the transfers and
+    then writes the edges into a ColumnGraph. Unqualified variables of a step with
+    several inputs are attributed to the inputs known to have them, or to all of them.
+    """
+
+    def __init__(self):
+        self.grouper = StepGrouper()
+        self.graph = ColumnGraph()
+        self.known: Dict[str, Set[str]] = defaultdict(set)
+        # (source table, target table, stages, site)
+        self.transfers: List[Tuple[str, str, List[Stage], str]] = []
+        self.outgoing: Dict[str, List[int]] = defaultdict(list)
+        # ([(input table, input stage)], variable, target table or None, target column, kind, site)
+        self.derivations: List[Tuple[List[Tuple[str, Stage]], str, Optional[str], Optional[str], str, str]] = []
+        self.built = False
+
+    # Recording
+    def add_file(self, filepath: str):
+        for step in self.grouper.file_steps(filepath):
+            if step['kind'] == 'DATA':
+                self._data_step(step)
+            elif step['proc'] == 'SQL':
+                self._sql_step(step)
+            else:
+                self._proc_step(step)
+        self.built = False
+
+    def _site(self, step, line=None) -> str:
+        return f"{os.path.basename(step['file'])}:{line or step['start_line']}"
+
+    def _mention(self, table: str, columns: Iterable[str]):
+        self.known[table].update(columns)
+
+    def _transfer(self, source: str, target: str, stages: List[Stage], site: str):
+        if source == target and not any(stage[0] is not None or stage[1] or stage[2] for stage in stages):
+            return
+        self.outgoing[source].append(len(self.transfers))
+        self.transfers.append((source, target, stages, site))
+
+    def _derive(self, inputs, variable, target_table, target_column, kind, site):
+        self.derivations.append((inputs, variable, target_table, target_column, kind, site))
+
+    def _data_step(self, step):
+        statement_keep, statement_drop, statement_rename = None, [], []
+        arrays = set()
+        # PDV variable -> step variables it was computed from (the sources of computed ones resolved)
+        computed: Dict[str, Set[str]] = {}
+        reads: Set[str] = set()
+        for stmt, line in step['statements']:
+            stmt = re.sub(r'^\s*else\s+(?=if\b)', '', stmt, flags=re.IGNORECASE)
+            keyword = stmt.split(None, 1)[0].lower().rstrip(';') if stmt.strip() else ''
+            body = stmt.strip()[len(keyword):].rstrip(';')
+            if keyword in ('data', 'set', 'merge', 'update', 'modify'):
+                continue
+            if keyword == 'keep':
+                statement_keep = (statement_keep or []) + variable_list(body)
+            elif keyword == 'drop':
+                statement_drop += variable_list(body)
+            elif keyword == 'rename':
+                statement_rename.append(body)
+            elif ARRAY_RE.match(stmt):
+                arrays.add(ARRAY_RE.match(stmt).group(1).lower())
+            elif DO_LOOP_RE.search(stmt):
+                # Loop indexes are step-local, like array names
+                arrays.add(DO_LOOP_RE.search(stmt).group(1).lower())
+            elif keyword in ('where', 'if') and not ASSIGNMENT_RE.match(stmt):
+                reads |= condition_variables(re.split(r'\bthen', body, 1, flags=re.IGNORECASE)[0])
+            else:
+                assignment = ASSIGNMENT_RE.match(stmt) or SUM_STATEMENT_RE.match(stmt)
+                if not assignment or assignment.group('target').lower() in arrays:
+                    continue
+                target = assignment.group('target').lower()
+                groups = assignment.groupdict()
+                variables = condition_variables(groups['expr'])
+                if groups.get('cond'):
+                    variables |= condition_variables(groups['cond'])
+                if SUM_STATEMENT_RE.match(stmt):
+                    variables.add(target)
+                sources = set()
+                for variable in variables - arrays - AUTOMATIC_VARIABLES:
+                    sources |= computed.get(variable, {variable})
+                computed[target] = computed.get(target, set()) | sources
+
+        inputs = [(ref['table'], options_stage(ref['options'])) for ref in step['inputs']]
+        output_stage = make_stage(' '.join(statement_keep) if statement_keep is not None else None,
+                                  ' '.join(statement_drop), ' '.join(statement_rename))
+        by = [name for name, _ in step['by']]
+        for table, stage in inputs:
+            keep, _, rename = stage
+            self._mention(table, (keep or set()) | set(rename) | set(by))
+        site = self._site(step)
+        for ref in step['outputs']:
+            stages = [output_stage, options_stage(ref['options'])]
+            for keep, _, rename in stages:
+                # Kept or renamed variables the step does not compute are read from the inputs
+                reads |= ((keep or set()) | set(rename)) - set(computed)
+            for table, stage in inputs:
+                self._transfer(table, ref['table'], [stage] + stages, site)
+            for target, sources in computed.items():
+                name = forward(stages, target)
+                if name is None:
+                    continue
+                self._mention(ref['table'], [name])
+                for variable in sources:
+                    self._derive(inputs, variable, ref['table'], name, 'derive', site)
+        for variable in reads - set(computed) - arrays - AUTOMATIC_VARIABLES:
+            self._derive(inputs, variable, None, None, 'derive', site)
+
+    def _sql_step(self, step):
+        for statement in step.get('queries', []):
+            site = self._site(step, statement['line'])
+            for query in parse_sql(statement['text']):
+                aliases: Dict[str, List[Tuple[str, Stage]]] = {}
+                sources = []
+                for source in query['sources']:
+                    if source['table']:
+                        tables = [(normalize_table(source['table']), options_stage(source['options']))]
+                        aliases[source['table'].lower()] = tables
+                        aliases[tables[0][0].split('.', 1)[1]] = tables
+                    elif source['subquery']:
+                        # Columns of an inline view are traced to the tables it reads
+                        tables = [(normalize_table(name), make_stage()) for name in query_sources(source['subquery'])]
+                    else:
+                        continue
+                    if source['alias']:
+                        aliases[source['alias'].lower()] = tables
+                    sources.extend(tables)
+
+                for predicate in query['predicates'] + query['group_by']:
+                    for qualifier, column in expression_columns(predicate):
+                        for table, stage in aliases.get(qualifier, []) if qualifier else []:
+                            self._mention(table, [column])
+                if query['statement'] not in ('create table', 'insert'):
+                    continue
+                for target in query['targets']:
+                    target = normalize_table(target)
+                    for item in query['columns']:
+                        self._select_item(item, target, sources, aliases, site)
+
+    def _select_item(self, item, target, sources, aliases, site):
+        alias = AS_ALIAS_RE.search(item)
+        expression = item[:alias.start()].strip() if alias else item.strip()
+        reference = COLUMN_REF_RE.match(expression)
+        if reference and reference.group(2) == '*':
+            tables = aliases.get(reference.group(1).lower(), []) if reference.group(1) else sources
+            for table, stage in tables:
+                self._transfer(table, target, [stage], site)
+            return
+        if reference:
+            name = (alias.group(1) if alias else reference.group(2)).lower()
+            kind = 'copy' if name == reference.group(2).lower() else 'rename'
+        elif alias:
+            name, kind = alias.group(1).lower(), 'sql'
+        else:
+            return
+        self._mention(target, [name])
+        for qualifier, column in expression_columns(expression):
+            tables = aliases.get(qualifier, []) if qualifier else sources
+            self._derive(tables, column, target, name, kind, site)
+
+    def _proc_step(self, step):
+        proc = step['proc']
+        inputs = [(ref['table'], options_stage(ref['options'])) for ref in step['inputs']]
+        outputs = [(ref['table'], options_stage(ref['options'])) for ref in step['outputs']]
+        if not inputs or not outputs:
+            return
+        site = self._site(step)
+        if proc in COPY_PROCS:
+            for source, stage in inputs:
+                for target, target_stage in outputs:
+                    self._transfer(source, target, [stage, target_stage], site)
+            return
+
+        listed = defaultdict(list)
+        for stmt, _ in step['statements'][1:]:
+            keyword = stmt.split(None, 1)[0].lower().rstrip(';') if stmt.strip() else ''
+            listed[keyword] += variable_list(stmt.strip()[len(keyword):].rstrip(';'))
+        listed['by'] = [name for name, _ in step['by']]
+        header = step['statements'][0][0].rstrip(';')
+
+        if proc == 'TRANSPOSE':
+            prefix = (dataset_option(header, 'prefix') or '').lower()
+            name_column = (dataset_option(header, 'name') or '_name_').lower()
+            ids = listed['id']
+            values = f"{prefix}<{'_'.join(ids)}>" if ids else f"{prefix or 'col'}<n>"
+            for target, stage in outputs:
+                for column in listed['by'] + listed['copy']:
+                    self._derive_named(inputs, column, target, forward([stage], column), 'copy', site)
+                for column in listed['var'] + ids + listed['idlabel']:
+                    self._derive_named(inputs, column, target, forward([stage], values), 'transpose', site)
+                for column in listed['var']:
+                    self._derive_named(inputs, column, target, forward([stage], name_column), 'transpose', site)
+            return
+
+        for target, stage in outputs:
+            for keyword in GROUP_STATEMENTS | ANALYSIS_STATEMENTS:
+                kind = 'copy' if keyword in GROUP_STATEMENTS else 'aggregate'
+                for column in listed[keyword]:
+                    self._derive_named(inputs, column, target, forward([stage], column), kind, site)
+
+    def _derive_named(self, inputs, column, target, name, kind, site):
+        if name is None:
+            return
+        self._mention(target, [name])
+        self._derive(inputs, column, target, name, kind, site)
+
+    # Building
+    def _propagate(self, tables: Iterable[str]):
+        """Pushes known columns through the transfers until no table learns a new one."""
+        queue = deque(tables)
+        while queue:
+            table = queue.popleft()
+            for index in self.outgoing.get(table, ()):
+                _, target, stages, _ = self.transfers[index]
+                names = {forward(stages, column) for column in self.known[table]}
+                names.discard(None)
+                if not names <= self.known[target]:
+                    self.known[target] |= names
+                    queue.append(target)
+
+    def _attribute(self, inputs: List[Tuple[str, Stage]], variable: str) -> List[Tuple[str, str]]:
+        """(input table, column) pairs a step variable can come from."""
+        candidates = [(table, backward([stage], variable)) for table, stage in inputs]
+        candidates = [(table, column) for table, column in candidates if column]
+        having = [(table, column) for table, column in candidates if column in self.known[table]]
+        return having or candidates
+
+    def build(self) -> ColumnGraph:
+        if self.built:
+            return self.graph
+        self._propagate(list(self.known))
+        added = set()
+        for inputs, variable, _, _, _, _ in self.derivations:
+            for table, column in self._attribute(inputs, variable):
+                if column not in self.known[table]:
+                    self.known[table].add(column)
+                    added.add(table)
+        self._propagate(added)
+
+        self.graph = ColumnGraph()
+        for source, target, stages, site in self.transfers:
+            for column in self.known[source]:
+                name = forward(stages, column)
+                if name is not None:
+                    self.graph.add(f'{source}.{column}', f'{target}.{name}', 'copy' if name == column else 'rename', site)
+        for inputs, variable, target, name, kind, site in self.derivations:
+            if target is None:
+                continue
+            for table, column in self._attribute(inputs, variable):
+                self.graph.add(f'{table}.{column}', f'{target}.{name}', kind, site)
+        self.built = True
+        logger.info(f"{len(self.graph)} column edges between {len(self.graph.columns)} columns")
+        return self.graph
+
+    # Queries
+    def impact(self, column: str, max_depth: Optional[int] = None) -> pd.DataFrame:
+        return self._query(column, 'down', max_depth)
+
+    def lineage(self, column: str, max_depth: Optional[int] = None) -> pd.DataFrame:
+        return self._query(column, 'up', max_depth)
+
+    def _query(self, column, direction, max_depth):
+        column = normalize_column(column)
+        rows = [{'column': column, 'direction': 'impact' if direction == 'down' else 'lineage',
+                 'related_column': name, 'table': name.rsplit('.', 1)[0], 'distance': depth}
+                for name, depth in self.build().reachable(column, direction, max_depth)]
+        return pd.DataFrame(rows, columns=['column', 'direction', 'related_column', 'table', 'distance'])
+
+
+def normalize_column(column: str) -> str:
+    """'Lib.Table.Col' -> 'lib.table.col'; 'table.col' is a WORK table column."""
+    table, _, name = column.strip().lower().rpartition('.')
+    return f'{normalize_table(table)}.{name}'
+
+
+def expression_columns(expression: str) -> List[Tuple[Optional[str], str]]:
+    """(qualifier or None, column) references in an SQL expression."""
+    tokens = tokenize(expression)
+    columns = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind == 'name' and following == '.' and i + 2 < len(tokens) and tokens[i + 2][0] == 'name':
+            columns.append((value.lower(), tokens[i + 2][1].lower()))
+            i += 3
+            continue
+        if kind == 'name' and following != '(' and value.lower() in condition_variables(value) \
+                and value.lower() not in SQL_WORDS:
+            columns.append((None, value.lower()))
+        i += 1
+    return list(dict.fromkeys(columns))
+
+
+# Words of SQL expressions that are not column names
+SQL_WORDS = {'case', 'when', 'then', 'else', 'end', 'as', 'distinct', 'calculated', 'asc', 'desc', 'on', 'from',
+             'select', 'where', 'group', 'by', 'having', 'order', 'join', 'left', 'right', 'inner', 'outer', 'full'}
+
+
+def analyze(pattern: str) -> ColumnLineage:
+    lineage = ColumnLineage()
+    sas_files = glob.glob(pattern, recursive=True)
+    for sas_file in sas_files:
+        try:
+            lineage.add_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    logger.info(f"Recorded {len(lineage.transfers)} table transfers and {len(lineage.derivations)} column "
+                f"derivations from {len(sas_files)} SAS files")
+    lineage.build()
+    return lineage
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Column-level lineage and impact analysis of SAS programs")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--impact', action='append', default=[],
+                        help="Column whose downstream columns to list, as libref.table.column (repeatable)")
+    parser.add_argument('--lineage', action='append', default=[],
+                        help="Column whose upstream columns to list, as libref.table.column (repeatable)")
+    parser.add_argument('--output', default='column_lineage.xlsx')
+    args = parser.parse_args(argv)
+
+    lineage = analyze(args.pattern)
+    edges = lineage.graph.edges_frame()
+    queries = [lineage.impact(column) for column in args.impact] + [lineage.lineage(column) for column in args.lineage]
+    results = pd.concat(queries, ignore_index=True) if queries else pd.DataFrame()
+
+    for frame in queries:
+        if frame.empty:
+            continue
+        print(f"\n=== {frame['direction'].iloc[0].upper()} OF {frame['column'].iloc[0]} ===")
+        for table, group in frame.groupby('table', sort=False):
+            print(f"  {table:<35} {', '.join(name.rsplit('.', 1)[1] for name in group['related_column'])}")
+
+    if len(edges) > EXCEL_MAX_ROWS or args.output.lower().endswith('.csv'):
+        # Too many edges for a worksheet
+        path = os.path.splitext(args.output)[0] + '.csv'
+        edges.to_csv(path, index=False)
+        if not results.empty:
+            results.to_csv(os.path.splitext(args.output)[0] + '_queries.csv', index=False)
+    else:
+        path = args.output
+        with pd.ExcelWriter(path) as writer:
+            edges.to_excel(writer, sheet_name='column_edges', index=False)
+            if not results.empty:
+                results.to_excel(writer, sheet_name='queries', index=False)
+    print(f"\n{len(edges)} column edges between {len(lineage.graph.columns)} columns written to {path}")
+    return edges
+
+
+if __name__ == "__main__":
+    main()
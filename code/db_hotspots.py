@@ -0,0 +1,162 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from claudeCode import SASAnalyzer
+from libref_registry import LibrefRegistry
+from sas_steps import StepGrouper, dataset_option, libref_of, load_table_sizes, step_operations
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS = {
+    'filter': "push the filter into the database (WHERE= on the DB table or a pass-through WHERE)",
+    'aggregate': "aggregate in-database (SQL pass-through GROUP BY) or in CAS",
+    'join': "join in the database when all tables share the connection, otherwise load them into CAS",
+    'sort': "let the database order the rows or drop the sort",
+}
+
+
+def database_librefs(pattern: str, analyzer: Optional[SASAnalyzer] = None) -> Dict[str, str]:
+    """libref -> engine for every database LIBNAME in the corpus (setup programs included)."""
+    analyzer = analyzer or SASAnalyzer()
+    registry = LibrefRegistry()
+    for sas_file in glob.glob(pattern, recursive=True):
+        text, _ = analyzer.load_sas_file(sas_file)
+        registry.add_libnames(text, sas_file, db_only=True, clears=False)
+    return {libref: registry.engine(libref) for libref in registry}
+
+
+class HotspotAnalyzer:
+    """
+    Finds steps that copy database tables into SAS storage (WORK or a SAS library)
+    and the local filtering, aggregation, joins and sorts applied to the copies,
+    in the same step or in later steps of the program. Each movement is ranked by
+    the estimated size of the database tables it pulls.
+    """
+
+    def __init__(self, db_librefs: Dict[str, str], sizes: Optional[Dict[str, Dict]] = None):
+        self.db_librefs = db_librefs
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+
+    def is_db(self, table: str) -> bool:
+        return libref_of(table) in self.db_librefs
+
+    def analyze_file(self, filepath: str) -> List[Dict]:
+        steps = self.grouper.file_steps(filepath)
+        hotspots = []
+        origins: Dict[str, Set[int]] = {}   # SAS table -> indexes of the hotspots it derives from
+
+        for step in steps:
+            db_inputs = [ref for ref in step['inputs'] if self.is_db(ref['table'])]
+            sas_outputs = list(dict.fromkeys(ref['table'] for ref in step['outputs'] if not self.is_db(ref['table'])))
+            passthrough = step['proc'] == 'SQL' and any(
+                re.search(r'\bconnection\s+to\b', query['text'], re.IGNORECASE) for query in step.get('queries', []))
+            ops = step_operations(step)
+
+            derived = set()
+            for ref in step['inputs']:
+                derived |= origins.get(ref['table'], set())
+            for index in derived:
+                for op, line in ops.items():
+                    hotspots[index]['downstream_ops'].setdefault(op, f"{op}@{line}")
+
+            if (db_inputs or passthrough) and sas_outputs:
+                local_ops = ops
+                if step['proc'] == 'SQL' and len({libref_of(ref['table']) for ref in step['inputs']}) == 1:
+                    # A query over one DB libref is usually passed to the database implicitly
+                    local_ops = {}
+                hotspots.append(self._hotspot(filepath, step, db_inputs, sas_outputs, passthrough, local_ops))
+                derived = derived | {len(hotspots) - 1}
+
+            for table in sas_outputs:
+                if derived:
+                    origins[table] = derived
+                else:
+                    origins.pop(table, None)
+
+        return [self._finish(hotspot) for hotspot in hotspots]
+
+    def _hotspot(self, filepath, step, db_inputs, sas_outputs, passthrough, local_ops) -> Dict:
+        full_pulls = [ref['table'] for ref in db_inputs
+                      if not step['where'] and all(dataset_option(ref['options'], option) is None
+                                                   for option in ('where', 'keep', 'drop', 'obs'))]
+        known = [self.sizes[ref['table']] for ref in db_inputs if ref['table'] in self.sizes]
+        return {
+            'file': filepath,
+            'line_number': step['start_line'],
+            'step': step['proc'] and f"PROC {step['proc']}" or 'DATA',
+            'db_inputs': ', '.join(sorted({ref['table'] for ref in db_inputs})) or 'pass-through query',
+            'engines': ', '.join(sorted({self.db_librefs[libref_of(ref['table'])] for ref in db_inputs})),
+            'sas_outputs': ', '.join(sas_outputs),
+            'full_table_pull': bool(full_pulls),
+            'est_rows': sum(size['rows'] or 0 for size in known) if known else None,
+            'est_bytes': sum(size['bytes'] or 0 for size in known) if known else None,
+            'in_step_ops': {op: f"{op}@{line}" for op, line in local_ops.items()},
+            'downstream_ops': {},
+        }
+
+    @staticmethod
+    def _finish(hotspot: Dict) -> Dict:
+        in_step, downstream = hotspot.pop('in_step_ops'), hotspot.pop('downstream_ops')
+        ops = sorted(set(in_step) | set(downstream))
+        hotspot['local_ops'] = ', '.join(list(in_step.values()) + list(downstream.values()))
+        hotspot['op_count'] = len(in_step) + len(downstream)
+        hotspot['recommendation'] = '; '.join(RECOMMENDATIONS[op] for op in ops) or \
+            "check whether the copy is needed at all"
+        return hotspot
+
+
+def find_hotspots(pattern: str, sizes_file: Optional[str] = None) -> pd.DataFrame:
+    sas_files = glob.glob(pattern, recursive=True)
+    analyzer = HotspotAnalyzer(database_librefs(pattern), load_table_sizes(sizes_file))
+    logger.info(f"Checking {len(sas_files)} SAS files against {len(analyzer.db_librefs)} database librefs")
+
+    rows = []
+    for sas_file in sas_files:
+        try:
+            rows.extend(analyzer.analyze_file(sas_file))
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    # Known volume first, then the amount of local work, then full-table pulls
+    df['_known'] = df['est_bytes'].notna()
+    df = df.sort_values(['_known', 'est_bytes', 'op_count', 'full_table_pull'],
+                        ascending=[False, False, False, False]).drop(columns='_known')
+    df.insert(0, 'rank', range(1, len(df) + 1))
+    return df.reset_index(drop=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rank steps that move database tables into SAS storage")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='db_hotspots.xlsx')
+    args = parser.parse_args(argv)
+
+    df = find_hotspots(args.pattern, args.sizes)
+    if df.empty:
+        print("No database-to-SAS data movement found")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== DATABASE -> SAS DATA MOVEMENT ===")
+    for _, row in df.head(20).iterrows():
+        size = f"{row['est_bytes'] / 1e9:.2f} GB" if pd.notna(row['est_bytes']) else "size unknown"
+        print(f"{row['rank']:>3}. {os.path.basename(row['file'])}:{row['line_number']} {row['step']} "
+              f"{row['db_inputs']} -> {row['sas_outputs']} ({size}) {row['local_ops']}")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import os
+import re
+import struct
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import git_changes
+from extractor2 import read_sas_file, analyze_directory
+from libref_registry import LibrefRegistry, is_libref_candidate
+
+# Engines whose LIBNAME path is a directory of <table>.sas7bdat files
+DIRECTORY_ENGINES = {"base", "v9", "v8", "v7", "v6", "spde"}
+
+SAS7BDAT_MAGIC = bytes([
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0xc2, 0xea, 0x81, 0x60, 0xb3, 0x14, 0x11, 0xcf, 0xbd, 0x92, 0x08, 0x00,
+    0x09, 0xc7, 0x31, 0x8c, 0x18, 0x1f, 0x10, 0x11,
+])
+ROW_SIZE_SIGNATURE = b"\xf7\xf7\xf7\xf7"
+COLUMN_SIZE_SIGNATURE = b"\xf6\xf6\xf6\xf6"
+META_PAGE_TYPES = {0, 16384, 512, 640}   # meta and mix pages carry subheaders
+TRUNCATED_SUBHEADER = 1
+
+# Bytes sampled from a CSV to estimate its average line length
+CSV_SAMPLE_BYTES = 64 * 1024
+
+
+def read_sas7bdat_header(path):
+    """
+    Row count, column count and layout of a .sas7bdat file, read from its header
+    and metadata pages only; data pages are never read.
+    """
+    with open(path, "rb") as f:
+        header = f.read(288)
+        if len(header) < 288 or header[:32] != SAS7BDAT_MAGIC:
+            raise ValueError(f"{path} is not a sas7bdat file")
+
+        is_64bit = header[32] == 0x33
+        align = 4 if header[35] == 0x33 else 0
+        endian = "<" if header[37] == 0x01 else ">"
+        int_len = 8 if is_64bit else 4
+        int_format = endian + ("q" if is_64bit else "i")
+
+        header_length, page_length = struct.unpack_from(endian + "ii", header, 196 + align)
+        # The page count is the first 8-byte field in 64-bit files
+        page_count = struct.unpack_from(int_format, header, 204 + align)[0]
+
+        page_bit_offset = 32 if is_64bit else 16
+        pointer_length = 24 if is_64bit else 12
+        info = {"rows": None, "columns": None, "row_length": None, "page_length": page_length,
+                "page_count": page_count, "header_length": header_length, "bytes": os.path.getsize(path),
+                "format": "sas7bdat"}
+
+        for page_index in range(page_count):
+            f.seek(header_length + page_index * page_length)
+            page = f.read(page_length)
+            if len(page) < page_bit_offset + 8:
+                break
+            page_type, _, subheader_count = struct.unpack_from(endian + "HHH", page, page_bit_offset)
+            if page_type not in META_PAGE_TYPES:
+                # Metadata pages come first; the first data page ends the header
+                break
+
+            for i in range(subheader_count):
+                pointer = page_bit_offset + 8 + i * pointer_length
+                offset, length = struct.unpack_from(endian + ("qq" if is_64bit else "ii"), page, pointer)
+                compression = page[pointer + 2 * int_len]
+                if length == 0 or compression == TRUNCATED_SUBHEADER:
+                    continue
+                signature = page[offset:offset + int_len]
+                if ROW_SIZE_SIGNATURE in signature:
+                    info["row_length"] = struct.unpack_from(int_format, page, offset + 5 * int_len)[0]
+                    info["rows"] = struct.unpack_from(int_format, page, offset + 6 * int_len)[0]
+                elif COLUMN_SIZE_SIGNATURE in signature:
+                    info["columns"] = struct.unpack_from(int_format, page, offset + int_len)[0]
+
+            if info["rows"] is not None and info["columns"] is not None:
+                break
+    return info
+
+
+def estimate_csv(path):
+    """Column count from the header line, row count extrapolated from a sample of the file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+    lines = sample.split(b"\n")
+    header = lines[0].decode("utf-8", errors="ignore")
+    delimiter = max([",", ";", "\t", "|"], key=header.count)
+    complete = lines[1:-1] if len(sample) == CSV_SAMPLE_BYTES else [line for line in lines[1:] if line.strip()]
+    if len(sample) < CSV_SAMPLE_BYTES:
+        rows = len(complete)
+    else:
+        average = sum(len(line) + 1 for line in complete) / max(1, len(complete))
+        rows = int((size - len(lines[0]) - 1) / average) if average else 0
+    return {"rows": rows, "columns": header.count(delimiter) + 1 if header.strip() else 0, "row_length": None,
+            "bytes": size, "format": "csv"}
+
+
+class CatalogScanner:
+    """
+    Maps libref.table references to local .sas7bdat/.csv files and reads their headers.
+    LIBNAME paths written for another machine are translated with path_map prefixes,
+    or matched by folder name under data_root. Directory listings are cached, so each
+    library folder is listed once however many tables it holds.
+    """
+
+    def __init__(self, libraries, path_map=None, data_root=None, max_workers=8):
+        self.libraries = libraries          # libref -> LIBNAME path as written in the code
+        self.path_map = path_map or []      # [(prefix in code, local prefix)]
+        self.data_root = data_root
+        self.max_workers = max_workers
+        self.listings = {}                  # directory -> {lower-cased file name: file name}
+        self.resolved = {}                  # libref -> local directory or None
+        self.lock = threading.Lock()
+        self._root_dirs = None
+
+    def resolve_library(self, libref):
+        libref = libref.lower()
+        if libref not in self.resolved:
+            self.resolved[libref] = self._resolve_library(libref)
+        return self.resolved[libref]
+
+    def _resolve_library(self, libref):
+        path = self.libraries.get(libref)
+        if not path:
+            return None
+        candidates = [path]
+        for prefix, local in self.path_map:
+            if path.lower().startswith(prefix.lower()):
+                candidates.append(local + path[len(prefix):])
+        for candidate in candidates:
+            candidate = candidate.replace("\\", os.sep) if os.sep == "/" else candidate
+            if os.path.isdir(candidate):
+                return candidate
+        if self.data_root:
+            return self._find_under_root(re.split(r"[\\/]", path.rstrip("\\/"))[-1])
+        return None
+
+    def _find_under_root(self, folder_name):
+        if self._root_dirs is None:
+            self._root_dirs = {}
+            for dirpath, dirnames, _ in os.walk(self.data_root):
+                for dirname in dirnames:
+                    self._root_dirs.setdefault(dirname.lower(), os.path.join(dirpath, dirname))
+        return self._root_dirs.get(folder_name.lower())
+
+    def listing(self, directory):
+        with self.lock:
+            if directory not in self.listings:
+                try:
+                    self.listings[directory] = {entry.name.lower(): entry.name for entry in os.scandir(directory)
+                                                if entry.is_file()}
+                except OSError:
+                    self.listings[directory] = {}
+            return self.listings[directory]
+
+    def locate(self, table):
+        """Local file for 'libref.table', preferring the .sas7bdat over a .csv export."""
+        if "." not in table:
+            return None
+        libref, member = table.lower().split(".", 1)
+        directory = self.resolve_library(libref)
+        if directory is None:
+            return None
+        files = self.listing(directory)
+        for extension in (".sas7bdat", ".csv"):
+            name = files.get(member + extension)
+            if name:
+                return os.path.join(directory, name)
+        return None
+
+    def scan(self, tables):
+        """Size information per table; tables without a local file are left out."""
+        located = {table: self.locate(table) for table in set(tables)}
+        located = {table: path for table, path in located.items() if path}
+
+        def read(item):
+            table, path = item
+            try:
+                info = read_sas7bdat_header(path) if path.lower().endswith(".sas7bdat") else estimate_csv(path)
+            except (OSError, ValueError, struct.error) as e:
+                return table, {"path": path, "error": str(e)}
+            return table, dict(info, path=path)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(located) or 1))) as executor:
+            return dict(executor.map(read, located.items()))
+
+
+def libraries_from_directory(base_dir):
+    """Directory LIBNAMEs defined anywhere in the programs (last definition wins)."""
+    registry = LibrefRegistry()
+    for filename in sorted(os.listdir(base_dir)):
+        if git_changes.is_sas_file(filename):
+            path = os.path.join(base_dir, filename)
+            registry.add_libnames(read_sas_file(path), path, clears=False)
+    return {libref: entry["path"] for libref, entry in registry.entries.items()
+            if entry["path"] and entry["engine"] in DIRECTORY_ENGINES}
+
+
+def row_tables(row):
+    """Two-level table names mentioned in one extractor2 lineage row."""
+    tables = []
+    for column in ("output_table", "referenced_table", "tables_sourcejoin", "Input tables"):
+        value = row.get(column)
+        if not isinstance(value, str):
+            continue
+        for name in value.split(","):
+            name = name.strip().lower()
+            if re.fullmatch(r"\w+\.\w+", name) and is_libref_candidate(*name.split(".")):
+                tables.append(name)
+    return list(dict.fromkeys(tables))
+
+
+def attach_sizes(df, sizes):
+    """Adds size_tables, est_rows, est_columns and est_bytes columns to the lineage rows."""
+    found, rows, columns, size = [], [], [], []
+    for row in df.to_dict("records"):
+        known = [(table, sizes[table]) for table in row_tables(row) if table in sizes and "error" not in sizes[table]]
+        found.append(", ".join(table for table, _ in known) or None)
+        rows.append(sum(info["rows"] or 0 for _, info in known) if known else None)
+        columns.append(max(info["columns"] or 0 for _, info in known) if known else None)
+        size.append(sum(info["bytes"] for _, info in known) if known else None)
+    return df.assign(size_tables=found, est_rows=rows, est_columns=columns, est_bytes=size)
+
+
+def parse_path_map(values):
+    pairs = []
+    for value in values or []:
+        prefix, _, local = value.partition("=")
+        pairs.append((prefix, local))
+    # Longest prefix first, so nested mappings win
+    return sorted(pairs, key=lambda pair: -len(pair[0]))
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attach dataset sizes from sas7bdat/CSV headers to the lineage output.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--lineage", help="Existing extractor2 output to enrich (default: analyze --base-dir)")
+    parser.add_argument("--path-map", action="append",
+                        help=r"Translate LIBNAME paths, e.g. 'D:\data=/mnt/data' (repeatable)")
+    parser.add_argument("--data-root", help="Folder searched for library directories by name")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent header reads")
+    parser.add_argument("--output", default="final_analysis_sizes.xlsx", help="Excel file to write")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    df = pd.read_excel(args.lineage) if args.lineage else pd.DataFrame(analyze_directory(args.base_dir))
+    libraries = libraries_from_directory(args.base_dir)
+    scanner = CatalogScanner(libraries, parse_path_map(args.path_map), args.data_root, args.workers)
+
+    tables = [table for row in df.to_dict("records") for table in row_tables(row)]
+    sizes = scanner.scan(tables)
+    resolved = {libref for libref in libraries if scanner.resolve_library(libref)}
+    print(f"\n📚 {len(resolved)}/{len(libraries)} libraries found locally, "
+          f"{len(sizes)}/{len(set(tables))} referenced tables sized")
+
+    for table, info in sorted(sizes.items(), key=lambda item: -item[1].get("bytes", 0))[:20]:
+        if "error" in info:
+            print(f"  ⚠️ {table}: {info['error']}")
+        else:
+            print(f"  {table:<35} {format_bytes(info['bytes']):>10} {info['rows'] or 0:>12,} rows "
+                  f"{info['columns'] or 0:>5} cols ({info['format']})")
+
+    df = attach_sizes(df, sizes)
+    with pd.ExcelWriter(args.output) as writer:
+        df.to_excel(writer, sheet_name="lineage", index=False)
+        pd.DataFrame([dict(info, table=table) for table, info in sizes.items()]).to_excel(
+            writer, sheet_name="table_sizes", index=False)
+    print(f"\n✅ Wrote {len(df)} rows into '{args.output}'")
+
+if __name__ == "__main__":
+    main()
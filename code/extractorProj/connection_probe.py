@@ -0,0 +1,360 @@
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import queue
+import threading
+
+import pandas as pd
+
+import git_changes
+from extractor2 import read_sas_file
+from libref_registry import DB_ENGINES, LibrefRegistry
+
+OPTION_PATTERN = re.compile(r'(\w+)\s*=\s*("[^"]*"|\'[^\']*\'|\([^)]*\)|[^\s)]+)')
+CONNECT_PATTERN = re.compile(r'connect\s+to\s+(\w+)(?:\s+as\s+(\w+))?\s*(?:\((.*?)\))?\s*;',
+                             re.IGNORECASE | re.DOTALL)
+
+# Probe query per engine; everything else uses "select 1"
+PROBE_QUERIES = {"oracle": "select 1 from dual", "db2": "select 1 from sysibm.sysdummy1"}
+
+
+def parse_options(text):
+    """LIBNAME / CONNECT TO options as a dict with lower-cased keys and unquoted values."""
+    return {key.lower(): value.strip("'\"") for key, value in OPTION_PATTERN.findall(text or "")}
+
+
+def _driver(module_name):
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+def _first(options, *keys):
+    for key in keys:
+        if options.get(key):
+            return options[key]
+    return None
+
+
+def connect_sqlite(options, timeout):
+    import sqlite3
+    database = _first(options, "database", "path", "db")
+    # mode=rw: probing must not create an empty database file
+    return sqlite3.connect(f"file:{database}?mode=rw", uri=True, timeout=timeout, check_same_thread=False)
+
+
+def connect_oracle(options, timeout):
+    oracledb = _driver("oracledb")
+    connection = oracledb.connect(user=options.get("user"), password=_first(options, "password", "pw"),
+                                  dsn=_first(options, "path", "dsn", "server"))
+    connection.call_timeout = int(timeout * 1000)
+    return connection
+
+
+def connect_postgres(options, timeout):
+    psycopg2 = _driver("psycopg2")
+    return psycopg2.connect(host=_first(options, "server", "host"), port=options.get("port"),
+                            dbname=_first(options, "database", "db"), user=options.get("user"),
+                            password=_first(options, "password", "pw"), connect_timeout=max(1, int(timeout)))
+
+
+def connect_mysql(options, timeout):
+    pymysql = _driver("pymysql")
+    return pymysql.connect(host=_first(options, "server", "host"), port=int(options.get("port", 3306)),
+                           user=options.get("user"), password=_first(options, "password", "pw"),
+                           database=_first(options, "database", "db"), connect_timeout=timeout)
+
+
+def connect_teradata(options, timeout):
+    teradatasql = _driver("teradatasql")
+    return teradatasql.connect(host=_first(options, "server", "tdpid", "host"), user=options.get("user"),
+                               password=_first(options, "password", "pw"), connect_timeout=int(timeout * 1000))
+
+
+def connect_odbc(options, timeout):
+    pyodbc = _driver("pyodbc")
+    connection_string = _first(options, "noprompt", "complete", "required")
+    if not connection_string:
+        parts = {"DSN": _first(options, "datasrc", "dsn", "path"), "UID": options.get("user"),
+                 "PWD": _first(options, "password", "pw"), "SERVER": options.get("server"),
+                 "DATABASE": _first(options, "database", "db")}
+        connection_string = ";".join(f"{key}={value}" for key, value in parts.items() if value)
+    return pyodbc.connect(connection_string.strip("()"), timeout=int(timeout))
+
+
+# SAS engine -> (driver module, connect function); the driver is imported only when probed
+CONNECTORS = {
+    "sqlite": (None, connect_sqlite),
+    "oracle": ("oracledb", connect_oracle),
+    "postgres": ("psycopg2", connect_postgres),
+    "mysql": ("pymysql", connect_mysql),
+    "teradata": ("teradatasql", connect_teradata),
+    "sqlserver": ("pyodbc", connect_odbc),
+    "odbc": ("pyodbc", connect_odbc),
+    "oledb": ("pyodbc", connect_odbc),
+    "db2": ("pyodbc", connect_odbc),
+    "netezza": ("pyodbc", connect_odbc),
+    "sybase": ("pyodbc", connect_odbc),
+}
+
+
+def discover_targets(base_dir):
+    """Database LIBNAMEs and CONNECT TO statements, one target per distinct engine + options."""
+    targets = {}
+    for filename in sorted(os.listdir(base_dir)):
+        if not git_changes.is_sas_file(filename):
+            continue
+        path = os.path.join(base_dir, filename)
+        code = read_sas_file(path)
+
+        registry = LibrefRegistry.from_code(code, path, db_only=True, clears=False)
+        found = [(libref, entry["engine"], entry["options"], entry["sites"]) for libref, entry in registry.entries.items()]
+        for match in CONNECT_PATTERN.finditer(code):
+            engine = match.group(1).lower()
+            if engine in DB_ENGINES or engine in CONNECTORS:
+                found.append(((match.group(2) or engine).lower(), engine, match.group(3) or "",
+                              [(path, code.count("\n", 0, match.start()) + 1)]))
+
+        for name, engine, options_text, sites in found:
+            options = parse_options(options_text)
+            key = target_key(engine, options)
+            target = targets.setdefault(key, {"key": key, "engine": engine, "options": options,
+                                              "names": set(), "sites": []})
+            target["names"].add(name)
+            target["sites"].extend(f"{os.path.basename(site_path)}:{line}" for site_path, line in sites)
+    return list(targets.values())
+
+
+def target_key(engine, options):
+    """Stable cache key; the password only enters through its hash."""
+    material = json.dumps([engine, sorted(options.items())])
+    return f"{engine}:{hashlib.sha1(material.encode('utf-8')).hexdigest()[:16]}"
+
+
+class ConnectionPool:
+    """Keeps at most max_size idle connections per target so repeated probes skip the handshake."""
+
+    def __init__(self, max_size=2):
+        self.max_size = max_size
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, key, factory):
+        with self.lock:
+            connections = self.idle.get(key)
+            if connections:
+                return connections.pop(), True
+        return factory(), False
+
+    def release(self, key, connection):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_size:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    self.discard(connection)
+            self.idle.clear()
+
+
+class ConnectionProber:
+    """
+    Checks that discovered database targets accept a connection and a trivial query.
+    Probes run on at most max_workers daemon threads with a timeout per target; a
+    worker stuck in a hung driver is replaced and abandoned, and as a daemon it
+    cannot keep the interpreter from exiting. Successful results are cached
+    (optionally on disk) for max_age seconds.
+    """
+
+    def __init__(self, max_workers=8, timeout=10.0, max_age=3600, cache_file=None, pool=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_age = max_age
+        self.cache_file = cache_file
+        self.pool = pool or ConnectionPool()
+        self.cache = {}
+        if cache_file and os.path.isfile(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+
+    def probe_all(self, targets):
+        results = []
+        pending = []
+        now = time.time()
+        for target in targets:
+            cached = self.cache.get(target["key"])
+            if cached and now - cached["checked_at"] <= self.max_age:
+                results.append(dict(cached, names=target.get("names"), sites=target.get("sites"), cached=True))
+            else:
+                pending.append(target)
+
+        if pending:
+            todo, done = queue.Queue(), queue.Queue()
+            for index in range(len(pending)):
+                todo.put(index)
+            started = {}
+            waiting = dict(enumerate(pending))
+            for _ in range(max(1, min(self.max_workers, len(pending)))):
+                self._start_worker(pending, todo, done, started)
+            while waiting:
+                finished = {}
+                try:
+                    index, result = done.get(timeout=0.05)
+                    finished[index] = result
+                except queue.Empty:
+                    pass
+                # A target's timeout counts from when a worker picked it up, not from submission
+                now = time.perf_counter()
+                for index, target in waiting.items():
+                    if index not in finished and index in started and now - started[index] > self.timeout:
+                        finished[index] = self._result(target, "timeout", self.timeout * 1000,
+                                                       f"No answer within {self.timeout:g}s")
+                        # The hung worker is abandoned; another one takes over the remaining targets
+                        self._start_worker(pending, todo, done, started)
+                for index, result in finished.items():
+                    if waiting.pop(index, None) is None:
+                        continue    # late answer from a target that already timed out
+                    results.append(result)
+                    if result["status"] == "ok":
+                        self.cache[result["key"]] = {k: v for k, v in result.items() if k not in ("names", "sites")}
+            self._save_cache()
+        return results
+
+    def _start_worker(self, pending, todo, done, started):
+        def work():
+            while True:
+                try:
+                    index = todo.get_nowait()
+                except queue.Empty:
+                    return
+                started[index] = time.perf_counter()
+                done.put((index, self.probe(pending[index])))
+
+        threading.Thread(target=work, name="connection-probe", daemon=True).start()
+
+    def probe(self, target):
+        module_name, connect = CONNECTORS.get(target["engine"], (None, None))
+        if connect is None:
+            return self._result(target, "unsupported", None, f"No connector for engine '{target['engine']}'")
+        if module_name and _driver(module_name) is None:
+            return self._result(target, "driver_missing", None, f"Install '{module_name}' to probe this target")
+
+        query = PROBE_QUERIES.get(target["engine"], "select 1")
+        start = time.perf_counter()
+        connection = None
+        try:
+            connection, reused = self.pool.acquire(target["key"], lambda: connect(target["options"], self.timeout))
+            cursor = connection.cursor()
+            cursor.execute(query)
+            cursor.fetchall()
+            cursor.close()
+            latency = (time.perf_counter() - start) * 1000
+            self.pool.release(target["key"], connection)
+            return self._result(target, "ok", latency, "pooled connection" if reused else "")
+        except Exception as e:
+            if connection is not None:
+                self.pool.discard(connection)
+            return self._result(target, "error", (time.perf_counter() - start) * 1000, str(e).splitlines()[0][:200])
+
+    def _result(self, target, status, latency_ms, detail):
+        return {
+            "key": target["key"],
+            "engine": target["engine"],
+            "names": target.get("names"),
+            "sites": target.get("sites"),
+            "status": status,
+            "latency_ms": None if latency_ms is None else round(latency_ms, 1),
+            "detail": detail,
+            "checked_at": time.time(),
+            "cached": False,
+        }
+
+    def _save_cache(self):
+        if self.cache_file:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f, indent=2)
+
+    def close(self):
+        self.pool.close_all()
+
+
+def apply_overrides(targets, overrides_file):
+    """
+    Overrides map a libref/connection name to the engine and options to probe,
+    e.g. {"dw": {"engine": "oracle", "path": "prod-db:1521/DW", "user": "probe"}};
+    useful when credentials in the code come from macro variables.
+    """
+    with open(overrides_file, "r", encoding="utf-8") as f:
+        overrides = {name.lower(): value for name, value in json.load(f).items()}
+    for target in targets:
+        for name in sorted(target["names"]):
+            if name in overrides:
+                options = {key.lower(): str(value) for key, value in overrides[name].items()}
+                target["engine"] = options.pop("engine", target["engine"]).lower()
+                target["options"] = options
+                target["key"] = target_key(target["engine"], options)
+                break
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe the database targets referenced by SAS programs.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--overrides", help="JSON file with connection settings per libref/connection name")
+    parser.add_argument("--workers", type=int, default=8, help="Maximum concurrent probes")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds allowed per target")
+    parser.add_argument("--cache", default="probe_cache.json", help="Cache of successful probes")
+    parser.add_argument("--max-age", type=float, default=3600, help="Seconds a cached success stays valid")
+    parser.add_argument("--output", default="connection_probe.xlsx", help="Excel file to write")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    targets = discover_targets(args.base_dir)
+    if args.overrides:
+        targets = apply_overrides(targets, args.overrides)
+    if not targets:
+        print("✅ No database LIBNAME or CONNECT TO targets found.")
+        return
+
+    print(f"🔌 Probing {len(targets)} targets with up to {args.workers} workers...")
+    prober = ConnectionProber(args.workers, args.timeout, args.max_age, args.cache)
+    try:
+        results = prober.probe_all(targets)
+    finally:
+        prober.close()
+
+    icons = {"ok": "✅", "error": "❌", "timeout": "⏱️", "driver_missing": "📦", "unsupported": "❔"}
+    for result in sorted(results, key=lambda r: (r["status"] != "ok", r["engine"])):
+        latency = f"{result['latency_ms']:.1f} ms" if result["latency_ms"] is not None else "-"
+        cached = " (cached)" if result["cached"] else ""
+        names = ", ".join(sorted(result["names"] or []))
+        print(f"  {icons.get(result['status'], '?')} {result['engine']:<10} {names:<25} {latency:>10}{cached} "
+              f"{result['detail']}")
+
+    df = pd.DataFrame(results)
+    df["names"] = df["names"].apply(lambda names: ", ".join(sorted(names or [])))
+    df["sites"] = df["sites"].apply(lambda sites: ", ".join(sites or []))
+    df.to_excel(args.output, index=False)
+    print(f"\n✅ Wrote {len(df)} probe results into '{args.output}'")
+
+if __name__ == "__main__":
+    main()
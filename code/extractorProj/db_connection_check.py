@@ -1,8 +1,7 @@
 import os
 import re
 
-# List of built-in or always-available SAS libraries to ignore
-BUILTIN_LIBNAMES = {"work", "sashelp", "sasuser", "maps"}
+from libref_registry import LibrefRegistry, is_libref_candidate
 
 def read_sas_file(filepath):
     with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
@@ -13,19 +12,22 @@ def read_sas_file(filepath):
     content = re.sub(r'^\s*\*.*?;', '', content, flags=re.MULTILINE)
     return content
 
-def extract_libnames(code):
+def extract_libnames(code, filepath=None):
     """
     Extracts libnames defined in the code.
-    Returns a set of librefs (library names).
+    Returns a LibrefRegistry with engine, options and definition line of each libref.
     """
-    return set(match.group(1).lower() for match in re.finditer(r'libname\s+(\w+)\b', code, re.IGNORECASE))
+    return LibrefRegistry.from_code(code, filepath)
 
 def extract_librefs_used(code):
     """
     Extracts all librefs used as part of libref.table patterns.
+    Numbers, formats (date9.), BY-group variables (first.id), file names (setup.sas)
+    and hash method calls (h.find()) are skipped.
     Returns a set of librefs.
     """
-    return set(match.group(1).lower() for match in re.finditer(r'\b(\w+)\.\w+\b', code))
+    return set(match.group(1).lower() for match in re.finditer(r'\b(\w+)\.(\w+)\b(\s*\()?', code)
+               if is_libref_candidate(match.group(1), match.group(2), bool(match.group(3))))
 
 def main():
     base_dir = "SAS Files"
@@ -33,7 +35,7 @@ def main():
         print("❌ 'SAS Files' folder not found.")
         return
 
-    libnames_defined = set()
+    libnames_defined = LibrefRegistry()
     librefs_used = set()
     libref_usage_map = {}  # For reporting where they were used
 
@@ -41,8 +43,7 @@ def main():
         if filename.endswith(".sas"):
             path = os.path.join(base_dir, filename)
             code = read_sas_file(path)
-            found_libnames = extract_libnames(code)
-            libnames_defined.update(found_libnames)
+            libnames_defined.add_libnames(code, path, clears=False)
 
             used_librefs = extract_librefs_used(code)
             librefs_used.update(used_librefs)
@@ -53,10 +54,7 @@ def main():
                     libref_usage_map[ref] = set()
                 libref_usage_map[ref].add(filename)
 
-    # Remove built-in libnames from the check
-    librefs_used_to_check = librefs_used - BUILTIN_LIBNAMES
-
-    missing_libnames = sorted(librefs_used_to_check - libnames_defined)
+    missing_libnames = sorted(ref for ref in librefs_used if not libnames_defined.is_available(ref))
     if missing_libnames:
         print("🚨 Missing LIBNAME statements for the following librefs (potential DB connection issues):")
         for libref in missing_libnames:
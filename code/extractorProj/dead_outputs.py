@@ -0,0 +1,224 @@
+import os
+import re
+import argparse
+from collections import defaultdict, deque
+
+import pandas as pd
+
+import git_changes
+from extractor2 import TWO_LEVEL_NAME, read_sas_file, analyze_directory
+from libref_registry import PREASSIGNED_LIBREFS, is_libref_candidate
+from result_store import table_records, value
+
+# Reads extractor2 does not record: SET/UPDATE/MODIFY lists, DATA= of any PROC
+# (PRINT, SORT, MEANS, ...) and hash objects loaded with dataset: 'lib.table'
+SET_LIST_PATTERN = re.compile(r'\b(?:set|update|modify)\s+([^;]*);', re.IGNORECASE)
+DATA_OPTION_PATTERN = re.compile(r'\bdata\s*=\s*([\w&.]+)', re.IGNORECASE)
+HASH_DATASET_PATTERN = re.compile(r'\bdataset\s*:\s*["\']([\w&.]+)', re.IGNORECASE)
+SET_OPTIONS = {"end", "nobs", "point", "key", "indsname", "open", "curobs", "unique", "keyreset", "keys"}
+
+# Programs with output other than tables (reports, files, exports) are never dead
+EXTERNAL_OUTPUT_PATTERN = re.compile(
+    r'\bproc\s+(?:print|report|tabulate|sgplot|sgpanel|sgscatter|gplot|gchart|export|document)\b'
+    r'|\bods\s+(?:html|pdf|rtf|excel|csv|tagsets\.\w+|powerpoint)\b|\bfile\s+(?!=)\w+', re.IGNORECASE)
+
+
+def table_key(libref, table):
+    return f"{libref}.{table}"
+
+
+def is_permanent(libref, table):
+    """Tables that outlive the session; macro-built names cannot be matched to readers."""
+    return (libref not in PREASSIGNED_LIBREFS and "&" not in libref + table
+            and is_libref_candidate(libref, table))
+
+
+def program_reads(code):
+    """Two-level tables read by SET/UPDATE/MODIFY, DATA= and hash dataset: references."""
+    names = []
+    for match in SET_LIST_PATTERN.finditer(code):
+        datasets, nested = match.group(1), True
+        while nested:
+            # Dataset options, innermost parentheses first
+            datasets, nested = re.subn(r'\([^()]*\)', ' ', datasets)
+        datasets = re.sub(r'\b\w+\s*=\s*[\w.&]+', ' ', datasets)
+        names.extend(name for name in datasets.split() if name.lower() not in SET_OPTIONS)
+    names.extend(DATA_OPTION_PATTERN.findall(code))
+    names.extend(HASH_DATASET_PATTERN.findall(code))
+    tables = []
+    for name in names:
+        name = name.strip(".").lower()
+        # '&lib..table': the first dot ends the macro variable name
+        if TWO_LEVEL_NAME.fullmatch(name):
+            tables.append(name)
+    return list(dict.fromkeys(tables))
+
+
+def macro_name_pattern(name):
+    """
+    Regex matching the table names a macro-built name can resolve to, or None when
+    neither the libref nor the table name has a literal part ('&lib..&table').
+    """
+    parts = re.split(r'(&+\w+\.?)', name)
+    if not any(re.search(r'\w', part) for part in parts if not part.startswith("&")):
+        return None
+    return re.compile("".join(r'[\w&]*' if part.startswith("&") else re.escape(part) for part in parts))
+
+
+class DeadOutputFinder:
+    """
+    Table/program graph of a corpus: which programs write each permanent table
+    (extractor2 WRITE_BACK rows) and which read it (extractor2 input rows plus
+    program_reads). Tables nobody reads are dead; a program whose permanent
+    outputs are all dead and that writes no report or file is dead too, and its
+    reads stop counting, which can make the tables it read dead in turn. All of
+    this is one worklist pass in which every read and write edge is visited once.
+    Reads inside the writing program count, so in-place updates are never dead;
+    names built entirely from macro variables are listed in dynamic_reads instead.
+    """
+
+    def __init__(self):
+        self.writers = defaultdict(set)     # table -> programs writing it
+        self.writes = defaultdict(set)      # program -> permanent tables it writes
+        self.reads = defaultdict(set)       # program -> tables it reads
+        self.steps = defaultdict(list)      # table -> [(program, statement, write_back_type)]
+        self.external = set()               # programs with reports, exports or files
+        self.dynamic_reads = defaultdict(set)  # program -> fully macro-built names it reads
+
+    def add_rows(self, rows):
+        for row in rows:
+            program = value(row, "file_path")
+            if value(row, "export proc"):
+                self.external.add(program)
+            for libref, table, role in table_records(row):
+                key = table_key(libref, table)
+                if role == "read":
+                    self.add_read(program, key)
+                elif value(row, "WRITE_BACK") == "Yes" and is_permanent(libref, table):
+                    self.writers[key].add(program)
+                    self.writes[program].add(key)
+                    self.steps[key].append((program, value(row, "statement"), value(row, "write_back_type")))
+
+    def add_read(self, program, table):
+        self.reads[program].add(table)
+
+    def add_code(self, program, code):
+        for table in program_reads(code):
+            self.add_read(program, table)
+        if EXTERNAL_OUTPUT_PATTERN.search(code):
+            self.external.add(program)
+
+    def resolved_reads(self):
+        """
+        program -> tables read, where a macro-built name such as '&lib..sales' or
+        'lib.&table' reads every written table it could resolve to.
+        """
+        reads = {program: set(tables) for program, tables in self.reads.items()}
+        for program, tables in self.reads.items():
+            for name in tables:
+                if "&" not in name:
+                    continue
+                pattern = macro_name_pattern(name)
+                if pattern is None:
+                    # Could be any table: reported instead of keeping every table alive
+                    self.dynamic_reads[program].add(name)
+                    continue
+                reads[program].update(table for table in self.writers if pattern.fullmatch(table))
+        return reads
+
+    def find(self):
+        """(dead tables, dead programs): table -> reason, program -> its dead tables."""
+        reads = self.resolved_reads()
+        live_readers = defaultdict(int)
+        for program, tables in reads.items():
+            for table in tables:
+                live_readers[table] += 1
+        live_readers = {table: live_readers[table] for table in self.writers}
+        pending = {program: len(tables) for program, tables in self.writes.items()}
+        dead_tables, dead_programs = {}, {}
+        queue = deque(table for table, count in live_readers.items() if count == 0)
+        for table in queue:
+            dead_tables[table] = "never read"
+
+        while queue:
+            table = queue.popleft()
+            for program in self.writers[table]:
+                pending[program] -= 1
+                if pending[program] or program in self.external:
+                    continue
+                dead_programs[program] = sorted(self.writes[program])
+                for read in reads.get(program, ()):
+                    if read not in live_readers or read in dead_tables:
+                        continue
+                    live_readers[read] -= 1
+                    if live_readers[read] == 0:
+                        dead_tables[read] = "read only by dead programs"
+                        queue.append(read)
+        return dead_tables, dead_programs
+
+    def report(self):
+        """DataFrames of dead tables, the steps producing them and dead programs."""
+        dead_tables, dead_programs = self.find()
+        readers = defaultdict(set)
+        for program, tables in self.resolved_reads().items():
+            for table in tables & dead_tables.keys():
+                readers[table].add(program)
+        tables = [{
+            "table": table,
+            "reason": reason,
+            "written_by": ", ".join(sorted(os.path.basename(p) for p in self.writers[table])),
+            "readers": ", ".join(sorted(os.path.basename(p) for p in readers[table])),
+            "write_back_types": ", ".join(sorted({kind for _, _, kind in self.steps[table] if kind})),
+        } for table, reason in sorted(dead_tables.items())]
+        steps = [{
+            "file_path": program,
+            "statement": statement,
+            "write_back_type": kind,
+            "table": table,
+            "PROGRAM_DEAD": "Yes" if program in dead_programs else "No",
+        } for table in sorted(dead_tables) for program, statement, kind in self.steps[table]]
+        programs = [{
+            "file_path": program,
+            "dead_tables": ", ".join(tables_written),
+            "tables_read": ", ".join(sorted(self.reads.get(program, ()))),
+        } for program, tables_written in sorted(dead_programs.items())]
+        return pd.DataFrame(tables), pd.DataFrame(steps), pd.DataFrame(programs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find permanent tables no program reads and the jobs producing them.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--lineage", help="Existing extractor2 output to use (default: analyze --base-dir)")
+    parser.add_argument("--output", default="dead_outputs.xlsx", help="Excel file to write")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    rows = pd.read_excel(args.lineage).to_dict("records") if args.lineage else analyze_directory(args.base_dir)
+    finder = DeadOutputFinder()
+    finder.add_rows(rows)
+    for filename in sorted(os.listdir(args.base_dir)):
+        if git_changes.is_sas_file(filename):
+            path = os.path.join(args.base_dir, filename)
+            finder.add_code(path, read_sas_file(path))
+
+    tables, steps, programs = finder.report()
+    print(f"\n🪦 {len(tables)} of {len(finder.writers)} permanent tables are never consumed, "
+          f"{len(programs)} programs only produce them")
+    for _, row in tables.iterrows():
+        print(f"  {row['table']:<35} {row['reason']:<28} written by {row['written_by']}")
+    for _, row in programs.iterrows():
+        print(f"  🚨 {os.path.basename(row['file_path'])}: only writes {row['dead_tables']}")
+    for program, names in sorted(finder.dynamic_reads.items()):
+        print(f"  ⚠️ {os.path.basename(program)} reads {', '.join(sorted(names))}, which may be any of these tables")
+
+    with pd.ExcelWriter(args.output) as writer:
+        tables.to_excel(writer, sheet_name="dead_tables", index=False)
+        steps.to_excel(writer, sheet_name="dead_steps", index=False)
+        programs.to_excel(writer, sheet_name="dead_programs", index=False)
+    print(f"\n✅ Wrote {len(tables)} tables into '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,46 @@
 import os
 import re
+import argparse
+import hashlib
 import pandas as pd
 
+import git_changes
+import result_store
+from libref_registry import DB_ENGINES, PREASSIGNED_LIBREFS, LibrefRegistry
+from sql_parser import parse_sql, walk
+
 CONTROL_KEYWORDS = {
     "if", "then", "else", "do", "end", "put", "goto", "abort", "return",
     "symdel", "until", "while", "scan", "substr", "eval", "upcase", "lowcase",
     "index", "find", "length", "sysfunc", "sysget"
 }
 
+DB_SYNTAX_PATTERNS = [
+    (r'bulk\s+insert', 'SQL Server bulk insert without connection'),
+    (r'exec\s+sp_', 'SQL Server stored procedure without connection'),
+    (r'exec\s+dbms_', 'Oracle DBMS package without connection'),
+    (r'select\s+.*?\s+from\s+dual', 'Oracle DUAL table without connection')
+]
+
+# Query tree statement -> (statement text, write_back_type) for PROC SQL write-backs
+SQL_WRITE_BACK_TYPES = {
+    "create table": ("create table", "PROC_SQL_CREATE"),
+    "insert": ("insert into", "PROC_SQL_INSERT"),
+}
+
+# libref.table, where either part may come from a macro variable ('&lib..orders')
+TWO_LEVEL_NAME = re.compile(r'[\w&]+\.\.?[\w&]+')
+
 def read_sas_file(filepath):
     with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
         content = f.read()
+    return strip_comments(content)
+
+def normalize_newlines(content):
+    # Same line endings as the text-mode open() in read_sas_file
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+def strip_comments(content):
     content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
     content = re.sub(r'^\s*\*.*?;', '', content, flags=re.MULTILINE)
     return content
@@ -86,36 +116,30 @@ def extract_all_blocks(code, filepath):
             "file_path": filepath
         })
         
-        # Look for CREATE TABLE statements
-        for match in re.finditer(r'create\s+table\s+((?:[\w&]+\.)?[\w&]+)', sql_block, flags=re.IGNORECASE):
-            table_name = match.group(1)
-            rows.append({
-                "statement": f"create table {table_name}",
-                "output_table": table_name,
-                "WRITE_BACK": "Yes",
-                "write_back_type": "PROC_SQL_CREATE",
-                "file_path": filepath
-            })
-        
-        # Look for INSERT INTO statements
-        for match in re.finditer(r'insert\s+into\s+((?:[\w&]+\.)?[\w&]+)', sql_block, flags=re.IGNORECASE):
-            table_name = match.group(1)
-            rows.append({
-                "statement": f"insert into {table_name}",
-                "output_table": table_name,
-                "WRITE_BACK": "Yes",
-                "write_back_type": "PROC_SQL_INSERT",
-                "file_path": filepath
-            })
+        for query in parse_sql(sql_block):
+            if query["statement"] in SQL_WRITE_BACK_TYPES:
+                keyword, write_back_type = SQL_WRITE_BACK_TYPES[query["statement"]]
+                for table_name in query["targets"]:
+                    rows.append({
+                        "statement": f"{keyword} {table_name}",
+                        "output_table": table_name,
+                        "WRITE_BACK": "Yes",
+                        "write_back_type": write_back_type,
+                        "file_path": filepath
+                    })
 
-        # FROM / JOIN inputs (keep existing - these are NOT write-backs)
-        for keyword, libref, table in re.findall(r'(from|join)\s+(\w+)\.(\w+)', sql_block, flags=re.IGNORECASE):
-            rows.append({
-                "statement": f"{keyword.lower()} {libref}.{table}",
-                "Input tables": f"{libref}.{table}",
-                "tables_sourcejoin": table,
-                "file_path": filepath
-            })
+            # FROM / JOIN inputs, subqueries included (these are NOT write-backs)
+            for node in walk(query):
+                for source in node["sources"]:
+                    if not source["table"] or not TWO_LEVEL_NAME.fullmatch(source["table"]):
+                        continue
+                    keyword = "join" if source["join"] not in (None, "comma") else "from"
+                    rows.append({
+                        "statement": f"{keyword} {source['table']}",
+                        "Input tables": source["table"],
+                        "tables_sourcejoin": source["table"].rsplit(".", 1)[1],
+                        "file_path": filepath
+                    })
         
     # PROC SORT with OUT= (NEW)
     for match in re.finditer(r'proc\s+sort\s+data\s*=\s*([\w&\.]+).*?out\s*=\s*([\w&\.]+)', code, flags=re.IGNORECASE | re.DOTALL):
@@ -247,14 +271,15 @@ def detect_database_connections(code, filepath):
     }
     
     # 1. LIBNAME statements with database engines
-    db_engines = ['oracle', 'teradata', 'mysql', 'postgres', 'sqlserver', 'db2', 'netezza', 'sybase', 'odbc', 'oledb']
+    db_librefs = LibrefRegistry()
     
     for match in re.finditer(r'libname\s+(\w+)\s+(\w+)(?:\s+.*?)?;', code, flags=re.IGNORECASE | re.DOTALL):
         libref = match.group(1)
         engine = match.group(2).lower()
         
-        if engine in db_engines:
+        if engine in DB_ENGINES:
             found_connections['libname'].append(libref)
+            db_librefs.define(libref, engine, file_path=filepath, line=code.count("\n", 0, match.start()) + 1)
             rows.append({
                 "statement": f"libname {libref} {engine}",
                 "DB_CONNECTION": "Yes",
@@ -285,14 +310,14 @@ def detect_database_connections(code, filepath):
         table = match.group(2)
         
         # Skip common SAS libraries
-        if libref not in ['work', 'sashelp', 'sasuser', 'webwork']:
+        if libref not in PREASSIGNED_LIBREFS:
             db_table_refs.append((libref, table, match.group(0)))
     
     # 4. Check for missing connections
     for libref, table, statement in db_table_refs:
         # Check if this library has a connection defined
         has_connection = (
-            libref in [lib.lower() for lib in found_connections['libname']] or
+            libref in db_librefs or
             any(conn in statement.lower() for conn in found_connections['proc_sql_connect'])
         )
         
@@ -328,14 +353,7 @@ def detect_database_connections(code, filepath):
                 })
     
     # 6. Look for database-specific syntax without connections
-    db_syntax_patterns = [
-        (r'bulk\s+insert', 'SQL Server bulk insert without connection'),
-        (r'exec\s+sp_', 'SQL Server stored procedure without connection'),
-        (r'exec\s+dbms_', 'Oracle DBMS package without connection'),
-        (r'select\s+.*?\s+from\s+dual', 'Oracle DUAL table without connection')
-    ]
-    
-    for pattern, description in db_syntax_patterns:
+    for pattern, description in DB_SYNTAX_PATTERNS:
         for match in re.finditer(pattern, code, flags=re.IGNORECASE):
             rows.append({
                 "statement": match.group(0),
@@ -357,25 +375,104 @@ def detect_database_connections(code, filepath):
     
     return rows
 
-def main():
-    base_dir = "SAS Files"
+def analyze_directory(base_dir):
     all_results = []
-
-    if not os.path.isdir(base_dir):
-        print("❌ 'SAS Files' folder not found.")
-        return
+    parsed = {}  # content hash -> (first file with that content, its rows)
+    total_files = 0
 
     for filename in os.listdir(base_dir):
-        if filename.endswith(".sas"):
+        if git_changes.is_sas_file(filename):
             path = os.path.join(base_dir, filename)
+            total_files += 1
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+
+            # Byte-identical copies are parsed once; only file_path differs in their rows
+            if digest in parsed:
+                original, rows = parsed[digest]
+                print(f"♻️ Duplicate of {os.path.basename(original)}: {filename}")
+                all_results.extend(dict(row, file_path=path) for row in rows)
+                continue
+
             print(f"📄 Processing: {filename}")
-            code = read_sas_file(path)
-            all_results.extend(extract_all_blocks(code, path))
+            content = normalize_newlines(raw.decode("utf-8", errors="ignore"))
+            rows = extract_all_blocks(strip_comments(content), path)
+            parsed[digest] = (path, rows)
+            all_results.extend(rows)
+
+    if total_files:
+        duplicates = total_files - len(parsed)
+        print(f"\n♻️ Dedup: {len(parsed)} unique of {total_files} files "
+              f"({duplicates / total_files:.0%} of parsing skipped)")
+    return all_results
+
+def analyze_revisions(base_dir, old_rev, new_rev, output_file):
+    """
+    Incremental mode: reparses only the .sas files changed between two git
+    revisions and updates the previous output in place.
+    """
+    changes = git_changes.list_changed_sas_files(base_dir, old_rev, new_rev)
+
+    # Mirror the full scan, which only looks at files directly inside base_dir
+    def in_scope(name):
+        return os.path.dirname(name) == ""
+
+    to_parse = [name for name in changes["added"] + changes["modified"] if in_scope(name)]
+    to_parse += [new for _, new in changes["renamed"] if in_scope(new)]
+    to_drop = [name for name in changes["deleted"] + changes["modified"] if in_scope(name)]
+    to_drop += [old for old, _ in changes["renamed"] if in_scope(old)]
+    to_drop += to_parse
+
+    print(f"🔀 {old_rev}..{new_rev}: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+          f"{len(changes['deleted'])} deleted, {len(changes['renamed'])} renamed")
+
+    if os.path.isfile(output_file):
+        previous = pd.read_excel(output_file)
+    else:
+        print(f"⚠️ '{output_file}' not found, starting from an empty analysis.")
+        previous = pd.DataFrame(columns=["file_path"])
+
+    stale_paths = {os.path.join(base_dir, name) for name in to_drop}
+    kept = previous[~previous["file_path"].isin(stale_paths)]
+
+    new_results = []
+    for name in to_parse:
+        print(f"📄 Processing: {name}")
+        code = strip_comments(normalize_newlines(git_changes.read_file_at_revision(base_dir, new_rev, name)))
+        new_results.extend(extract_all_blocks(code, os.path.join(base_dir, name)))
+
+    df = pd.concat([kept, pd.DataFrame(new_results)], ignore_index=True, sort=False)
+    print(f"🗑️ Removed {len(previous) - len(kept)} stale rows, added {len(new_results)} rows")
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract migration metadata from SAS programs.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--output", default="final_analysis.xlsx", help="Excel file to write")
+    parser.add_argument("--since", help="Incremental mode: git revision of the previous analysis")
+    parser.add_argument("--until", default="HEAD", help="Incremental mode: git revision to analyze (default: HEAD)")
+    parser.add_argument("--sqlite", help="Also write the results to this SQLite store")
+    args = parser.parse_args()
+
+    base_dir = args.base_dir
+
+    if not os.path.isdir(base_dir):
+        print(f"❌ '{base_dir}' folder not found.")
+        return
+
+    if args.since:
+        df = analyze_revisions(base_dir, args.since, args.until, args.output)
+    else:
+        df = pd.DataFrame(analyze_directory(base_dir))
 
-    df = pd.DataFrame(all_results)
     #print(f"\n📊 Total cols extracted: {df.columns.tolist()}")
-    df.to_excel("final_analysis.xlsx", index=False)
-    print(f"\n✅ Done! Extracted {len(all_results)} rows into 'final_analysis.xlsx'")
+    df.to_excel(args.output, index=False)
+    print(f"\n✅ Done! Wrote {len(df)} rows into '{args.output}'")
+
+    if args.sqlite:
+        result_store.save_results(args.sqlite, df)
+        print(f"🗄️ Results stored in '{args.sqlite}'")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
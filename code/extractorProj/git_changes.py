@@ -0,0 +1,70 @@
+import subprocess
+
+SAS_EXTENSION = ".sas"
+
+
+def run_git(repo_dir, *args):
+    """Run a git command inside repo_dir and return its raw stdout (bytes)."""
+    result = subprocess.run(
+        ["git", "-C", repo_dir, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True
+    )
+    return result.stdout
+
+
+def is_sas_file(path):
+    """Case-insensitive, so full scans and incremental runs see the same files."""
+    return path.lower().endswith(SAS_EXTENSION)
+
+
+def list_changed_sas_files(base_dir, old_rev, new_rev):
+    """
+    Lists the .sas files that changed between two revisions.
+    Paths are relative to base_dir (git diff --relative), so they line up with
+    the file names used by a full directory scan.
+    Returns a dict with 'added', 'modified', 'deleted' lists and a 'renamed'
+    list of (old_path, new_path) pairs.
+    """
+    changes = {"added": [], "modified": [], "deleted": [], "renamed": []}
+
+    output = run_git(base_dir, "diff", "--name-status", "-z", "-M", "--relative",
+                     old_rev, new_rev, "--", ".")
+    fields = output.decode("utf-8", errors="ignore").split("\0")
+
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in ("R", "C"):
+            old_path, new_path = fields[i + 1], fields[i + 2]
+            i += 3
+        else:
+            old_path = new_path = fields[i + 1]
+            i += 2
+
+        if status == "R":
+            # A rename may move a file in or out of the .sas set (e.g. .txt -> .sas)
+            if is_sas_file(old_path) and is_sas_file(new_path):
+                changes["renamed"].append((old_path, new_path))
+            elif is_sas_file(new_path):
+                changes["added"].append(new_path)
+            elif is_sas_file(old_path):
+                changes["deleted"].append(old_path)
+        elif not is_sas_file(new_path):
+            continue
+        elif status in ("A", "C"):
+            changes["added"].append(new_path)
+        elif status == "D":
+            changes["deleted"].append(old_path)
+        else:
+            # M (modified) and T (type change) both need a reparse
+            changes["modified"].append(new_path)
+
+    return changes
+
+
+def read_file_at_revision(base_dir, rev, path):
+    """Returns the text of path (relative to base_dir) as it was at rev."""
+    content = run_git(base_dir, "show", f"{rev}:./{path}")
+    return content.decode("utf-8", errors="ignore")
@@ -0,0 +1,138 @@
+import re
+
+# Libraries SAS assigns in every session
+PREASSIGNED_LIBREFS = frozenset({"work", "sashelp", "sasuser", "maps", "webwork", "dictionary"})
+
+DB_ENGINES = frozenset({'oracle', 'teradata', 'mysql', 'postgres', 'sqlserver', 'db2', 'netezza', 'sybase',
+                        'odbc', 'oledb', 'hadoop', 'impala', 'snowflake', 'redshift', 'bigquery', 'spark',
+                        'saphana', 'vertica', 'greenplm'})
+
+# Format/informat names: "date9.", "best12.", "dollar12.2" look like libref.member to a regex
+FORMAT_STEMS = frozenset({
+    "best", "bestd", "comma", "commax", "dollar", "dollarx", "euro", "eurox", "percent", "percentn", "z", "f",
+    "char", "date", "datetime", "dateampm", "time", "timeampm", "tod", "hhmm", "hour", "mmss", "ddmmyy",
+    "ddmmyyb", "ddmmyyc", "ddmmyyd", "ddmmyyn", "ddmmyyp", "ddmmyys", "mmddyy", "mmddyyb", "mmddyyc", "mmddyyd",
+    "mmddyyn", "mmddyyp", "mmddyys", "yymmdd", "yymmddb", "yymmddc", "yymmddd", "yymmddn", "yymmddp", "yymmdds",
+    "yymm", "yymon", "yyq", "yyqr", "monyy", "monname", "month", "mmyy", "weekdate", "weekday", "worddate",
+    "worddatx", "downame", "julian", "qtr", "year", "anydtdte", "anydtdtm", "is8601da", "is8601dt", "e8601da",
+    "e8601dt", "nldate", "nldatm", "hex", "binary", "octal", "roman", "words", "wordf", "negparen", "pvalue",
+    "ssn", "zip", "upcase", "quote", "trailsgn", "nlnum", "numx", "ib", "pd", "pk", "rb", "s370ff",
+})
+
+# Hash/iterator object methods: h.output(...) is a call, mart.output a table
+HASH_METHODS = frozenset({
+    "definekey", "definedata", "definedone", "find", "find_next", "find_prev", "add", "replace", "remove",
+    "check", "output", "clear", "delete", "first", "last", "next", "prev", "num_items", "sum", "ref", "setcur",
+})
+
+# File extensions: setup.sas, report.xlsx
+FILE_EXTENSIONS = frozenset({
+    "csv", "txt", "xls", "xlsx", "xlsm", "sas", "sas7bdat", "sas7bcat", "dat", "log", "lst", "pdf", "html", "htm",
+    "rtf", "xml", "json", "zip", "gz", "png", "jpg", "svg", "doc", "docx", "ppt", "pptx", "tsv", "prn",
+})
+
+# BY-group variables (first.id, last.id) and automatic object names
+NON_LIBREFS = frozenset({"first", "last", "_null_", "_data_", "_last_"})
+
+_TRAILING_DIGITS = re.compile(r'\d+$')
+
+
+def is_libref_candidate(libref, member="", method_call=False):
+    """
+    False for numbers, format names, BY-group variables and file names, and for
+    object method calls when the reference is followed by '(' (method_call).
+    """
+    libref = libref.lower()
+    if not libref or libref[0].isdigit() or libref in NON_LIBREFS:
+        return False
+    member = member.lower()
+    # A format is name. or nameW.D; year2020.sales and date1.x are tables
+    if _TRAILING_DIGITS.sub("", libref) in FORMAT_STEMS and (not member or member.isdigit()):
+        return False
+    return member not in FILE_EXTENSIONS and not (method_call and member in HASH_METHODS)
+
+
+class LibrefRegistry:
+    """
+    Normalized librefs with their engine, options and definition sites.
+    Lookups go through a dict keyed by lower-cased libref, so membership and
+    scope checks are constant time however many references are checked.
+    """
+
+    def __init__(self):
+        self.entries = {}   # libref -> {"engine", "options", "path", "sites": [(file_path, line)]}
+
+    @classmethod
+    def from_code(cls, code, filepath=None, db_only=False, clears=True):
+        registry = cls()
+        registry.add_libnames(code, filepath, db_only, clears)
+        return registry
+
+    def add_libnames(self, code, filepath=None, db_only=False, clears=True):
+        """
+        Applies the LIBNAME statements of a program in order. Corpus-wide collectors
+        pass clears=False: a program clearing its librefs at the end still defines them.
+        """
+        for match in re.finditer(r'\blibname\s+(\w+)\b\s*((?:"[^"]*"|\'[^\']*\'|[^;"\'])*);', code, flags=re.IGNORECASE):
+            line = code.count("\n", 0, match.start()) + 1
+            self.apply_libname(match.group(1), match.group(2), filepath, line, db_only, clears)
+
+    def apply_libname(self, libref, args, file_path=None, line=None, db_only=False, clears=True):
+        """One LIBNAME statement: the arguments after the libref decide define, CLEAR or LIST."""
+        args = args.strip()
+        engine = re.match(r'\w*', args).group(0).lower()
+        if engine == "clear":
+            if not clears:
+                return None
+            if libref.lower() == "_all_":
+                self.entries.clear()
+            else:
+                self.clear(libref)
+            return None
+        if not args or engine == "list":
+            return None
+        # libname x "path"; uses the default engine
+        options = args[len(engine):].strip()
+        engine = engine or "base"
+        if db_only and engine not in DB_ENGINES:
+            return None
+        return self.define(libref, engine, options, file_path, line)
+
+    def define(self, libref, engine, options="", file_path=None, line=None):
+        libref = libref.lower()
+        path = re.match(r'\s*(["\'])(.*?)\1', options or "")
+        entry = self.entries.get(libref)
+        if entry is None:
+            entry = self.entries[libref] = {"engine": engine, "options": options, "path": None, "sites": []}
+        entry["engine"], entry["options"] = engine, options
+        # The physical location of file-based engines; DB engines quote connection strings instead
+        entry["path"] = path.group(2) if path and engine not in DB_ENGINES else None
+        entry["sites"].append((file_path, line))
+        return entry
+
+    def clear(self, libref):
+        self.entries.pop(libref.lower(), None)
+
+    def __contains__(self, libref):
+        return libref.lower() in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, libref):
+        return self.entries.get(libref.lower())
+
+    def engine(self, libref):
+        entry = self.entries.get(libref.lower())
+        return entry["engine"] if entry else None
+
+    def is_database(self, libref):
+        return self.engine(libref) in DB_ENGINES
+
+    def is_available(self, libref):
+        """Assigned in this registry or preassigned by SAS."""
+        libref = libref.lower()
+        return libref in PREASSIGNED_LIBREFS or libref in self.entries
@@ -0,0 +1,262 @@
+import argparse
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS statements (
+    statement_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    statement TEXT,
+    kind TEXT
+);
+CREATE TABLE IF NOT EXISTS tables (
+    statement_id INTEGER NOT NULL REFERENCES statements(statement_id),
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    libref TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS macros (
+    statement_id INTEGER NOT NULL REFERENCES statements(statement_id),
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    macro_name TEXT NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS connections (
+    statement_id INTEGER NOT NULL REFERENCES statements(statement_id),
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    libref TEXT,
+    engine TEXT,
+    connection_type TEXT,
+    missing INTEGER NOT NULL DEFAULT 0,
+    issue TEXT
+);
+CREATE TABLE IF NOT EXISTS includes (
+    statement_id INTEGER NOT NULL REFERENCES statements(statement_id),
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    include_path TEXT NOT NULL,
+    dependency_exists INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_statements_file ON statements(file_id);
+CREATE INDEX IF NOT EXISTS idx_tables_name ON tables(table_name);
+CREATE INDEX IF NOT EXISTS idx_tables_libref ON tables(libref, table_name);
+CREATE INDEX IF NOT EXISTS idx_tables_file ON tables(file_id);
+CREATE INDEX IF NOT EXISTS idx_macros_name ON macros(macro_name);
+CREATE INDEX IF NOT EXISTS idx_macros_file ON macros(file_id);
+CREATE INDEX IF NOT EXISTS idx_connections_libref ON connections(libref);
+CREATE INDEX IF NOT EXISTS idx_connections_file ON connections(file_id);
+CREATE INDEX IF NOT EXISTS idx_includes_file ON includes(file_id);
+"""
+
+CHILD_TABLES = ["tables", "macros", "connections", "includes"]
+
+# write_back_type -> role stored in the tables table
+WRITE_ROLES = {
+    "PROC_SQL_CREATE": "create",
+    "PROC_SQL_INSERT": "append",
+    "PROC_APPEND": "append",
+}
+
+
+def open_store(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def value(row, key):
+    """Returns a row value, treating missing keys and NaN (from Excel round trips) as None."""
+    val = row.get(key)
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return None
+    return val
+
+
+def split_table_name(name):
+    """Normalizes 'LIB.Table' -> ('lib', 'table'); one-level names live in WORK."""
+    name = str(name).strip().lower()
+    if "." in name:
+        libref, table = name.split(".", 1)
+        return libref, table
+    return "work", name
+
+
+def statement_kind(row):
+    for key in ("write_back_type", "connection_type"):
+        if value(row, key):
+            return value(row, key)
+    for key, kind in [("INCLUDE_PATH", "INCLUDE"), ("LET_STATEMENT", "LET"), ("MACRO_DEF", "MACRO_DEF"),
+                      ("MACRO_CALL", "MACRO_CALL"), ("MISSING_CONNECTION", "MISSING_CONNECTION"),
+                      ("PROC_SQL", "PROC_SQL"), ("import proc", "PROC_IMPORT"), ("export proc", "PROC_EXPORT"),
+                      ("Input tables", "INPUT"), ("tables_sourcejoin", "MERGE")]:
+        if value(row, key):
+            return kind
+    return None
+
+
+def table_records(row):
+    """Yields (libref, table_name, role) for every table a row references."""
+    if value(row, "WRITE_BACK") == "Yes" and value(row, "output_table"):
+        role = WRITE_ROLES.get(value(row, "write_back_type"), "write")
+        # DATA statements can list several outputs, each with its own (options)
+        for name in re.sub(r'\([^)]*\)', ' ', str(value(row, "output_table"))).split():
+            yield split_table_name(name) + (role,)
+    elif value(row, "import proc") and value(row, "output_table"):
+        yield split_table_name(value(row, "output_table")) + ("write",)
+
+    if value(row, "Input tables") and not value(row, "import proc"):
+        yield split_table_name(value(row, "Input tables")) + ("read",)
+    elif value(row, "tables_sourcejoin") and str(value(row, "statement")).lower().startswith("merge"):
+        for name in str(value(row, "tables_sourcejoin")).split(","):
+            if name.strip():
+                yield split_table_name(name) + ("read",)
+
+    if value(row, "export proc"):
+        yield split_table_name(str(value(row, "statement")).split("=", 1)[-1]) + ("read",)
+    if value(row, "referenced_table"):
+        # Missing-connection rows keep the keyword that referenced the table
+        keyword = str(value(row, "statement")).split()[0].lower()
+        role = {"data": "write", "into": "append"}.get(keyword, "read")
+        yield split_table_name(value(row, "referenced_table")) + (role,)
+
+
+def save_results(db_path, rows, file_paths=None):
+    """
+    Writes extractor2 rows (list of dicts or a DataFrame) into the SQLite store.
+    When file_paths is given only those files are replaced, otherwise the whole
+    store is rewritten. Everything happens in one transaction with batched inserts.
+    """
+    if isinstance(rows, pd.DataFrame):
+        rows = rows.to_dict("records")
+
+    conn = open_store(db_path)
+    try:
+        with conn:
+            if file_paths is None:
+                for table in CHILD_TABLES + ["statements", "files"]:
+                    conn.execute(f"DELETE FROM {table}")
+            else:
+                delete_files(conn, file_paths)
+
+            file_ids = {}
+            next_statement_id = conn.execute("SELECT COALESCE(MAX(statement_id), 0) FROM statements").fetchone()[0]
+            batches = {name: [] for name in ["statements"] + CHILD_TABLES}
+
+            for row in rows:
+                file_path = value(row, "file_path")
+                if file_path is None:
+                    continue
+                if file_path not in file_ids:
+                    conn.execute("INSERT OR IGNORE INTO files(file_path) VALUES (?)", (file_path,))
+                    file_ids[file_path] = conn.execute(
+                        "SELECT file_id FROM files WHERE file_path = ?", (file_path,)).fetchone()[0]
+                file_id = file_ids[file_path]
+
+                next_statement_id += 1
+                sid = next_statement_id
+                batches["statements"].append((sid, file_id, value(row, "statement"), statement_kind(row)))
+
+                for libref, table, role in table_records(row):
+                    batches["tables"].append((sid, file_id, libref, table, role))
+
+                for key, kind in [("MACRO_DEF", "DEF"), ("MACRO_CALL", "CALL"), ("LET_STATEMENT", "LET")]:
+                    if value(row, key):
+                        batches["macros"].append((sid, file_id, str(value(row, key)).lower(), kind))
+
+                if value(row, "DB_CONNECTION") == "Yes" or value(row, "MISSING_CONNECTION") == "Yes":
+                    libref = value(row, "libref")
+                    batches["connections"].append((
+                        sid, file_id, libref.lower() if libref else None, value(row, "engine"),
+                        value(row, "connection_type"), 1 if value(row, "MISSING_CONNECTION") == "Yes" else 0,
+                        value(row, "connection_issue")
+                    ))
+
+                if value(row, "INCLUDE_PATH"):
+                    exists = value(row, "DEPENDENCY_EXISTS")
+                    batches["includes"].append((sid, file_id, value(row, "INCLUDE_PATH"),
+                                                None if exists is None else int(exists == "Yes")))
+
+                if len(batches["statements"]) >= BATCH_SIZE:
+                    flush(conn, batches)
+            flush(conn, batches)
+    finally:
+        conn.close()
+
+
+def delete_files(conn, file_paths):
+    for file_path in file_paths:
+        found = conn.execute("SELECT file_id FROM files WHERE file_path = ?", (file_path,)).fetchone()
+        if not found:
+            continue
+        for table in CHILD_TABLES + ["statements"]:
+            conn.execute(f"DELETE FROM {table} WHERE file_id = ?", found)
+        conn.execute("DELETE FROM files WHERE file_id = ?", found)
+
+
+def flush(conn, batches):
+    inserts = {
+        "statements": "INSERT INTO statements(statement_id, file_id, statement, kind) VALUES (?, ?, ?, ?)",
+        "tables": "INSERT INTO tables(statement_id, file_id, libref, table_name, role) VALUES (?, ?, ?, ?, ?)",
+        "macros": "INSERT INTO macros(statement_id, file_id, macro_name, kind) VALUES (?, ?, ?, ?)",
+        "connections": "INSERT INTO connections(statement_id, file_id, libref, engine, connection_type, missing, issue) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        "includes": "INSERT INTO includes(statement_id, file_id, include_path, dependency_exists) VALUES (?, ?, ?, ?)",
+    }
+    # Parents first so the child rows always point at existing statements
+    for name in ["statements"] + CHILD_TABLES:
+        if batches[name]:
+            conn.executemany(inserts[name], batches[name])
+            batches[name].clear()
+
+
+def find_table_references(conn, pattern, roles=None):
+    """
+    Looks up 'LIB.TABLE' patterns ('*' and '?' wildcards allowed, e.g. 'ORALIB.*').
+    Names are stored lower-case, so GLOB can use the (libref, table_name) index.
+    Returns (file_path, statement, libref, table_name, role) tuples.
+    """
+    libref, table = split_table_name(pattern)
+    query = ("SELECT f.file_path, s.statement, t.libref, t.table_name, t.role FROM tables t "
+             "JOIN files f ON f.file_id = t.file_id JOIN statements s ON s.statement_id = t.statement_id "
+             "WHERE t.libref GLOB ? AND t.table_name GLOB ?")
+    params = [libref, table]
+    if roles:
+        query += f" AND t.role IN ({', '.join('?' for _ in roles)})"
+        params.extend(roles)
+    return conn.execute(query + " ORDER BY f.file_path", params).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the SQLite result store written by extractor2.py --sqlite")
+    parser.add_argument("database", help="SQLite file")
+    parser.add_argument("pattern", help="Table pattern, e.g. ORALIB.* or work.customer_?")
+    parser.add_argument("--role", action="append", choices=["read", "write", "create", "append"],
+                        help="Only show references with this role (repeatable)")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.database):
+        print(f"❌ '{args.database}' not found.")
+        return
+
+    conn = sqlite3.connect(args.database)
+    try:
+        matches = find_table_references(conn, args.pattern, args.role)
+    finally:
+        conn.close()
+
+    for file_path, statement, libref, table, role in matches:
+        print(f"{role:<7} {libref}.{table:<30} {file_path}: {statement}")
+    print(f"\n✅ {len(matches)} references to '{args.pattern}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import os
+import re
+import bisect
+import argparse
+import pandas as pd
+
+from extractor2 import read_sas_file
+from libref_registry import LibrefRegistry
+
+# Session events, matched in program order
+EVENT_PATTERN = re.compile(r"""
+      \blibname\s+(?P<libname>\w+)\s*(?P<libname_args>[^;]*);
+    | \bconnect\s+to\s+(?P<connect>\w+)(?:\s+as\s+(?P<alias>\w+))?
+    | \bdisconnect\s+from\s+(?P<disconnect>\w+)
+    | \bconnection\s+to\s+(?P<connection_use>\w+)
+    | \bexecute\s*(?P<execute>\()
+    | %include\s+(?P<include>"[^"]*"|'[^']*'|\w+)
+    | \b(?:(?:from|join|data|set|merge|update|modify|into)\s+|(?:data|out|base)\s*=\s*)
+        (?P<ref_lib>\w+)\.(?P<ref_table>\w+)
+""", re.IGNORECASE | re.VERBOSE | re.DOTALL)
+EXECUTE_BY_PATTERN = re.compile(r"\s*by\s+(\w+)", re.IGNORECASE)
+
+
+def matching_parens(code):
+    """Offset of each '(' -> offset of its ')', in one pass that skips quoted text."""
+    pairs, stack, quote = {}, [], None
+    for i, char in enumerate(code):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            stack.append(i)
+        elif char == ")" and stack:
+            pairs[stack.pop()] = i
+    return pairs
+
+
+class SessionSimulator:
+    """
+    Replays SAS programs in the order they run in one session, following %include
+    chains, and tracks which librefs and pass-through connections are active at
+    every table reference. Active librefs live in a LibrefRegistry and connections
+    in a dict keyed by lower-cased name, so each check is a single lookup.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.files_by_name = {}   # lower-cased file name -> path, for %include lookups
+        if os.path.isdir(base_dir):
+            for filename in os.listdir(base_dir):
+                if filename.lower().endswith(".sas"):
+                    self.files_by_name[filename.lower()] = os.path.join(base_dir, filename)
+        self.code_cache = {}      # path -> (code, newline offsets, paren pairs), each file is read once
+        self.reset()
+
+    def reset(self):
+        """Start a new session."""
+        self.librefs = LibrefRegistry()
+        self.connections = {}     # connection name -> {"engine", "file_path", "line"}
+        self.findings = []
+        self.session = None
+        self.include_stack = []
+
+    def run_session(self, session, programs):
+        self.reset()
+        self.session = session
+        for program in programs:
+            path = self.locate(program)
+            if path is None:
+                self.report(program, None, "program", program, "Program in flow not found")
+                continue
+            self.run_file(path)
+        self._flag_late_assignments()
+        return self.findings
+
+    def locate(self, name):
+        name = name.strip().strip("'\"")
+        if os.path.isfile(name):
+            return name
+        if os.path.isfile(os.path.join(self.base_dir, name)):
+            return os.path.join(self.base_dir, name)
+        # %include paths usually point at another machine; match on the file name
+        return self.files_by_name.get(re.split(r"[\\/]", name)[-1].lower())
+
+    def load(self, path):
+        if path not in self.code_cache:
+            code = read_sas_file(path)
+            newlines = [i for i, char in enumerate(code) if char == "\n"]
+            self.code_cache[path] = (code, newlines, matching_parens(code))
+        return self.code_cache[path]
+
+    def run_file(self, path):
+        if path in self.include_stack:
+            self.report(path, None, "include", os.path.basename(path), "%include cycle")
+            return
+        self.include_stack.append(path)
+        code, newlines, parens = self.load(path)
+
+        position = 0
+        while True:
+            match = EVENT_PATTERN.search(code, position)
+            if match is None:
+                break
+            position = match.end()
+            line = bisect.bisect_left(newlines, match.start()) + 1
+            if match.group("execute"):
+                # EXECUTE (...) BY runs in the database: skip its body
+                close = parens.get(match.start("execute"))
+                by = EXECUTE_BY_PATTERN.match(code, close + 1) if close is not None else None
+                if by:
+                    position = by.end()
+                    self._use_connection(by.group(1), path, line)
+            elif match.group("libname"):
+                self._libname(match, path, line)
+            elif match.group("connect"):
+                engine = match.group("connect").lower()
+                name = (match.group("alias") or engine).lower()
+                self.connections[name] = {"engine": engine, "file_path": path, "line": line}
+            elif match.group("disconnect"):
+                self.connections.pop(match.group("disconnect").lower(), None)
+            elif match.group("connection_use"):
+                self._use_connection(match.group("connection_use"), path, line)
+            elif match.group("include"):
+                target = self.locate(match.group("include"))
+                if target is None:
+                    self.report(path, line, "include", match.group("include"), "Included file not found")
+                else:
+                    self.run_file(target)
+            elif match.group("ref_lib"):
+                libref = match.group("ref_lib").lower()
+                if not self.librefs.is_available(libref):
+                    self.report(path, line, "libref", libref, "Libref used before it is assigned in the session",
+                                referenced_table=f"{libref}.{match.group('ref_table')}")
+
+        self.include_stack.pop()
+
+    def _use_connection(self, name, path, line):
+        name = name.lower()
+        if name not in self.connections:
+            self.report(path, line, "connection", name, "Pass-through query without active connection")
+
+    def _libname(self, match, path, line):
+        self.librefs.apply_libname(match.group("libname"), match.group("libname_args"), path, line)
+
+    def _flag_late_assignments(self):
+        """Missing librefs that are assigned later in the session point at an ordering problem."""
+        for finding in self.findings:
+            if finding["kind"] == "libref" and finding["name"] in self.librefs:
+                later_path, later_line = self.librefs.get(finding["name"])["sites"][-1]
+                finding["issue"] = "Libref assigned only later in the session"
+                finding["assigned_in"] = f"{os.path.basename(later_path)}:{later_line}"
+
+    def report(self, path, line, kind, name, issue, **extra):
+        self.findings.append({
+            "session": self.session,
+            "file_path": path,
+            "line": line,
+            "kind": kind,
+            "name": name,
+            "issue": issue,
+            **extra,
+        })
+
+
+def read_flow(flow_file):
+    """A flow file lists the programs of one session in run order; '#' starts a comment."""
+    with open(flow_file, "r", encoding="utf-8") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [line for line in lines if line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate SAS sessions to find librefs and connections used before assignment.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--flow", action="append",
+                        help="File listing the programs of one session in run order (repeatable). "
+                             "Without it, every program is its own session, with its %%include chain.")
+    parser.add_argument("--output", default="session_findings.xlsx", help="Excel file to write")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    simulator = SessionSimulator(args.base_dir)
+    if args.flow:
+        sessions = [(flow, read_flow(flow)) for flow in args.flow]
+    else:
+        sessions = [(name, [path]) for name, path in sorted(simulator.files_by_name.items())]
+
+    findings = []
+    for session, programs in sessions:
+        print(f"▶️ Session {os.path.basename(session)}: {len(programs)} program(s)")
+        findings.extend(simulator.run_session(session, programs))
+
+    if not findings:
+        print("✅ Every libref and connection is assigned before it is used.")
+        return
+
+    df = pd.DataFrame(findings)
+    df.to_excel(args.output, index=False)
+    print(f"\n🚨 {len(df)} findings:")
+    for (kind, issue), group in df.groupby(["kind", "issue"]):
+        names = ', '.join(sorted(group["name"].astype(str).unique())[:10])
+        print(f"  - {issue}: {len(group)} ({names})")
+    print(f"\n✅ Wrote findings into '{args.output}'")
+
+if __name__ == "__main__":
+    main()
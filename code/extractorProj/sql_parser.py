@@ -0,0 +1,371 @@
+import re
+
+# One alternation per token class; every character of the text is consumed exactly once
+TOKEN_PATTERN = re.compile(r"""
+      (?P<space>\s+)
+    | (?P<comment>/\*.*?(?:\*/|$))
+    | (?P<string>'(?:[^']|'')*'[a-zA-Z]{0,2}|"(?:[^"]|"")*"[a-zA-Z]{0,2})
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+    | (?P<name>(?:&+\w+\.?|%?[A-Za-z_]\w*)(?:\w|&+[A-Za-z_]\w*\.?)*)
+    | (?P<op>\|\||<=|>=|<>|\^=|~=|!=|[=<>+\-*/|^~])
+    | (?P<punct>[(),;.:])
+    | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+CLAUSE_WORDS = frozenset({
+    "select", "from", "where", "group", "having", "order", "union", "except", "intersect", "outer", "into",
+    "on", "using", "join", "inner", "left", "right", "full", "cross", "natural", "as", "set", "values", "quit",
+})
+JOIN_WORDS = frozenset({"join", "inner", "left", "right", "full", "cross", "natural", "outer"})
+# Join keywords that are also SAS functions: left(x), right(x)
+FUNCTION_JOIN_WORDS = frozenset({"left", "right"})
+SET_OPERATORS = frozenset({"union", "except", "intersect", "outer"})
+# Words followed by a parenthesized list or subquery rather than function arguments
+SPACED_BEFORE_PAREN = frozenset({"in", "and", "or", "not", "exists", "any", "all", "some", "on", "where", "having",
+                                 "as", "from", "join", "select", "values", "using", "when", "then", "else"})
+
+
+def tokenize(text):
+    """(kind, value) pairs; whitespace and comments are dropped."""
+    return [(match.lastgroup, match.group()) for match in TOKEN_PATTERN.finditer(text)
+            if match.lastgroup not in ("space", "comment")]
+
+
+def join_tokens(tokens):
+    """Readable text from tokens: 'a.id', 'sum(b.amt)', 'x in (1, 2)'."""
+    text, previous = [], (None, None)
+    for kind, value in tokens:
+        tight = value in (".", ")", ",") or previous[1] in (".", "(") or \
+            (value == "(" and previous[0] == "name" and previous[1].lower() not in SPACED_BEFORE_PAREN)
+        if text and not tight:
+            text.append(" ")
+        text.append(value)
+        previous = (kind, value)
+    return "".join(text)
+
+
+def new_query(statement):
+    return {"statement": statement, "targets": [], "sources": [], "joins": [], "predicates": [],
+            "columns": [], "into": [], "group_by": [], "order_by": [], "subqueries": []}
+
+
+class SQLParser:
+    """
+    Single forward pass over the tokens of PROC SQL code. Each statement becomes a
+    query tree: targets (CREATE/INSERT/UPDATE/DELETE/DROP), sources with alias and
+    dataset options, joins with their type and ON condition, WHERE/HAVING predicates,
+    selected columns, INTO macro variables and nested subqueries. No token is read
+    twice, so the cost is linear in the length of the code.
+    """
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    # Token helpers
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def word(self, offset=0):
+        kind, value = self.peek(offset)
+        return value.lower() if kind == "name" else value
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def at_end(self):
+        return self.pos >= len(self.tokens)
+
+    # Statements
+    def parse(self):
+        statements = []
+        while not self.at_end():
+            if self.word() == ";":
+                self.advance()
+                continue
+            statements.append(self.parse_statement())
+        return statements
+
+    def parse_statement(self):
+        verb = self.word()
+        if verb == "select":
+            query = self.parse_query("select")
+        elif verb == "create":
+            query = self.parse_create()
+        elif verb == "insert":
+            query = self.parse_insert()
+        elif verb == "delete" and self.word(1) == "from":
+            self.pos += 2
+            query = new_query("delete")
+            query["targets"].append(self.qualified_name())
+            self.parse_clauses(query)
+        elif verb == "update":
+            self.advance()
+            query = new_query("update")
+            query["targets"].append(self.qualified_name())
+            self.parse_clauses(query)
+        elif verb == "drop":
+            self.advance()
+            query = new_query("drop " + (self.word() or ""))
+            self.advance()
+            while not self.at_end() and self.word() != ";":
+                if self.peek()[0] == "name":
+                    query["targets"].append(self.qualified_name())
+                else:
+                    self.advance()
+        else:
+            query = new_query(verb or "")
+            self.skip_statement()
+        self.skip_statement()
+        return query
+
+    def parse_create(self):
+        self.advance()
+        kind = self.word()
+        self.advance()
+        query = new_query(f"create {kind}")
+        if kind not in ("table", "view"):
+            self.skip_statement()
+            return query
+        query["targets"].append(self.qualified_name())
+        self.dataset_options()
+        if self.word() == "as":
+            self.advance()
+            if self.word() == "(":
+                self.advance()
+            if self.word() == "select":
+                self.merge_query(query, self.parse_query("select"))
+        elif self.word() == "like":
+            self.advance()
+            query["sources"].append(self.source(self.qualified_name()))
+        return query
+
+    def parse_insert(self):
+        self.advance()
+        if self.word() == "into":
+            self.advance()
+        query = new_query("insert")
+        query["targets"].append(self.qualified_name())
+        self.dataset_options()
+        if self.word() == "(":
+            self.balanced()
+        if self.word() == "select":
+            self.merge_query(query, self.parse_query("select"))
+        return query
+
+    @staticmethod
+    def merge_query(query, inner):
+        for key in ("sources", "joins", "predicates", "columns", "into", "group_by", "order_by", "subqueries"):
+            query[key].extend(inner[key])
+
+    def skip_statement(self):
+        while not self.at_end() and self.word() != ";":
+            self.advance()
+
+    # Queries
+    def parse_query(self, statement):
+        """SELECT ... up to the end of the statement or the closing parenthesis of a subquery."""
+        query = new_query(statement)
+        self.advance()
+        if self.word() in ("distinct", "unique"):
+            self.advance()
+        query["columns"] = [text for text in self.collect_list(query, {"into", "from"} | SET_OPERATORS) if text]
+        if self.word() == "into":
+            self.advance()
+            depth = 0
+            while not self.at_end() and (depth > 0 or self.word() not in ("from", ";", ")")):
+                kind, value = self.advance()
+                depth += {"(": 1, ")": -1}.get(value, 0)
+                if kind == "name" and self.tokens[self.pos - 2][1] == ":":
+                    query["into"].append(value)
+        if self.word() == "from":
+            self.advance()
+            self.parse_from(query)
+        self.parse_clauses(query)
+        return query
+
+    def parse_clauses(self, query):
+        while not self.at_end() and self.word() not in (";", ")"):
+            word = self.word()
+            if word == "where" or word == "having":
+                self.advance()
+                query["predicates"].append(self.collect(query, {"group", "having", "order"} | SET_OPERATORS))
+            elif word in ("group", "order") and self.word(1) == "by":
+                self.pos += 2
+                target = query["group_by"] if word == "group" else query["order_by"]
+                target.extend(text for text in self.collect_list(query, {"having", "order"} | SET_OPERATORS) if text)
+            elif word in SET_OPERATORS:
+                while self.word() in SET_OPERATORS or self.word() in ("all", "corr", "corresponding"):
+                    self.advance()
+                if self.word() == "(":
+                    self.advance()
+                if self.word() == "select":
+                    query["subqueries"].append(self.parse_query("select"))
+            elif word == "set":
+                self.advance()
+                self.collect(query, {"where"})
+            else:
+                self.advance()
+
+    def parse_from(self, query):
+        joined = None
+        while not self.at_end():
+            source = self.table_factor(query)
+            if source is not None:
+                query["sources"].append(source)
+                if joined:
+                    source["join"] = joined
+                    join = {"type": joined, "table": source["table"], "alias": source["alias"], "on": None}
+                    query["joins"].append(join)
+                    if self.word() == "on":
+                        self.advance()
+                        join["on"] = self.collect(query, JOIN_WORDS | {"where", "group", "having", "order", ","}
+                                                  | SET_OPERATORS)
+                        query["predicates"].append(join["on"])
+                    elif self.word() == "using":
+                        self.advance()
+                        join["on"] = "using " + self.balanced()
+            word = self.word()
+            if word == ",":
+                self.advance()
+                joined = "comma"
+            elif word in JOIN_WORDS and not (word == "outer" and self.word(1) == "union"):
+                join_words = []
+                while self.word() in JOIN_WORDS:
+                    join_words.append(self.advance()[1].lower())
+                kinds = [w for w in join_words if w not in ("join", "outer")]
+                joined = " ".join(kinds) or "inner"
+            else:
+                return
+
+    def table_factor(self, query):
+        kind, value = self.peek()
+        if value == "(":
+            if self.word(1) == "select":
+                self.advance()
+                subquery = self.parse_query("select")
+                if self.word() == ")":
+                    self.advance()
+                query["subqueries"].append(subquery)
+                return self.source(None, subquery=subquery)
+            self.advance()
+            self.parse_from(query)
+            if self.word() == ")":
+                self.advance()
+            return None
+        if kind != "name":
+            return None
+        if value.lower() == "%if":
+            # from %if &cond %then lib.a; %else lib.b; -- the %then branch is read
+            while not self.at_end() and self.word() not in ("%then", ";"):
+                self.advance()
+            if self.word() == "%then":
+                self.advance()
+            return self.table_factor(query)
+        if value.lower() == "connection" and self.word(1) == "to":
+            self.pos += 2
+            connection = self.advance()[1].lower()
+            text = self.balanced() if self.word() == "(" else ""
+            return self.source(None, connection=connection, text=text)
+        return self.source(self.qualified_name())
+
+    def source(self, table, subquery=None, connection=None, text=None):
+        source = {"table": table, "alias": None, "options": self.dataset_options() if table else None,
+                  "subquery": subquery, "connection": connection, "join": None}
+        if text is not None:
+            source["text"] = text
+        if self.word() == "as":
+            self.advance()
+            source["alias"] = self.advance()[1]
+        elif self.peek()[0] == "name" and self.word() not in CLAUSE_WORDS:
+            source["alias"] = self.advance()[1]
+        return source
+
+    def qualified_name(self):
+        parts = [self.advance()[1]]
+        while self.word() == "." and self.peek(1)[0] == "name":
+            self.advance()
+            parts.append(self.advance()[1])
+        return ".".join(parts)
+
+    def dataset_options(self):
+        return self.balanced()[1:-1].strip() if self.word() == "(" and self.word(1) != "select" else None
+
+    def balanced(self):
+        """Text of a parenthesized group starting at the current '(' token."""
+        depth, parts = 0, []
+        while not self.at_end():
+            kind, value = self.advance()
+            parts.append((kind, value))
+            if value == "(":
+                depth += 1
+            elif value == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+        return join_tokens(parts)
+
+    def collect(self, query, stop_words):
+        """Text up to a stop word at parenthesis depth 0; subqueries inside are parsed."""
+        depth, parts = 0, []
+        while not self.at_end():
+            word = self.word()
+            # left(x) and right(x) are functions, not join keywords
+            if depth == 0 and (word in stop_words and not (word in FUNCTION_JOIN_WORDS and self.word(1) == "(")
+                               or word in (";", ")")):
+                break
+            if word == "(" and self.word(1) == "select":
+                self.advance()
+                subquery = self.parse_query("select")
+                query["subqueries"].append(subquery)
+                if self.word() == ")":
+                    self.advance()
+                parts.append(("name", "(subquery)"))
+                continue
+            if word == "(":
+                depth += 1
+            elif word == ")":
+                depth -= 1
+            parts.append(self.advance())
+        return join_tokens(parts)
+
+    def collect_list(self, query, stop_words):
+        """Comma-separated expressions, as collect() does for one."""
+        items = [self.collect(query, stop_words | {","})]
+        while self.word() == ",":
+            self.advance()
+            items.append(self.collect(query, stop_words | {","}))
+        return items
+
+
+def parse_sql(text):
+    """Query trees for every statement of a PROC SQL block (or a single statement)."""
+    return SQLParser(text).parse()
+
+
+def walk(query):
+    """The query and all of its nested subqueries."""
+    yield query
+    for subquery in query["subqueries"]:
+        yield from walk(subquery)
+
+
+def query_sources(query):
+    """Tables read by the query, subqueries included, in order of appearance."""
+    tables = []
+    for node in walk(query):
+        tables.extend(source["table"] for source in node["sources"] if source["table"])
+    return list(dict.fromkeys(tables))
+
+
+def sql_tables(text):
+    """(input tables, output tables) of PROC SQL code."""
+    inputs, outputs = [], []
+    for query in parse_sql(text):
+        inputs.extend(query_sources(query))
+        if query["statement"] in ("create table", "create view", "insert"):
+            outputs.extend(query["targets"])
+    return list(dict.fromkeys(inputs)), list(dict.fromkeys(outputs))
@@ -0,0 +1,137 @@
+import os
+import re
+import argparse
+import pandas as pd
+
+import git_changes
+from extractor2 import read_sas_file
+from libref_registry import LibrefRegistry
+from result_store import split_table_name
+from sql_parser import parse_sql, walk
+
+# Functions SAS/ACCESS does not translate for the common engines; a query using them runs in SAS
+SAS_ONLY_FUNCTIONS = frozenset({
+    "put", "input", "inputn", "inputc", "putn", "putc", "intck", "intnx", "mdy", "dhms", "hms", "datdif", "yrdif",
+    "compress", "compbl", "scan", "catx", "cats", "catt", "cat", "strip", "propcase", "tranwrd", "verify",
+    "indexc", "indexw", "findc", "findw", "prxmatch", "prxchange", "prxparse", "monotonic", "lag", "dif",
+    "ifn", "ifc", "choosec", "choosen", "missing", "nmiss", "cmiss", "quote", "dequote", "byte", "rank",
+    "left", "right", "countw", "soundex", "spedis", "complev", "compged", "symget", "resolve", "whichc", "whichn",
+})
+
+SQL_BLOCK_RE = re.compile(r'\bproc\s+sql\b[^;]*;(.*?)\bquit\s*;', re.IGNORECASE | re.DOTALL)
+FUNCTION_RE = re.compile(r'\b(\w+)\s*\(')
+
+
+def split_sql_statements(block):
+    """(statement, offset in block) for each statement of a PROC SQL block; quoted semicolons are kept."""
+    statements, start, quote = [], 0, None
+    for i, char in enumerate(block):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == ";":
+            if block[start:i].strip():
+                statements.append((block[start:i].strip(), start + len(block[start:i]) - len(block[start:i].lstrip())))
+            start = i + 1
+    return statements
+
+
+def query_tables(query):
+    """Inputs of a parsed query as libref.table (one-level names are WORK tables), and whether any has dataset options."""
+    sources = [source for node in walk(query) for source in node["sources"] if source["table"]]
+    tables = list(dict.fromkeys(".".join(split_table_name(source["table"])) for source in sources))
+    return tables, any(source["options"] for source in sources)
+
+
+def pushdown_blockers(statement, query, tables, has_options, registry):
+    """Reasons the query cannot be passed to the database as a whole; empty if it can."""
+    blockers = []
+    librefs = sorted({table.split(".")[0] for table in tables})
+    if len(librefs) > 1:
+        blockers.append(f"join across librefs ({', '.join(librefs)})")
+    for libref in librefs:
+        if not registry.is_database(libref):
+            blockers.append(f"non-database input ({libref})")
+    functions = sorted({name.lower() for name in FUNCTION_RE.findall(statement)} & SAS_ONLY_FUNCTIONS)
+    if functions:
+        blockers.append(f"SAS-only functions ({', '.join(functions)})")
+    if re.search(r'\bcalculated\b', statement, re.IGNORECASE):
+        blockers.append("CALCULATED keyword")
+    if re.search(r'\bouter\s+union\b|\bunion\s+corr\b', statement, re.IGNORECASE):
+        blockers.append("OUTER UNION / CORR")
+    if has_options:
+        blockers.append("dataset options on a database table")
+    if any("&" in predicate for node in walk(query) for predicate in node["predicates"]):
+        blockers.append("macro variable in WHERE")
+    return blockers
+
+
+def analyze_sql(code, filepath, registry):
+    """One row per PROC SQL query that reads at least one database table."""
+    rows = []
+    for block in SQL_BLOCK_RE.finditer(code):
+        for statement, offset in split_sql_statements(block.group(1)):
+            query = parse_sql(statement)[0]
+            if not any(node["columns"] for node in walk(query)) or \
+                    any(source["connection"] for node in walk(query) for source in node["sources"]):
+                # Not a query, or explicit pass-through that is already pushed to the database
+                continue
+            tables, has_options = query_tables(query)
+            db_tables = [table for table in tables if registry.is_database(table.split(".")[0])]
+            if not db_tables:
+                continue
+            blockers = pushdown_blockers(statement, query, tables, has_options, registry)
+            engines = sorted({registry.engine(table.split(".")[0]) for table in db_tables})
+            rows.append({
+                "file_path": filepath,
+                "line": code.count("\n", 0, block.start(1) + offset) + 1,
+                "statement": " ".join(statement.split())[:200],
+                "input_tables": ", ".join(tables),
+                "db_engine": ", ".join(engines),
+                "PUSHDOWN": "No" if blockers else "Yes",
+                "blockers": "; ".join(blockers),
+            })
+    return rows
+
+
+def analyze_directory(base_dir):
+    """Database LIBNAMEs are collected from every program first, since setup code often assigns them."""
+    codes, registry = {}, LibrefRegistry()
+    for filename in sorted(os.listdir(base_dir)):
+        if git_changes.is_sas_file(filename):
+            path = os.path.join(base_dir, filename)
+            codes[path] = read_sas_file(path)
+            registry.add_libnames(codes[path], path, db_only=True, clears=False)
+    rows = []
+    for path, code in codes.items():
+        rows.extend(analyze_sql(code, path, registry))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check which PROC SQL queries on database librefs can be pushed down.")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--output", default="sql_pushdown.xlsx", help="Excel file to write")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    rows = analyze_directory(args.base_dir)
+    if not rows:
+        print("✅ No PROC SQL query reads a database libref through implicit pass-through.")
+        return
+
+    df = pd.DataFrame(rows)
+    df.to_excel(args.output, index=False)
+    blocked = df[df["PUSHDOWN"] == "No"]
+    print(f"\n🔎 {len(df)} queries on database librefs, {len(df) - len(blocked)} can be pushed down")
+    for _, row in blocked.iterrows():
+        print(f"  🚨 {os.path.basename(row['file_path'])}:{row['line']} {row['input_tables']}: {row['blockers']}")
+    print(f"\n✅ Wrote {len(df)} rows into '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash dedup in extractor2.analyze_directory
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extractor2 import analyze_directory
+
+PROGRAM = """libname db oracle user=x;
+data db.orders;
+  set src.orders;
+run;
+"""
+
+
+def test_copies_get_their_own_file_path_rows(tmp_path):
+    (tmp_path / "a.sas").write_text(PROGRAM)
+    (tmp_path / "copy.sas").write_text(PROGRAM)
+    (tmp_path / "other.sas").write_text(PROGRAM.replace("src.orders", "src.returns"))
+
+    rows = analyze_directory(str(tmp_path))
+    by_file = {}
+    for row in rows:
+        by_file.setdefault(os.path.basename(row["file_path"]), []).append(row)
+    assert set(by_file) == {"a.sas", "copy.sas", "other.sas"}
+
+    def without_path(file_rows):
+        return [{key: value for key, value in row.items() if key != "file_path"} for row in file_rows]
+
+    assert without_path(by_file["copy.sas"]) == without_path(by_file["a.sas"])
+    assert all(row["file_path"] == str(tmp_path / "copy.sas") for row in by_file["copy.sas"])
+    assert all(row["file_path"] == str(tmp_path / "a.sas") for row in by_file["a.sas"])
+    assert without_path(by_file["other.sas"]) != without_path(by_file["a.sas"])
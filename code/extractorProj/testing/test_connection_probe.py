@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for connection_probe.py, using SQLite files and a fake slow connector as stand-ins
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import connection_probe
+from connection_probe import ConnectionProber, apply_overrides, discover_targets, target_key
+
+
+def sqlite_target(name, database):
+    options = {"database": str(database)}
+    return {"key": target_key("sqlite", options), "engine": "sqlite", "options": options,
+            "names": {name}, "sites": []}
+
+
+def test_probe_status_latency_and_cache(tmp_path):
+    good = tmp_path / "warehouse.db"
+    sqlite3.connect(good).close()
+    targets = [sqlite_target("dw", good), sqlite_target("gone", tmp_path / "missing" / "x.db"),
+               {"key": "teradata:1", "engine": "teradata", "options": {}, "names": {"td"}, "sites": []}]
+    cache_file = tmp_path / "cache.json"
+
+    prober = ConnectionProber(max_workers=2, timeout=5, cache_file=str(cache_file))
+    results = {next(iter(r["names"])): r for r in prober.probe_all(targets)}
+    prober.close()
+
+    assert results["dw"]["status"] == "ok" and results["dw"]["latency_ms"] >= 0
+    assert results["gone"]["status"] == "error"
+    assert results["td"]["status"] in ("driver_missing", "error")
+    assert not (tmp_path / "missing").exists()
+
+    again = ConnectionProber(cache_file=str(cache_file)).probe_all(targets[:1])
+    assert again[0]["status"] == "ok" and again[0]["cached"]
+
+
+def test_timeout_is_per_target(monkeypatch, tmp_path):
+    def slow_connect(options, timeout):
+        time.sleep(2)
+
+    monkeypatch.setitem(connection_probe.CONNECTORS, "slow", (None, slow_connect))
+    good = tmp_path / "ok.db"
+    sqlite3.connect(good).close()
+    targets = [{"key": "slow:1", "engine": "slow", "options": {}, "names": {"slow"}, "sites": []},
+               sqlite_target("dw", good)]
+
+    start = time.perf_counter()
+    results = {next(iter(r["names"])): r for r in ConnectionProber(max_workers=2, timeout=0.3).probe_all(targets)}
+
+    assert results["slow"]["status"] == "timeout"
+    assert results["dw"]["status"] == "ok"
+    assert time.perf_counter() - start < 1.5
+
+
+def test_discover_and_override(tmp_path):
+    sas_dir = tmp_path / "SAS Files"
+    sas_dir.mkdir()
+    (sas_dir / "a.sas").write_text("libname dw oracle user=etl password=&pw path=prod;\n"
+                                   "proc sql; connect to oracle as ora (user=etl password=&pw path=prod);\n")
+    (sas_dir / "b.sas").write_text("libname dw oracle user=etl password=&pw path=prod;\n")
+
+    targets = discover_targets(str(sas_dir))
+    assert len(targets) == 1 and targets[0]["names"] == {"dw", "ora"}
+    assert targets[0]["sites"] == ["a.sas:1", "a.sas:2", "b.sas:1"]
+
+    overrides = tmp_path / "overrides.json"
+    overrides.write_text('{"DW": {"engine": "sqlite", "database": "stand_in.db"}}')
+    target = apply_overrides(targets, str(overrides))[0]
+    assert target["engine"] == "sqlite" and target["options"] == {"database": "stand_in.db"}
+
+
+def test_hung_probe_does_not_block_other_targets_or_exit(tmp_path):
+    good = tmp_path / "ok.db"
+    sqlite3.connect(good).close()
+    script = f"""
+import sys, time
+sys.path.insert(0, {os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))!r})
+import connection_probe
+from connection_probe import ConnectionProber, target_key
+
+connection_probe.CONNECTORS["hung"] = (None, lambda options, timeout: time.sleep(600))
+targets = [{{"key": "hung:1", "engine": "hung", "options": {{}}, "names": {{"hung"}}, "sites": []}},
+           {{"key": target_key("sqlite", {{}}), "engine": "sqlite", "options": {{"database": {str(good)!r}}},
+             "names": {{"dw"}}, "sites": []}}]
+results = ConnectionProber(max_workers=1, timeout=0.3).probe_all(targets)
+print(sorted((next(iter(r["names"])), r["status"]) for r in results))
+"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+
+    # With one worker the SQLite target still runs after the hung one times out,
+    # and the interpreter exits without waiting for the hung driver
+    assert completed.stdout.strip() == "[('dw', 'ok'), ('hung', 'timeout')]", completed.stderr
+    assert time.perf_counter() - start < 30
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for dead_outputs.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dead_outputs import DeadOutputFinder, program_reads
+from extractor2 import extract_all_blocks
+
+PROGRAMS = {
+    "load.sas": """libname stg '/data/stage';
+data stg.raw; set src.feed; run;
+data stg.lookup; set src.codes; run;
+""",
+    "build.sas": """proc sql;
+  create table mart.orders as select * from stg.raw r join stg.lookup l on r.code = l.code;
+quit;
+""",
+    "archive.sas": """data hist.orders_copy;
+  set mart.orders;
+run;
+""",
+    "stats.sas": """proc means data=stg.lookup noprint; output out=mart.code_stats n=n; run;
+""",
+    "report.sas": """data work.top; set &lib..code_stats; run;
+proc print data=work.top; run;
+""",
+    "refresh.sas": """data mart.snapshot; set mart.snapshot; run;
+""",
+    "generic.sas": """data work.copy; set &lib..&table; run;
+""",
+}
+
+
+def make_finder():
+    finder = DeadOutputFinder()
+    for name, code in PROGRAMS.items():
+        finder.add_rows(extract_all_blocks(code, name))
+        finder.add_code(name, code)
+    return finder
+
+
+def test_program_reads():
+    code = "data x; set a.one(where=(v in (1,2))) a.two end=eof; run; proc sort data=b.three out=c.four; run;"
+    assert program_reads(code) == ["a.one", "a.two", "b.three"]
+    assert program_reads("h = _new_ hash(dataset: 'ref.codes');") == ["ref.codes"]
+
+
+def test_dead_outputs_propagate_upstream():
+    dead_tables, dead_programs = make_finder().find()
+
+    # Nobody reads the archive copy, so the chain that only feeds it is dead as well
+    assert dead_tables["hist.orders_copy"] == "never read"
+    assert dead_tables["mart.orders"] == "read only by dead programs"
+    assert dead_tables["stg.raw"] == "read only by dead programs"
+    assert set(dead_programs) == {"archive.sas", "build.sas"}
+
+    # stg.lookup still feeds PROC MEANS, whose output a report reads through &lib..code_stats
+    assert "stg.lookup" not in dead_tables and "mart.code_stats" not in dead_tables
+    assert "load.sas" not in dead_programs
+    # Updated in place: the program's own read keeps it
+    assert "mart.snapshot" not in dead_tables
+
+
+def test_fully_dynamic_reads_are_reported():
+    finder = make_finder()
+    finder.find()
+    assert finder.dynamic_reads == {"generic.sas": {"&lib..&table"}}
+
+
+def test_report_lists_producing_steps():
+    tables, steps, programs = make_finder().report()
+    orders = steps[steps["table"] == "mart.orders"].iloc[0]
+    assert orders["write_back_type"] == "PROC_SQL_CREATE" and orders["PROGRAM_DEAD"] == "Yes"
+    raw = steps[steps["table"] == "stg.raw"].iloc[0]
+    assert raw["file_path"] == "load.sas" and raw["PROGRAM_DEAD"] == "No"
+    assert tables.set_index("table").loc["mart.orders", "readers"] == "archive.sas"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the git-aware incremental mode of extractor2.py
+"""
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import extractor2
+import git_changes
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def commit_all(repo, message):
+    git(repo, "add", "-A")
+    git(repo, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", message)
+
+
+def make_repo(tmp_path):
+    repo = tmp_path / "repo"
+    sas_dir = repo / "SAS Files"
+    sas_dir.mkdir(parents=True)
+    git(repo, "init", "-q")
+    (sas_dir / "keep.sas").write_text("data work.keep; set sashelp.class; run;\n")
+    (sas_dir / "edit.sas").write_text("data work.before; set sashelp.class; run;\n")
+    (sas_dir / "gone.sas").write_text("%let removed = 1;\n")
+    (sas_dir / "old_name.sas").write_text("proc sort data=work.a out=work.sorted; by id; run;\n" * 5)
+    (repo / "notes.txt").write_text("not a program\n")
+    commit_all(repo, "first")
+    return repo, sas_dir
+
+
+def test_list_changed_sas_files(tmp_path):
+    repo, sas_dir = make_repo(tmp_path)
+    (sas_dir / "edit.sas").write_text("data work.after; set sashelp.class; run;\n")
+    (sas_dir / "gone.sas").unlink()
+    (sas_dir / "old_name.sas").rename(sas_dir / "new_name.sas")
+    (sas_dir / "added.sas").write_text("%let added = 1;\n")
+    (repo / "notes.txt").write_text("changed\n")
+    commit_all(repo, "second")
+
+    changes = git_changes.list_changed_sas_files(str(sas_dir), "HEAD~1", "HEAD")
+
+    assert changes["added"] == ["added.sas"]
+    assert changes["modified"] == ["edit.sas"]
+    assert changes["deleted"] == ["gone.sas"]
+    assert changes["renamed"] == [("old_name.sas", "new_name.sas")]
+
+
+def test_analyze_revisions_updates_previous_output(tmp_path):
+    repo, sas_dir = make_repo(tmp_path)
+    output = tmp_path / "final_analysis.xlsx"
+    pd.DataFrame(extractor2.analyze_directory(str(sas_dir))).to_excel(output, index=False)
+
+    (sas_dir / "edit.sas").write_text("data work.after; set sashelp.class; run;\n")
+    (sas_dir / "gone.sas").unlink()
+    (sas_dir / "old_name.sas").rename(sas_dir / "new_name.sas")
+    commit_all(repo, "second")
+
+    df = extractor2.analyze_revisions(str(sas_dir), "HEAD~1", "HEAD", str(output))
+    files = set(df["file_path"])
+
+    assert os.path.join(str(sas_dir), "gone.sas") not in files
+    assert os.path.join(str(sas_dir), "old_name.sas") not in files
+    assert os.path.join(str(sas_dir), "new_name.sas") in files
+    assert os.path.join(str(sas_dir), "keep.sas") in files
+
+    outputs = set(df["output_table"].dropna())
+    assert "work.after" in outputs
+    assert "work.before" not in outputs
+    assert "work.keep" in outputs
+
+
+def test_upper_case_extension_in_full_and_incremental_runs(tmp_path):
+    repo, sas_dir = make_repo(tmp_path)
+    output = tmp_path / "final_analysis.xlsx"
+    (sas_dir / "LEGACY.SAS").write_text("data work.legacy; set sashelp.class; run;\n")
+    commit_all(repo, "upper-case program")
+
+    full = pd.DataFrame(extractor2.analyze_directory(str(sas_dir)))
+    assert os.path.join(str(sas_dir), "LEGACY.SAS") in set(full["file_path"])
+    full.to_excel(output, index=False)
+
+    (sas_dir / "LEGACY.SAS").write_text("data work.legacy2; set sashelp.class; run;\n")
+    commit_all(repo, "edit upper-case program")
+    assert git_changes.list_changed_sas_files(str(sas_dir), "HEAD~1", "HEAD")["modified"] == ["LEGACY.SAS"]
+
+    df = extractor2.analyze_revisions(str(sas_dir), "HEAD~1", "HEAD", str(output))
+    outputs = set(df["output_table"].dropna())
+    assert "work.legacy2" in outputs and "work.legacy" not in outputs
+
+
+def test_incremental_run_normalizes_crlf_like_full_run(tmp_path):
+    repo, sas_dir = make_repo(tmp_path)
+    output = tmp_path / "final_analysis.xlsx"
+    pd.DataFrame(extractor2.analyze_directory(str(sas_dir))).to_excel(output, index=False)
+
+    program = b"%let region = EMEA\r\n;\r\nproc sql;\r\n  create table work.totals as\r\n  select * from sashelp.class;\r\nquit;\r\n"
+    (sas_dir / "windows.sas").write_bytes(program)
+    commit_all(repo, "CRLF program")
+
+    path = os.path.join(str(sas_dir), "windows.sas")
+    full = [row for row in extractor2.analyze_directory(str(sas_dir)) if row["file_path"] == path]
+    df = extractor2.analyze_revisions(str(sas_dir), "HEAD~1", "HEAD", str(output))
+    incremental = [{key: value for key, value in row.items() if pd.notna(value)}
+                   for row in df[df["file_path"] == path].to_dict("records")]
+    assert full and incremental == full
+    assert not any("\r" in str(value) for row in incremental for value in row.values())
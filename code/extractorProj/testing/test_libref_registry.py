@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for libref_registry.py and its use in db_connection_check.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_connection_check import extract_librefs_used
+from libref_registry import LibrefRegistry, is_libref_candidate
+
+
+def test_registry_definitions():
+    code = ("libname DW oracle user=x path=prod;\nlibname stage '/data/stage';\nlibname arch v9 '/data/arch';\n"
+            "libname tmp list;\n")
+    registry = LibrefRegistry.from_code(code, "setup.sas")
+
+    assert "dw" in registry and "DW" in registry and "tmp" not in registry
+    assert registry.is_database("dw") and not registry.is_database("stage")
+    assert registry.get("stage")["engine"] == "base" and registry.get("stage")["path"] == "/data/stage"
+    assert registry.get("arch")["engine"] == "v9" and registry.get("arch")["path"] == "/data/arch"
+    assert registry.get("dw")["sites"] == [("setup.sas", 1)]
+    assert registry.is_available("sashelp") and not registry.is_available("other")
+
+
+def test_clear():
+    registry = LibrefRegistry.from_code("libname dw oracle user=x;\nlibname a '/a';\nlibname b '/b';\n"
+                                        "libname dw clear;\n")
+    assert "dw" not in registry and set(registry) == {"a", "b"}
+    registry.add_libnames("libname _all_ clear;")
+    assert len(registry) == 0
+
+    # Corpus-wide collection keeps librefs a program clears when it is done
+    corpus = LibrefRegistry.from_code("libname dw oracle user=x;\nlibname dw clear;\n", clears=False)
+    assert corpus.is_database("dw")
+
+
+def test_false_libref_candidates_are_skipped():
+    code = """
+    data dw.out; set src.orders;
+      by id; if first.id then total = 0;
+      format start date9. amount dollar12.2 ratio 8.2;
+      rc = h.definekey('id'); rc = h.output (dataset: 'x');
+    run;
+    data rpt.output; set rpt2.sum; run;
+    %include "setup.sas";
+    """
+    # Hash method names are only skipped as calls: rpt.output and rpt2.sum are tables
+    assert extract_librefs_used(code) == {"dw", "src", "rpt", "rpt2"}
+
+
+def test_librefs_named_like_formats():
+    assert not is_libref_candidate("dollar12", "2") and not is_libref_candidate("date9")
+    assert is_libref_candidate("year2020", "sales") and is_libref_candidate("date1", "x")
+    code = "data year2020.sales; set date1.x; format d date9. amount dollar12.2; run;"
+    assert extract_librefs_used(code) == {"year2020", "date1"}
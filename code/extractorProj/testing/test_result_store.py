@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite result store fed by extractor2.py
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import extractor2
+import result_store
+
+PROGRAM = """
+libname oralib oracle user=scott password=tiger path=prod;
+%let region = EMEA;
+%macro load_sales(year);
+  data work.sales_&year;
+    set oralib.sales;
+  run;
+%mend load_sales;
+%load_sales(2024);
+data oralib.summary;
+  set work.sales_2024;
+run;
+proc sql;
+  create table oralib.top_customers as select * from oralib.customers;
+  insert into oralib.audit select * from work.sales_2024;
+quit;
+proc append base=oralib.history data=work.sales_2024; run;
+%include "setup.sas";
+"""
+
+
+def build_store(tmp_path):
+    rows = extractor2.extract_all_blocks(extractor2.strip_comments(PROGRAM), "SAS Files/load.sas")
+    rows += extractor2.extract_all_blocks("data work.other; set sashelp.class; run;", "SAS Files/other.sas")
+    db_path = str(tmp_path / "results.db")
+    result_store.save_results(db_path, rows)
+    return db_path
+
+
+def test_find_writers_by_libref_wildcard(tmp_path):
+    conn = sqlite3.connect(build_store(tmp_path))
+    matches = result_store.find_table_references(conn, "ORALIB.*", roles=["write", "create", "append"])
+    found = {(table, role) for _, _, _, table, role in matches}
+
+    assert ("summary", "write") in found
+    assert ("top_customers", "create") in found
+    assert ("audit", "append") in found
+    assert ("history", "append") in found
+    assert all(path == "SAS Files/load.sas" for path, *_ in matches)
+
+
+def test_normalized_tables_and_partial_replace(tmp_path, monkeypatch):
+    # DEPENDENCY_EXISTS looks for the include under "SAS Files" in the working directory
+    monkeypatch.chdir(tmp_path)
+    db_path = build_store(tmp_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT macro_name FROM macros WHERE kind = 'DEF'").fetchall() == [("load_sales",)]
+    assert conn.execute("SELECT include_path, dependency_exists FROM includes").fetchall() == [("setup.sas", 0)]
+    assert ("oralib", "oracle") in conn.execute("SELECT libref, engine FROM connections").fetchall()
+    conn.close()
+
+    # Replacing one file leaves the other file's rows untouched
+    result_store.save_results(db_path, [], file_paths=["SAS Files/load.sas"])
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT file_path FROM files").fetchall() == [("SAS Files/other.sas",)]
+    assert conn.execute("SELECT COUNT(*) FROM tables WHERE libref = 'oralib'").fetchone()[0] == 0
+    assert result_store.find_table_references(conn, "work.other")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the session-order simulation in session_sim.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from session_sim import SessionSimulator
+
+
+def write(directory, name, code):
+    (directory / name).write_text(code)
+
+
+def test_include_chain_assigns_librefs(tmp_path):
+    write(tmp_path, "setup.sas", "libname dw oracle user=x password=y;\n")
+    write(tmp_path, "report.sas",
+          '%include "/folders/myfolders/setup.sas";\n'
+          "data work.a; set dw.sales; run;\n"
+          "proc sql; select * from connection to ora (select 1 from dual); quit;\n")
+
+    findings = SessionSimulator(str(tmp_path)).run_session("report", ["report.sas"])
+
+    assert [(f["kind"], f["name"]) for f in findings] == [("connection", "ora")]
+
+
+def test_flow_order_and_clear(tmp_path):
+    write(tmp_path, "load.sas", "data stage.orders; set src.orders; run;\n")
+    write(tmp_path, "setup.sas", "libname stage '/data/stage';\nlibname src '/data/src';\n")
+    write(tmp_path, "cleanup.sas", "libname src clear;\nproc print data=src.orders; run;\n")
+
+    simulator = SessionSimulator(str(tmp_path))
+    assert simulator.run_session("ok", ["setup.sas", "load.sas"]) == []
+
+    findings = simulator.run_session("wrong", ["load.sas", "setup.sas", "cleanup.sas"])
+    by_name = {(f["name"], f["file_path"].endswith("cleanup.sas")): f for f in findings}
+    assert by_name[("stage", False)]["issue"] == "Libref assigned only later in the session"
+    assert by_name[("src", True)]["issue"] == "Libref used before it is assigned in the session"
+
+
+def test_execute_by_skips_the_database_body(tmp_path):
+    write(tmp_path, "push.sas",
+          "proc sql;\n"
+          "connect to oracle as ora (path=x);\n"
+          "execute (insert into stage.t select * from (select a from raw.src) where b = ')') by ora;\n"
+          "execute (delete from stage.t) by td;\n"
+          "quit;\n")
+
+    findings = SessionSimulator(str(tmp_path)).run_session("push", ["push.sas"])
+
+    # stage/raw inside EXECUTE are database tables, not SAS librefs
+    assert [(f["kind"], f["name"], f["line"]) for f in findings] == [("connection", "td", 4)]
+
+
+def test_unbalanced_execute_is_linear(tmp_path):
+    write(tmp_path, "broken.sas", "proc sql; execute (select 1 " * 20000 + "\nquit;\n")
+
+    start = time.perf_counter()
+    SessionSimulator(str(tmp_path)).run_session("broken", ["broken.sas"])
+    assert time.perf_counter() - start < 5
+
+
+def test_libname_engine_and_clear_like_the_registry(tmp_path):
+    write(tmp_path, "prog.sas",
+          "libname arch v9 '/data/arch';\n"
+          "data work.a; set arch.hist; run;\n"
+          "libname arch clear;\n"
+          "data work.b; set arch.hist; run;\n")
+
+    simulator = SessionSimulator(str(tmp_path))
+    findings = simulator.run_session("prog", ["prog.sas"])
+
+    assert [(f["name"], f["line"]) for f in findings] == [("arch", 4)]
+    write(tmp_path, "setup.sas", "libname arch v9 '/data/arch';\n")
+    simulator.run_session("setup", ["setup.sas"])
+    assert simulator.librefs.get("arch")["engine"] == "v9" and simulator.librefs.get("arch")["path"] == "/data/arch"
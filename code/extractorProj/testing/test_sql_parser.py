@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for sql_parser.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extractor2 import extract_all_blocks
+from sql_parser import parse_sql, query_sources, sql_tables
+
+BLOCK = """proc sql noprint;
+  create table work.summary(compress=yes) as
+    select a.id, sum(b.amount) as total, (select max(rate) from ref.rates) as top_rate
+      into :n_ids
+      from dw.orders(where=(status='open')) as a
+      left join &lib..customers b on a.id = b.id and left(a.code) = b.code
+      inner join (select id from stage.keys where k in (select k from stage.valid)) k on k.id = a.id,
+      ref.regions r
+      where a.dt > '01jan2020'd /* from comment.table */
+      group by a.id
+      having total > 0
+      order by total desc;
+  insert into dw.audit (id, n) select id, count(*) from work.summary group by id;
+  select * from connection to oracle (select * from remote_table);
+  drop table work.tmp1, work.tmp2;
+quit;
+"""
+
+
+def test_query_tree():
+    queries = [query for query in parse_sql(BLOCK) if query["statement"] not in ("proc", "quit")]
+    create, insert, passthrough, drop = queries
+
+    assert create["statement"] == "create table" and create["targets"] == ["work.summary"]
+    assert [(s["table"], s["alias"]) for s in create["sources"]] == [
+        ("dw.orders", "a"), ("&lib..customers", "b"), (None, "k"), ("ref.regions", "r")]
+    assert create["sources"][0]["options"] == "where = (status = 'open')"
+    assert [(join["type"], join["alias"]) for join in create["joins"]] == [("left", "b"), ("inner", "k"), ("comma", "r")]
+    assert create["joins"][0]["on"] == "a.id = b.id and left(a.code) = b.code"
+    assert create["columns"] == ["a.id", "sum(b.amount) as total", "(subquery) as top_rate"]
+    assert create["into"] == ["n_ids"]
+    assert "a.dt > '01jan2020'd" in create["predicates"] and "total > 0" in create["predicates"]
+    assert create["group_by"] == ["a.id"] and create["order_by"] == ["total desc"]
+    assert query_sources(create) == ["dw.orders", "&lib..customers", "ref.regions", "ref.rates",
+                                     "stage.keys", "stage.valid"]
+
+    assert insert["targets"] == ["dw.audit"] and query_sources(insert) == ["work.summary"]
+    assert passthrough["sources"][0]["connection"] == "oracle" and query_sources(passthrough) == []
+    assert drop["statement"] == "drop table" and drop["targets"] == ["work.tmp1", "work.tmp2"]
+
+
+def test_sql_tables():
+    inputs, outputs = sql_tables(BLOCK)
+    assert outputs == ["work.summary", "dw.audit"]
+    assert "comment.table" not in inputs and "remote_table" not in inputs
+    assert inputs[-1] == "work.summary"
+
+
+def test_linear_on_long_queries():
+    columns = ", ".join(f"c{i}" for i in range(5000))
+    query = f"create table out as select {columns} from lib.wide where " + " and ".join(
+        f"c{i} > {i}" for i in range(5000)) + ";"
+    (tree,) = parse_sql(query)
+    assert len(tree["columns"]) == 5000 and query_sources(tree) == ["lib.wide"]
+
+
+def test_extractor_keeps_macro_qualified_inputs():
+    rows = extract_all_blocks(BLOCK, "block.sas")
+    inputs = {row["Input tables"]: row["tables_sourcejoin"] for row in rows if "Input tables" in row}
+    assert inputs["&lib..customers"] == "customers"
+    assert inputs["dw.orders"] == "orders" and "remote_table" not in inputs
+
+
+def test_inline_view_as_first_from_item():
+    (query,) = parse_sql("create table x as select s.id, left(s.name) as name "
+                         "from (select id, name from lib.a) s inner join lib.b b on s.id = b.id;")
+    assert query["columns"] == ["s.id", "left(s.name) as name"]
+    assert [source["table"] for source in query["sources"]] == [None, "lib.b"]
+    assert query["joins"][0]["table"] == "lib.b" and query["joins"][0]["on"] == "s.id = b.id"
+    assert sorted(sql_tables("select * from (select id from lib.a) s, lib.b;")[0]) == ["lib.a", "lib.b"]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for sql_pushdown.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from libref_registry import LibrefRegistry
+from sql_pushdown import analyze_sql
+
+CODE = """libname dw oracle user=x path=prod;
+libname stage teradata server=td;
+proc sql;
+  create table work.totals as
+    select region, sum(amount) as total from dw.sales s, dw.regions r
+    where s.region_id = r.id group by region;
+  create table work.recent as
+    select * from dw.sales where sale_date > &start_date;
+  create table work.mixed as
+    select put(a.id, z8.) as key from dw.customers a join work.keys k on a.id = k.id;
+  create table work.both as
+    select * from dw.sales a inner join stage.returns b on a.id = b.id;
+  create table work.remote as
+    select * from connection to oracle (select * from sales);
+quit;
+"""
+
+
+def test_pushdown_eligibility():
+    rows = analyze_sql(CODE, "prog.sas", LibrefRegistry.from_code(CODE, db_only=True))
+    by_line = {row["line"]: row for row in rows}
+
+    assert len(rows) == 4
+    assert by_line[4]["PUSHDOWN"] == "Yes" and by_line[4]["input_tables"] == "dw.sales, dw.regions"
+    assert by_line[7]["blockers"] == "macro variable in WHERE"
+    mixed = by_line[9]["blockers"]
+    assert "join across librefs (dw, work)" in mixed and "SAS-only functions (put)" in mixed
+    assert by_line[11]["db_engine"] == "oracle, teradata" and "join across librefs" in by_line[11]["blockers"]
+
+
+def test_one_level_tables_are_work_inputs():
+    code = """libname dw oracle user=x path=prod;
+proc sql;
+  create table out as select a.* from dw.sales a inner join keys k on a.id = k.id;
+  create table out2 as select * from dw.sales where id in (select id from mylist);
+quit;
+"""
+    rows = analyze_sql(code, "prog.sas", LibrefRegistry.from_code(code, db_only=True))
+    assert [row["PUSHDOWN"] for row in rows] == ["No", "No"]
+    assert rows[0]["input_tables"] == "dw.sales, work.keys"
+    assert "join across librefs (dw, work)" in rows[0]["blockers"]
+    assert "non-database input (work)" in rows[1]["blockers"]
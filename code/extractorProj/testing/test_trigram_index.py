@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for trigram_index.py
+"""
+import os
+import re
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from trigram_index import TrigramIndex, required_trigrams
+
+
+def plan(pattern):
+    return required_trigrams(sre_parse.parse(pattern, re.IGNORECASE))
+
+
+def test_required_trigrams():
+    assert plan("Proc") == ("and", [("tri", "pro"), ("tri", "roc")])
+    assert plan(r"sql\s+conn") == ("and", [("tri", "sql"), ("tri", "con"), ("tri", "onn")])
+    # Alternation needs one of its branches
+    assert plan(r"to\s+(oracle|db2)") == ("or", [("and", [("tri", "ora"), ("tri", "rac"), ("tri", "acl"),
+                                                            ("tri", "cle")]),
+                                                   ("tri", "db2")])
+    # Nothing is required from short literals, optional parts or a branch without trigrams
+    assert plan("ab") is None
+    assert plan("(?:libname)?") is None
+    assert plan("oracle|ab") is None
+
+
+def write(root, name, text):
+    path = root / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_incremental_add_and_remove(tmp_path):
+    ora = write(tmp_path, "ora.sas", "libname db oracle path=x;")
+    tera = write(tmp_path, "tera.sas", "libname db teradata server=y;")
+    index = TrigramIndex(str(tmp_path))
+    assert index.update() == (2, 0, 0)
+    assert index.candidates("oracle", re.IGNORECASE) == [ora]
+    assert [hit[0] for hit in index.search("ORACLE|teradata")] == [ora, tera]
+
+    assert index.update() == (0, 0, 0)
+    os.remove(ora)
+    assert index.update() == (0, 0, 1)
+    assert index.candidates("oracle") == []
+
+    new = write(tmp_path, "new.sas", "proc sql; connect to oracle; quit;")
+    assert index.update() == (1, 0, 0)
+    assert index.candidates("oracle") == [new]
+
+
+def test_compaction_renumbers_ids(tmp_path):
+    paths = [write(tmp_path, f"p{i}.sas", f"data out{i}; set src.table{i}; run;") for i in range(6)]
+    index = TrigramIndex(str(tmp_path))
+    index.update()
+    for path in paths[:4]:
+        os.remove(path)
+    index.update()
+
+    # Ids are dense again, so the next update does not compact a second time
+    assert index.next_id == 2 and sorted(index.paths) == [0, 1]
+    assert {file_id for ids in index.postings.values() for file_id in ids} == {0, 1}
+    assert index.candidates("table5") == [paths[5]]
+
+    index_path = str(tmp_path / "index.pkl")
+    index.save(index_path)
+    reloaded = TrigramIndex.load(index_path, str(tmp_path))
+    assert reloaded.update() == (0, 0, 0)
+    assert reloaded.candidates("src.table4") == [paths[4]]
+    assert reloaded.candidates("src.table0") == []
@@ -0,0 +1,232 @@
+import argparse
+import os
+import pickle
+import re
+import time
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from extractor2 import DB_SYNTAX_PATTERNS, strip_comments
+
+INDEX_VERSION = 1
+
+# Rebuild the postings once this share of file ids belongs to deleted/changed files
+COMPACT_RATIO = 0.5
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+class TrigramIndex:
+    """
+    Trigram index over the .sas files below a root folder.
+    A regex search first narrows the corpus to files containing every trigram the
+    regex requires, then runs the full regex on those candidates only.
+    Trigrams are lower-cased, so the candidate set is also valid for IGNORECASE searches.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}        # path -> (mtime_ns, size, file_id)
+        self.paths = {}        # live file_id -> path
+        self.postings = {}     # trigram -> set of file ids
+        self.next_id = 0
+
+    @classmethod
+    def load(cls, index_path, root):
+        index = cls(root)
+        if os.path.isfile(index_path):
+            with open(index_path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") == INDEX_VERSION and state.get("root") == root:
+                index.files, index.postings, index.next_id = state["files"], state["postings"], state["next_id"]
+                index.paths = {file_id: path for path, (_, _, file_id) in index.files.items()}
+            else:
+                print(f"⚠️ '{index_path}' was built for another folder or version, rebuilding.")
+        return index
+
+    def save(self, index_path):
+        state = {"version": INDEX_VERSION, "root": self.root, "files": self.files,
+                 "postings": self.postings, "next_id": self.next_id}
+        with open(index_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def update(self):
+        """Brings the index in line with the folder; only new or changed files are read."""
+        seen = set()
+        added = changed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.lower().endswith(".sas"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                seen.add(path)
+                stat = os.stat(path)
+                known = self.files.get(path)
+                if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                if known:
+                    self._forget(path)
+                    changed += 1
+                else:
+                    added += 1
+                self._add(path, stat)
+
+        removed = [path for path in self.files if path not in seen]
+        for path in removed:
+            self._forget(path)
+
+        # Ids of forgotten files stay in the postings until the next compaction
+        if self.next_id and len(self.paths) < self.next_id * (1 - COMPACT_RATIO):
+            self._compact()
+        return added, changed, len(removed)
+
+    def _add(self, path, stat):
+        file_id = self.next_id
+        self.next_id += 1
+        self.files[path] = (stat.st_mtime_ns, stat.st_size, file_id)
+        self.paths[file_id] = path
+        for gram in trigrams(read_text(path)):
+            self.postings.setdefault(gram, set()).add(file_id)
+
+    def _forget(self, path):
+        _, _, file_id = self.files.pop(path)
+        del self.paths[file_id]
+
+    def _compact(self):
+        """Drops forgotten ids and renumbers the live files 0..n-1."""
+        renumber = {old: new for new, old in enumerate(sorted(self.paths))}
+        postings = {}
+        for gram, ids in self.postings.items():
+            ids = {renumber[file_id] for file_id in ids if file_id in renumber}
+            if ids:
+                postings[gram] = ids
+        self.postings = postings
+        self.files = {path: (mtime, size, renumber[file_id]) for path, (mtime, size, file_id) in self.files.items()}
+        self.paths = {renumber[file_id]: path for file_id, path in self.paths.items()}
+        self.next_id = len(self.paths)
+
+    def candidates(self, pattern, flags=0):
+        """Live file paths that may match the regex (a superset of the real matches)."""
+        plan = required_trigrams(sre_parse.parse(pattern, flags))
+        ids = self._evaluate(plan)
+        if ids is None:
+            return sorted(self.paths.values())
+        return sorted(self.paths[file_id] for file_id in ids if file_id in self.paths)
+
+    def _evaluate(self, plan):
+        if plan is None:
+            return None
+        op, args = plan
+        if op == "tri":
+            return self.postings.get(args, set())
+
+        results = [self._evaluate(child) for child in args]
+        if op == "and":
+            known = [result for result in results if result is not None]
+            if not known:
+                return None
+            return set.intersection(*sorted(known, key=len))
+        if any(result is None for result in results):
+            return None
+        return set().union(*results)
+
+    def search(self, pattern, flags=re.IGNORECASE, code_only=False):
+        """Yields (path, line_number, line) for every regex match in the candidate files."""
+        regex = re.compile(pattern, flags)
+        for path in self.candidates(pattern, flags):
+            text = read_text(path)
+            if code_only:
+                text = strip_comments(text)
+            for match in regex.finditer(text):
+                line_number = text.count("\n", 0, match.start()) + 1
+                line = text[text.rfind("\n", 0, match.start()) + 1:].split("\n", 1)[0]
+                yield path, line_number, line.strip()
+
+
+def required_trigrams(parsed):
+    """
+    Turns a parsed regex into a query plan over trigrams:
+    ("tri", gram), ("and", [plans]), ("or", [plans]) or None when nothing is required.
+    """
+    parts = []
+    run = []
+
+    def flush():
+        text = "".join(run).lower()
+        parts.extend(("tri", text[i:i + 3]) for i in range(len(text) - 2))
+        run.clear()
+
+    for op, av in parsed:
+        name = str(op)
+        if name == "LITERAL":
+            run.append(chr(av))
+            continue
+        flush()
+        if name == "SUBPATTERN":
+            parts.append(required_trigrams(av[-1]))
+        elif name == "BRANCH":
+            branches = [required_trigrams(branch) for branch in av[1]]
+            parts.append(None if any(branch is None for branch in branches) else ("or", branches))
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and av[0] >= 1:
+            parts.append(required_trigrams(av[2]))
+        elif name == "ATOMIC_GROUP":
+            parts.append(required_trigrams(av))
+    flush()
+
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ("and", parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigram-accelerated regex search over SAS programs.")
+    parser.add_argument("pattern", nargs="?", help="Regex to search for (case-insensitive by default)")
+    parser.add_argument("--base-dir", default="SAS Files", help="Folder containing the .sas files")
+    parser.add_argument("--index", default="trigram_index.pkl", help="Index file, updated incrementally")
+    parser.add_argument("--case-sensitive", action="store_true")
+    parser.add_argument("--code-only", action="store_true", help="Ignore matches inside comments")
+    parser.add_argument("--db-syntax", action="store_true",
+                        help="Run extractor2's database-specific syntax audits over the corpus")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.base_dir):
+        print(f"❌ '{args.base_dir}' folder not found.")
+        return
+
+    start = time.perf_counter()
+    index = TrigramIndex.load(args.index, args.base_dir)
+    added, changed, removed = index.update()
+    if added or changed or removed or not os.path.isfile(args.index):
+        index.save(args.index)
+    print(f"🗂️ Index: {len(index.paths)} files ({added} added, {changed} changed, {removed} removed) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    searches = [(pattern, description) for pattern, description in DB_SYNTAX_PATTERNS] if args.db_syntax else []
+    if args.pattern:
+        searches.append((args.pattern, args.pattern))
+    flags = 0 if args.case_sensitive else re.IGNORECASE
+
+    for pattern, description in searches:
+        start = time.perf_counter()
+        candidates = index.candidates(pattern, flags)
+        matches = list(index.search(pattern, flags, args.code_only))
+        print(f"\n🔍 {description}: {len(matches)} matches in {len(candidates)}/{len(index.paths)} candidate files "
+              f"({time.perf_counter() - start:.3f}s)")
+        for path, line_number, line in matches:
+            print(f"  {path}:{line_number}: {line}")
+
+
+if __name__ == "__main__":
+    main()
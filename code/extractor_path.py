@@ -0,0 +1,14 @@
+"""
+Makes the modules in extractorProj/ (sql_parser, libref_registry, session_sim, ...)
+importable from the analyzers in this folder. Import it before any of them:
+
+    import extractor_path  # noqa: F401
+    from sql_parser import sql_tables
+"""
+import os
+import sys
+
+EXTRACTOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extractorProj')
+
+if EXTRACTOR_DIR not in sys.path:
+    sys.path.append(EXTRACTOR_DIR)
@@ -0,0 +1,198 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from macro_symbols import MacroVariableResolver, SymbolTable
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INCLUDE_RE = re.compile(r'^\s*%inc(?:lude)?\s+(.*?)\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+INCLUDE_TARGET_RE = re.compile(r'"[^"]*"|\'[^\']*\'|\w+\s*\(\s*[^)]*\)|\w+')
+FILENAME_RE = re.compile(r'^\s*filename\s+(\w+)\s+(?:\w+\s+)?(["\'])(.*?)\2', re.IGNORECASE | re.DOTALL)
+PATH_SPLIT_RE = re.compile(r'[\\/]')
+
+
+class IncludeResolver(MacroVariableResolver):
+    """
+    Inlines %include targets recursively while walking a program in statement order.
+
+    Targets may be quoted paths (macro variables resolved with the session's symbol
+    table), filerefs from earlier FILENAME statements, or fileref(member) references.
+    A target is looked up relative to the including file, then in the search
+    directories, then by file name anywhere in the corpus; a file name found in more
+    than one place is reported as ambiguous with its candidates rather than guessed.
+    The statements of every file are parsed once per (path, mtime, size) and shared
+    by all includers.
+    """
+
+    def __init__(self, search_dirs: Optional[List[str]] = None):
+        super().__init__()
+        self.search_dirs = search_dirs or []
+        self._parsed: Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int]]]] = {}
+        self.cache_stats = {'parsed': 0, 'reused': 0}
+        self._by_name: Dict[str, List[str]] = defaultdict(list)
+        for directory in self.search_dirs:
+            for path in glob.glob(os.path.join(directory, '**', '*.sas'), recursive=True):
+                # Nested search directories list the same file more than once
+                same_name = self._by_name[os.path.basename(path).lower()]
+                if all(os.path.realpath(known) != os.path.realpath(path) for known in same_name):
+                    same_name.append(path)
+        self.reset()
+
+    def reset(self):
+        """Start a new SAS session; the parsed-file cache is kept."""
+        self.symbols = SymbolTable()
+        self.macros = {}
+        self.filerefs: Dict[str, str] = {}
+        self.includes: List[Dict] = []
+        self._active: List[str] = []
+
+    def resolve_file(self, filepath: str) -> List[Dict]:
+        self._active = [os.path.realpath(filepath)]
+        return super().resolve_file(filepath)
+
+    def _statements(self, filepath: str) -> List[Tuple[str, int]]:
+        key = os.path.realpath(filepath)
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._parsed.get(key)
+        if cached and cached[0] == version:
+            self.cache_stats['reused'] += 1
+            return cached[1]
+        statements = super()._statements(filepath)
+        self._parsed[key] = (version, statements)
+        self.cache_stats['parsed'] += 1
+        return statements
+
+    def _apply(self, stmt: str, filepath: str, rows: List[Dict], depth: int):
+        filename = FILENAME_RE.match(stmt)
+        if filename:
+            self.filerefs[filename.group(1).lower()] = filename.group(3)
+            return
+
+        include = INCLUDE_RE.match(stmt)
+        if not include:
+            super()._apply(stmt, filepath, rows, depth)
+            return
+
+        line = rows[-1]['line_number'] if rows else None
+        # Options such as /source2 follow the last target
+        spec = include.group(1)
+        options = spec.find('/', max(spec.rfind('"'), spec.rfind("'"), spec.rfind(')')) + 1)
+        if options != -1:
+            spec = spec[:options]
+        for target in INCLUDE_TARGET_RE.findall(spec):
+            self._include(target, filepath, line, rows, depth)
+
+    def _include(self, target: str, includer: str, line: Optional[int], rows: List[Dict], depth: int):
+        path, status, candidates = self.locate(target, includer)
+        if path and os.path.realpath(path) in self._active:
+            status = 'cycle'
+        self.includes.append({
+            'program': self._active[0] if self._active else includer,
+            'includer': includer,
+            'line_number': line,
+            'target': target,
+            'resolved_path': path,
+            'status': status,
+            'candidates': ', '.join(candidates),
+            'depth': len(self._active),
+        })
+        if status != 'resolved':
+            return
+
+        self._active.append(os.path.realpath(path))
+        try:
+            self._run(self._statements(path), path, rows, depth + 1)
+        finally:
+            self._active.pop()
+
+    def locate(self, target: str, includer: str) -> Tuple[Optional[str], str, List[str]]:
+        """
+        Returns (path, status, candidates) with status resolved, missing, ambiguous,
+        unresolved_variable or unknown_fileref; candidates lists the files an
+        ambiguous file name matched.
+        """
+        target = target.strip()
+        if target[:1] in ('"', "'"):
+            relative = target[1:-1]
+        else:
+            member = re.match(r'^(\w+)\s*\(\s*([^)]*?)\s*\)$', target)
+            fileref = (member.group(1) if member else target).lower()
+            if fileref not in self.filerefs:
+                return None, 'unknown_fileref', []
+            relative = self.filerefs[fileref]
+            if member:
+                name = member.group(2).strip('\'"')
+                relative = f"{relative.rstrip('/')}/{name if '.' in name else name + '.sas'}"
+
+        if '&' in relative:
+            return None, 'unresolved_variable', []
+
+        candidates = [relative] if os.path.isabs(relative) else [os.path.join(os.path.dirname(includer), relative)]
+        candidates += [os.path.join(directory, relative) for directory in self.search_dirs]
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate, 'resolved', []
+
+        # Paths written on another machine (C:\..., /folders/myfolders/...) fall back to the file name
+        matches = self._by_name.get(PATH_SPLIT_RE.split(relative)[-1].lower(), [])
+        if len(matches) == 1:
+            return matches[0], 'resolved', []
+        if matches:
+            return None, 'ambiguous', sorted(matches)
+        return None, 'missing', []
+
+
+def resolve_includes(pattern: str, search_dirs: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Include edges for every program matching the pattern, sharing one parse cache."""
+    sas_files = glob.glob(pattern, recursive=True)
+    if search_dirs is None:
+        search_dirs = sorted({os.path.dirname(path) for path in sas_files})
+    resolver = IncludeResolver(search_dirs)
+    edges = []
+    for sas_file in sas_files:
+        resolver.reset()
+        try:
+            resolver.resolve_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to expand {sas_file}: {str(e)}")
+            continue
+        edges.extend(resolver.includes)
+    logger.info(f"Parsed {resolver.cache_stats['parsed']} files, reused {resolver.cache_stats['reused']} parses")
+    return pd.DataFrame(edges), resolver.cache_stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Follow %include chains recursively across the corpus")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS programs")
+    parser.add_argument('--search-dir', action='append', help="Directory to look for included files (repeatable)")
+    parser.add_argument('--output', default='include_graph.xlsx')
+    args = parser.parse_args(argv)
+
+    edges, _ = resolve_includes(args.pattern, args.search_dir)
+    if edges.empty:
+        print("No %include statements found")
+        return edges
+
+    edges.to_excel(args.output, index=False)
+    print("\n=== %INCLUDE RESOLUTION ===")
+    print(edges['status'].value_counts().to_string())
+    problems = edges[edges['status'] != 'resolved']
+    for _, row in problems.drop_duplicates(['includer', 'target']).iterrows():
+        print(f"  {row['status']:<20} {os.path.basename(row['includer'])}:{row['line_number']} {row['target']}")
+        if row['candidates']:
+            print(f"  {'':<20} candidates: {row['candidates']}")
+    print(f"\nDetails written to {args.output}")
+    return edges
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import glob
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from sas_steps import StepGrouper, dataset_option, libref_of, load_table_sizes, normalize_table
+from sql_parser import parse_sql, tokenize, walk
+from where_advisor import condition_variables
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TRANSIENT_LIBREFS = {'work', 'sashelp', 'dictionary', 'sasuser'}
+
+# Key uses that are served by an index, and those served by the stored order / CAS partitioning
+LOOKUP_USES = {'where', 'join'}
+ORDER_USES = {'by', 'merge_by'}
+
+
+def _split_tokens(tokens: List[Tuple[str, str]], word: str) -> List[List[Tuple[str, str]]]:
+    """Split a token list on a top-level AND/OR; the AND of 'between x and y' does not split."""
+    parts, depth, between = [[]], 0, set()
+    for kind, value in tokens:
+        lowered = value.lower() if kind == 'name' else None
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth -= 1
+        elif lowered == 'between':
+            between.add(depth)
+        elif lowered == 'and' and depth in between:
+            between.discard(depth)
+        elif lowered == word and depth == 0:
+            parts.append([])
+            continue
+        parts[-1].append((kind, value))
+    return [part for part in parts if part]
+
+
+def _strip_parens(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    while len(tokens) > 2 and tokens[0][1] == '(' and tokens[-1][1] == ')':
+        depth = 0
+        for i, (_, value) in enumerate(tokens):
+            depth += value == '('
+            depth -= value == ')'
+            if depth == 0 and i < len(tokens) - 1:
+                return tokens
+        tokens = tokens[1:-1]
+    return tokens
+
+
+def key_terms(condition: str) -> List[Tuple[str, bool]]:
+    """
+    Split a condition into (text, composite) terms: the AND-connected comparisons
+    together make one composite key, each branch of an OR gets simple keys.
+    'a = 1 and (b = 2 or c = 3)' -> [('a = 1', True), ('b = 2', False), ('c = 3', False)]
+    """
+    composite, terms = [], []
+    for conjunct in _split_tokens(tokenize(condition), 'and'):
+        conjunct = _strip_parens(conjunct)
+        branches = _split_tokens(conjunct, 'or')
+        if len(branches) > 1:
+            terms.extend((' '.join(value for _, value in branch), False) for branch in branches)
+        else:
+            composite.append(' '.join(value for _, value in conjunct))
+    if composite:
+        terms.insert(0, (' and '.join(composite), True))
+    return terms
+
+
+def qualified_columns(predicate: str, aliases: Dict[str, str], default: Optional[str]) -> Dict[str, List[str]]:
+    """table -> columns referenced in an SQL predicate; unqualified columns belong to 'default'."""
+    tokens = tokenize(predicate)
+    columns = defaultdict(list)
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind == 'name' and following == '.' and i + 2 < len(tokens) and tokens[i + 2][0] == 'name':
+            table = aliases.get(value.lower())
+            if table:
+                columns[table].append(tokens[i + 2][1].lower())
+            i += 3
+            continue
+        if kind == 'name' and default and following != '(' and value.lower() in condition_variables(value):
+            columns[default].append(value.lower())
+        i += 1
+    return {table: list(dict.fromkeys(names)) for table, names in columns.items()}
+
+
+class IndexAdvisor:
+    """
+    Collects the columns each permanent table is filtered, joined and grouped on:
+    WHERE statements and WHERE= options, BY statements of steps reading the table,
+    MERGE ... BY keys and the WHERE/ON predicates of PROC SQL queries. Key sets
+    used by many steps on large tables become index candidates (lookups) or
+    ordering / CAS partitioning candidates (BY processing).
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None):
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+        # (table, key columns) -> {'uses': Counter, 'steps': set, 'files': set}
+        self.workload: Dict[Tuple[str, Tuple[str, ...]], Dict] = defaultdict(
+            lambda: {'uses': Counter(), 'steps': set(), 'files': set()})
+
+    def add_file(self, filepath: str):
+        for step in self.grouper.file_steps(filepath):
+            step_key = (filepath, step['step_id'])
+            if step['proc'] == 'SQL':
+                self._sql_step(step, step_key)
+                continue
+            inputs = [ref for ref in step['inputs'] if self.is_permanent(ref['table'])]
+            by_keys = tuple(f"descending {name}" if descending else name
+                            for name, descending in step['by'] if name != '_all_')
+            # A WHERE statement cannot be attributed to one table of a MERGE or of several SETs
+            step_where = step['where'] if len({ref['table'] for ref in step['inputs']}) == 1 else []
+            for ref in inputs:
+                where = dataset_option(ref['options'], 'where')
+                for condition in step_where + ([where] if where else []):
+                    for text, composite in key_terms(condition):
+                        self._record_key(ref['table'], condition_variables(text), composite, 'where', step_key)
+                if by_keys:
+                    use = 'merge_by' if ref['role'] in ('merge', 'update') else 'by'
+                    self._record(ref['table'], by_keys, use, step_key, ordered=True)
+
+    def _sql_step(self, step: Dict, step_key):
+        for statement in step.get('queries', []):
+            for query in parse_sql(statement['text']):
+                for node in walk(query):
+                    tables = [source for source in node['sources'] if source['table']]
+                    aliases = {}
+                    for source in tables:
+                        table = normalize_table(source['table'])
+                        aliases[table.split('.', 1)[1]] = table
+                        aliases[source['table'].lower()] = table
+                        if source['alias']:
+                            aliases[source['alias'].lower()] = table
+                    default = normalize_table(tables[0]['table']) if len(tables) == 1 else None
+                    join_conditions = {join['on'] for join in node['joins'] if join['on']}
+                    for predicate in node['predicates']:
+                        use = 'join' if predicate in join_conditions else 'where'
+                        for text, composite in key_terms(predicate):
+                            for table, columns in qualified_columns(text, aliases, default).items():
+                                if self.is_permanent(table):
+                                    self._record_key(table, columns, composite, use, step_key)
+                    for table, columns in qualified_columns(', '.join(node['group_by']), aliases, default).items():
+                        if self.is_permanent(table):
+                            self._record(table, columns, 'by', step_key, ordered=True)
+
+    @staticmethod
+    def is_permanent(table: str) -> bool:
+        return libref_of(table) not in TRANSIENT_LIBREFS and '&' not in table and '.' in table
+
+    def _record_key(self, table, columns, composite, use, step_key):
+        """One composite key for AND-connected columns, otherwise a simple key per column."""
+        if composite:
+            self._record(table, columns, use, step_key)
+        else:
+            for column in dict.fromkeys(columns):
+                self._record(table, [column], use, step_key)
+
+    def _record(self, table, columns, use, step_key, ordered=False):
+        columns = tuple(columns) if ordered else tuple(sorted(set(columns)))
+        if not columns:
+            return
+        entry = self.workload[(table, columns)]
+        entry['uses'][use] += 1
+        entry['steps'].add(step_key)
+        entry['files'].add(step_key[0])
+
+    def recommendations(self) -> pd.DataFrame:
+        rows = []
+        for (table, columns), entry in self.workload.items():
+            size = self.sizes.get(table, {})
+            uses = entry['uses']
+            lookups = sum(count for use, count in uses.items() if use in LOOKUP_USES)
+            ordered = sum(count for use, count in uses.items() if use in ORDER_USES)
+            key = ', '.join(columns)
+            advice = []
+            if lookups:
+                kind = 'simple' if len(columns) == 1 else 'composite'
+                advice.append(f"{kind} index on ({key}); for the CAS table, index it on {key} with the table.index action")
+            if ordered:
+                advice.append(f"store {table} sorted by {key} (SORTEDBY=) or partition/order the CAS table by {key}")
+            est_bytes = size.get('bytes')
+            rows.append({
+                'table': table,
+                'key_columns': key,
+                'uses': ', '.join(f"{use}:{count}" for use, count in uses.most_common()),
+                'steps': len(entry['steps']),
+                'programs': len(entry['files']),
+                'est_rows': size.get('rows'),
+                'est_bytes': est_bytes,
+                # Steps sped up, weighted by the data each of them reads
+                'score': len(entry['steps']) * (est_bytes or 1),
+                'recommendation': '; '.join(advice),
+            })
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return df
+        return df.sort_values(['score', 'steps', 'programs'], ascending=False).reset_index(drop=True)
+
+
+def advise(pattern: str, sizes_file: Optional[str] = None) -> pd.DataFrame:
+    advisor = IndexAdvisor(load_table_sizes(sizes_file))
+    sas_files = glob.glob(pattern, recursive=True)
+    for sas_file in sas_files:
+        try:
+            advisor.add_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    logger.info(f"Collected {len(advisor.workload)} table/key combinations from {len(sas_files)} SAS files")
+    return advisor.recommendations()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Recommend indexes and ordering keys from WHERE/BY/join usage")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='index_advice.xlsx')
+    args = parser.parse_args(argv)
+
+    df = advise(args.pattern, args.sizes)
+    if df.empty:
+        print("No WHERE, BY or join keys found on permanent tables")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== INDEX / ORDERING CANDIDATES ===")
+    for _, row in df.head(20).iterrows():
+        print(f"  {row['table']:<30} ({row['key_columns']}) {row['steps']} steps in {row['programs']} programs "
+              f"[{row['uses']}]")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import glob
+import logging
+import os
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from claudeCode import SASAnalyzer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Macro language statements, macro functions and SAS-supplied autocall macros.
+# A %name matching one of these is never a user macro call.
+BUILTIN_MACROS = {
+    'let', 'put', 'if', 'then', 'else', 'do', 'end', 'to', 'by', 'until', 'while', 'global', 'local',
+    'macro', 'mend', 'include', 'inc', 'goto', 'return', 'abort', 'label', 'window', 'display', 'input',
+    'copy', 'list', 'run', 'symdel', 'syslput', 'sysrput', 'syscall', 'sysexec', 'sysmacdelete',
+    'sysmstoreclear', 'sysfunc', 'qsysfunc', 'eval', 'sysevalf', 'str', 'nrstr', 'quote', 'nrquote',
+    'bquote', 'nrbquote', 'superq', 'unquote', 'scan', 'qscan', 'substr', 'qsubstr', 'upcase', 'qupcase',
+    'lowcase', 'qlowcase', 'index', 'length', 'symexist', 'symglobl', 'symlocal', 'sysget', 'sysprod',
+    'sysmexecdepth', 'sysmexecname', 'sysmacexec', 'sysmacexist', 'cmpres', 'qcmpres', 'left', 'qleft',
+    'trim', 'qtrim', 'verify', 'datatyp', 'compstor', 'kverify', 'ksubstr', 'kscan', 'kindex', 'klength',
+    'kupcase', 'klowcase', 'kcmpres', 'kleft', 'ktrim',
+}
+
+MacroDef = Dict[str, object]
+
+
+class MacroIndex:
+    """
+    Corpus-wide index of macro definitions built in one pass over SASAnalyzer results.
+    Each call site is resolved with two dictionary lookups: a definition in the same
+    file wins (the last one compiled before the call), otherwise the corpus-wide one.
+    Same-file definitions are matched to their calls while the file is added, in one
+    pass over both in line order.
+    """
+
+    def __init__(self):
+        self.analyzer = SASAnalyzer()
+        self.definitions: Dict[str, List[MacroDef]] = defaultdict(list)
+        # (file, macro name, call line) -> (same-file definition, same-file definition count)
+        self.local_definitions: Dict[Tuple[str, str, int], Tuple[MacroDef, int]] = {}
+        self.calls: List[Dict] = []
+
+    def add_file(self, filepath: str):
+        results = self.analyzer.extract_sas_info(filepath)
+        definitions = results['macro'].to_dict('records') if not results['macro'].empty else []
+        calls = results['macro_calls'].to_dict('records') if not results['macro_calls'].empty else []
+
+        file_defs = []
+        defs_by_name: Dict[str, List[MacroDef]] = defaultdict(list)
+        for row in definitions:
+            definition = {
+                'macro_name': row['macro_name'],
+                'file': filepath,
+                'start_line': int(row['start_line']),
+                'end_line': None if pd.isna(row.get('end_line')) else int(row['end_line']),
+            }
+            key = row['macro_name'].lower()
+            self.definitions[key].append(definition)
+            defs_by_name[key].append(definition)
+            file_defs.append(definition)
+
+        seen = set()
+        for row in sorted(calls, key=lambda row: int(row['line_number'])):
+            name = row['macro_name']
+            line = int(row['line_number'])
+            # Statement-style calls also match the function-style pattern
+            if name.lower() in BUILTIN_MACROS or (name.lower(), line) in seen:
+                continue
+            seen.add((name.lower(), line))
+            self.calls.append({
+                'macro_name': name,
+                'file': filepath,
+                'line_number': line,
+                'caller': self._enclosing_macro(file_defs, line, name),
+            })
+        self._match_local_definitions(filepath, defs_by_name, sorted(seen, key=lambda call: call[1]))
+
+    def _match_local_definitions(self, filepath: str, defs_by_name: Dict[str, List[MacroDef]],
+                                 calls: List[Tuple[str, int]]):
+        """Pairs each call with the last same-file definition compiled before it (else the first)."""
+        for local in defs_by_name.values():
+            local.sort(key=lambda d: d['start_line'])
+        position: Dict[str, int] = defaultdict(int)
+        for key, line in calls:
+            local = defs_by_name.get(key)
+            if not local:
+                continue
+            i = position[key]
+            while i + 1 < len(local) and local[i + 1]['start_line'] <= line:
+                i += 1
+            position[key] = i
+            self.local_definitions[(filepath, key, line)] = (local[i], len(local))
+
+    @staticmethod
+    def _enclosing_macro(file_defs: List[MacroDef], line: int, callee: str) -> Optional[str]:
+        """Innermost macro whose body contains the line (None for open code)."""
+        enclosing = None
+        for definition in file_defs:
+            end = definition['end_line']
+            if definition['start_line'] <= line and (end is None or line <= end):
+                # The %macro statement itself is not a call from inside the macro
+                if definition['start_line'] == line and definition['macro_name'].lower() == callee.lower():
+                    continue
+                if enclosing is None or definition['start_line'] >= enclosing['start_line']:
+                    enclosing = definition
+        return enclosing['macro_name'] if enclosing else None
+
+    def resolve(self, call: Dict) -> Tuple[str, Optional[MacroDef], int]:
+        """Returns (status, definition, candidate count) for one call site."""
+        key = call['macro_name'].lower()
+        local = self.local_definitions.get((call['file'], key, call['line_number']))
+        if local:
+            definition, count = local
+            return 'resolved_local', definition, count
+
+        candidates = self.definitions.get(key)
+        if not candidates:
+            return 'unresolved', None, 0
+        status = 'resolved' if len(candidates) == 1 else 'ambiguous'
+        return status, candidates[0], len(candidates)
+
+    def resolved_calls(self) -> pd.DataFrame:
+        rows = []
+        for call in self.calls:
+            status, definition, candidates = self.resolve(call)
+            rows.append({
+                **call,
+                'status': status,
+                'definition_file': definition['file'] if definition else None,
+                'definition_line': definition['start_line'] if definition else None,
+                'candidate_definitions': candidates,
+            })
+        return pd.DataFrame(rows)
+
+    def call_graph(self) -> pd.DataFrame:
+        """Edges caller -> callee, where callers are macros or '<file>' for open code."""
+        edges = Counter()
+        for call in self.calls:
+            status, definition, _ = self.resolve(call)
+            caller = call['caller'] or f"<{os.path.basename(call['file'])}>"
+            callee_file = definition['file'] if definition else None
+            edges[(caller.lower(), call['file'], call['macro_name'].lower(), callee_file, status)] += 1
+        return pd.DataFrame(
+            [{'caller': caller, 'caller_file': caller_file, 'callee': callee, 'callee_file': callee_file,
+              'status': status, 'calls': count}
+             for (caller, caller_file, callee, callee_file, status), count in edges.items()]
+        )
+
+    def definitions_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([d for defs in self.definitions.values() for d in defs])
+
+
+def build_macro_index(pattern: str) -> MacroIndex:
+    index = MacroIndex()
+    sas_files = glob.glob(pattern, recursive=True)
+    logger.info(f"Indexing macros in {len(sas_files)} SAS files")
+    for sas_file in sas_files:
+        index.add_file(sas_file)
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Resolve macro calls to definitions across the corpus")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--output', default='macro_index.xlsx')
+    args = parser.parse_args(argv)
+
+    index = build_macro_index(args.pattern)
+    calls = index.resolved_calls()
+    graph = index.call_graph()
+
+    with pd.ExcelWriter(args.output) as writer:
+        index.definitions_frame().to_excel(writer, sheet_name='definitions', index=False)
+        calls.to_excel(writer, sheet_name='calls', index=False)
+        graph.to_excel(writer, sheet_name='call_graph', index=False)
+
+    print("\n=== MACRO INDEX SUMMARY ===")
+    print(f"Definitions: {sum(len(defs) for defs in index.definitions.values())} "
+          f"({len(index.definitions)} distinct names)")
+    if not calls.empty:
+        print(f"Call sites: {len(calls)}")
+        print(calls['status'].value_counts().to_string())
+        unresolved = calls[calls['status'] == 'unresolved']
+        if not unresolved.empty:
+            print("\nUnresolved macros:")
+            for name, count in unresolved['macro_name'].str.lower().value_counts().head(20).items():
+                print(f"  %{name}: {count} calls")
+    print(f"\nDetails written to {args.output}")
+    return index
+
+
+if __name__ == "__main__":
+    main()
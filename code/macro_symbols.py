@@ -0,0 +1,308 @@
+import argparse
+import glob
+import logging
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from claudeCode import SASAnalyzer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REF_RE = re.compile(r'(&+)([A-Za-z_]\w*)(\.?)')
+LET_RE = re.compile(r'^\s*%let\s+(\w+)\s*=(.*?);?\s*$', re.IGNORECASE | re.DOTALL)
+SCOPE_RE = re.compile(r'^\s*%(global|local)\s+([^;]*);?\s*$', re.IGNORECASE | re.DOTALL)
+MACRO_DEF_RE = re.compile(r'^\s*%macro\s+(\w+)\s*(?:\((.*?)\))?\s*(?:/[^;]*)?;?\s*$', re.IGNORECASE | re.DOTALL)
+MACRO_END_RE = re.compile(r'%mend\b', re.IGNORECASE)
+MACRO_CALL_RE = re.compile(r'^\s*%(\w+)\s*(?:\((.*)\))?\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+SYMPUT_RE = re.compile(
+    r'\bcall\s+symputx?\s*\(\s*([\'"])(\w+)\1\s*,\s*([\'"])(.*?)\3', re.IGNORECASE | re.DOTALL)
+
+MAX_RESCANS = 20
+MAX_CALL_DEPTH = 20
+
+
+def split_arguments(text: str) -> List[str]:
+    """Split macro parameters/arguments on commas outside parentheses and quotes."""
+    args, current, depth, quote = [], [], 0, None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            args.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if ''.join(current).strip():
+        args.append(''.join(current).strip())
+    return args
+
+
+class SymbolTable:
+    """
+    Macro variable symbol table with a global scope and a stack of local scopes.
+
+    Assignment follows the SAS rules: %let updates the nearest scope that already
+    holds the variable, otherwise it creates it in the innermost scope. Every scope
+    carries a stamp that changes whenever one of its symbols does, and resolved
+    expressions are memoized per tuple of stamps: a change invalidates nothing
+    explicitly, and once a macro call returns the caller's earlier entries apply
+    again. Self-referencing values are reported as cycles instead of looping forever.
+    """
+
+    def __init__(self):
+        self.scopes: List[Tuple[str, Dict[str, str]]] = [('GLOBAL', {})]
+        self.cycles: Set[str] = set()
+        self._stamps: List[int] = [0]
+        self._last_stamp = 0
+        self._memo: Dict[Tuple[Tuple[int, ...], str], Tuple[str, Tuple[str, ...]]] = {}
+
+    @property
+    def scope_name(self) -> str:
+        return self.scopes[-1][0]
+
+    @property
+    def version(self) -> Tuple[int, ...]:
+        return tuple(self._stamps)
+
+    def _touch(self, index: int):
+        self._last_stamp += 1
+        self._stamps[index] = self._last_stamp
+
+    def push(self, macro_name: str):
+        self.scopes.append((macro_name, {}))
+        self._stamps.append(0)
+        self._touch(-1)
+
+    def pop(self):
+        if len(self.scopes) > 1:
+            self.scopes.pop()
+            self._stamps.pop()
+
+    def lookup(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for _, symbols in reversed(self.scopes):
+            if name in symbols:
+                return symbols[name]
+        return None
+
+    def assign(self, name: str, value: str):
+        name = name.lower()
+        index = next((i for i in range(len(self.scopes) - 1, -1, -1) if name in self.scopes[i][1]), -1)
+        symbols = self.scopes[index][1]
+        if symbols.get(name) != value:
+            symbols[name] = value
+            self._touch(index)
+
+    def declare(self, scope: str, names: List[str]):
+        index = 0 if scope.lower() == 'global' else -1
+        symbols = self.scopes[index][1]
+        new = [name.lower() for name in names if name.lower() not in symbols]
+        if new:
+            symbols.update(dict.fromkeys(new, ''))
+            self._touch(index)
+
+    def resolve(self, text: str) -> Tuple[str, Tuple[str, ...]]:
+        """Resolve all macro variable references; returns (text, unresolved names)."""
+        if '&' not in text:
+            return text, ()
+        key = (self.version, text)
+        if key not in self._memo:
+            self._memo[key] = self._resolve(text, frozenset())
+        return self._memo[key]
+
+    def _resolve(self, text: str, resolving: frozenset,
+                 cyclic: Optional[List[str]] = None) -> Tuple[str, Tuple[str, ...]]:
+        cyclic = [] if cyclic is None else cyclic
+        unresolved: List[str] = []
+        for _ in range(MAX_RESCANS):
+            pass_unresolved: List[str] = []
+            rescanned = REF_RE.sub(lambda m: self._substitute(m, resolving, pass_unresolved, cyclic), text)
+            changed, text, unresolved = rescanned != text, rescanned, pass_unresolved
+            # A cyclic reference is left as written; another rescan would expand it again
+            if not changed or cyclic:
+                break
+        return text, tuple(dict.fromkeys(unresolved))
+
+    def _substitute(self, match: re.Match, resolving: frozenset, unresolved: List[str],
+                    cyclic: List[str]) -> str:
+        amps, name, dot = match.groups()
+        # Each '&&' collapses to '&' and is resolved on the next rescan
+        prefix = '&' * (len(amps) // 2)
+        if len(amps) % 2 == 0:
+            return prefix + name + dot
+
+        key = name.lower()
+        if key in resolving:
+            self.cycles.add(key)
+            cyclic.append(key)
+            unresolved.append(name)
+            return match.group(0)
+        value = self.lookup(key)
+        if value is None:
+            unresolved.append(name)
+            return match.group(0)
+        if '&' in value:
+            value, nested = self._resolve(value, resolving | {key}, cyclic)
+            unresolved.extend(nested)
+        return prefix + value
+
+
+class MacroVariableResolver:
+    """
+    Walks SAS programs in statement order (SASAnalyzer.split_sas_statements),
+    maintaining the symbol table through %LET, %GLOBAL/%LOCAL, CALL SYMPUT(X)
+    with literal arguments and calls to macros defined in the program, whose
+    bodies run in their own local scope with parameters bound.
+    %IF/%DO logic is not evaluated: every branch is applied in order.
+    """
+
+    def __init__(self, symbols: Optional[SymbolTable] = None):
+        self.analyzer = SASAnalyzer()
+        self.symbols = symbols or SymbolTable()
+        self.macros: Dict[str, Tuple[List[str], List[Tuple[str, int]]]] = {}
+
+    def resolve_file(self, filepath: str) -> List[Dict]:
+        rows: List[Dict] = []
+        self._run(self._statements(filepath), filepath, rows, depth=0)
+        return rows
+
+    def _statements(self, filepath: str) -> List[Tuple[str, int]]:
+        text, _ = self.analyzer.load_sas_file(filepath)
+        return self.analyzer.split_sas_statements(text)
+
+    def _run(self, statements: List[Tuple[str, int]], filepath: str, rows: List[Dict], depth: int):
+        i = 0
+        while i < len(statements):
+            stmt, line = statements[i]
+            definition = MACRO_DEF_RE.match(stmt)
+            if definition:
+                # Macro bodies run when called, not when defined
+                body, i = self._collect_body(statements, i + 1)
+                params = split_arguments(definition.group(2) or '')
+                self.macros[definition.group(1).lower()] = (params, body)
+                continue
+
+            resolved, unresolved = self.symbols.resolve(stmt)
+            rows.append({
+                'file': filepath,
+                'line_number': line,
+                'scope': self.symbols.scope_name,
+                'statement': stmt.strip(),
+                'resolved_statement': resolved.strip(),
+                'unresolved': ', '.join(unresolved),
+            })
+            self._apply(resolved, filepath, rows, depth)
+            i += 1
+
+    @staticmethod
+    def _collect_body(statements: List[Tuple[str, int]], start: int) -> Tuple[List[Tuple[str, int]], int]:
+        depth = 1
+        for j in range(start, len(statements)):
+            stmt = statements[j][0]
+            if MACRO_DEF_RE.match(stmt):
+                depth += 1
+            if MACRO_END_RE.search(stmt):
+                depth -= 1
+                if depth == 0:
+                    return statements[start:j], j + 1
+        return statements[start:], len(statements)
+
+    def _apply(self, stmt: str, filepath: str, rows: List[Dict], depth: int):
+        let = LET_RE.match(stmt)
+        if let:
+            self.symbols.assign(let.group(1), let.group(2).strip())
+            return
+
+        scope = SCOPE_RE.match(stmt)
+        if scope:
+            self.symbols.declare(scope.group(1), scope.group(2).split())
+            return
+
+        for symput in SYMPUT_RE.finditer(stmt):
+            self.symbols.assign(symput.group(2), symput.group(4))
+
+        call = MACRO_CALL_RE.match(stmt)
+        if call and call.group(1).lower() in self.macros and depth < MAX_CALL_DEPTH:
+            params, body = self.macros[call.group(1).lower()]
+            self.symbols.push(call.group(1))
+            self._bind(params, split_arguments(call.group(2) or ''))
+            self._run(body, filepath, rows, depth + 1)
+            self.symbols.pop()
+
+    def _bind(self, params: List[str], args: List[str]):
+        """Bind positional and keyword (name=default) parameters in the new local scope."""
+        positional = [p for p in params if '=' not in p]
+        keywords = dict(p.split('=', 1) for p in params if '=' in p)
+        values = {name.strip().lower(): default.strip() for name, default in keywords.items()}
+        values.update({name.strip().lower(): '' for name in positional})
+
+        position = 0
+        for arg in args:
+            keyword = re.match(r'^\s*(\w+)\s*=(.*)$', arg, re.DOTALL)
+            if keyword and keyword.group(1).lower() in values:
+                values[keyword.group(1).lower()] = keyword.group(2).strip()
+            elif position < len(positional):
+                values[positional[position].strip().lower()] = arg
+                position += 1
+
+        self.symbols.declare('local', list(values))
+        for name, value in values.items():
+            self.symbols.assign(name, value)
+
+    def extract_resolved(self, filepath: str) -> Dict[str, pd.DataFrame]:
+        """SASAnalyzer results computed on the resolved statements (real table names and paths)."""
+        results = {key: [] for key in ['libname_matches', 'macro_defs', 'macro_calls', 'proc_defs', 'let_defs',
+                                       'db_conns', 'input_tables', 'output_tables', '%include', 'filenames']}
+        macro_stack: List = []
+        for row in self.resolve_file(filepath):
+            self.analyzer._process_statement(row['resolved_statement'], row['line_number'], results, macro_stack)
+        return self.analyzer._create_dataframes(results)
+
+
+def resolve_files(pattern: str) -> pd.DataFrame:
+    frames = []
+    for sas_file in glob.glob(pattern, recursive=True):
+        resolver = MacroVariableResolver()
+        try:
+            rows = resolver.resolve_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to resolve {sas_file}: {str(e)}")
+            continue
+        if resolver.symbols.cycles:
+            logger.warning(f"{sas_file}: cyclic macro variables {sorted(resolver.symbols.cycles)}")
+        frames.append(pd.DataFrame(rows))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Resolve macro variable references in SAS programs")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--output', default='resolved_statements.xlsx')
+    args = parser.parse_args(argv)
+
+    df = resolve_files(args.pattern)
+    if df.empty:
+        print("No statements found")
+        return df
+
+    changed = df[df['statement'] != df['resolved_statement']]
+    df.to_excel(args.output, index=False)
+    print("\n=== MACRO VARIABLE RESOLUTION ===")
+    print(f"Statements: {len(df)}, with resolved references: {len(changed)}, "
+          f"with unresolved references: {(df['unresolved'] != '').sum()}")
+    print(f"Details written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
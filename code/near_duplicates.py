@@ -0,0 +1,226 @@
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import re
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from claudeCode import SASAnalyzer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+SPACE_RE = re.compile(r'\s+')
+MACRO_START_RE = re.compile(r'^\s*%macro\s+(\w+)', re.IGNORECASE)
+MACRO_END_RE = re.compile(r'%mend\b', re.IGNORECASE)
+
+
+def normalize_statement(stmt: str) -> str:
+    """Case, whitespace, literal strings and numbers should not make two copies look different."""
+    stmt = STRING_RE.sub("'?'", stmt.lower())
+    stmt = NUMBER_RE.sub('0', stmt)
+    return SPACE_RE.sub(' ', stmt).strip()
+
+
+def shingles(statements: List[str], k: int = 3) -> set:
+    """k-statement shingles, so both content and statement order count."""
+    if len(statements) < k:
+        return set(statements)
+    return {'\n'.join(statements[i:i + k]) for i in range(len(statements) - k + 1)}
+
+
+def _hash32(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve threshold (1/b)^(1/r) is closest to the target."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        distance = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or distance < best[0]:
+            best = (distance, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """MinHash signatures using universal hashing (a*x + b) mod (2^61 - 1)."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: set) -> np.ndarray:
+        if not items:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        hashes = np.array([_hash32(item) for item in items], dtype=np.uint64)
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+
+class NearDuplicateFinder:
+    """
+    Clusters near-duplicate SAS programs and macro bodies.
+    Statement streams come from SASAnalyzer.split_sas_statements; each program
+    (and each %macro ... %mend body) is reduced to a MinHash signature, and LSH
+    banding only compares items that share a band, keeping the run near-linear.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 include_macros: bool = True):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.include_macros = include_macros
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.analyzer = SASAnalyzer()
+        self.items: List[Dict] = []
+        self.signatures: List[np.ndarray] = []
+
+    def add_file(self, filepath: str):
+        text, _ = self.analyzer.load_sas_file(filepath)
+        statements = [normalize_statement(stmt) for stmt, _ in self.analyzer.split_sas_statements(text)]
+        statements = [stmt for stmt in statements if stmt and stmt != ';']
+        self._add_item(filepath, 'program', filepath, statements)
+
+        if self.include_macros:
+            for name, body in self._macro_bodies(statements):
+                self._add_item(f"{filepath}::%{name}", 'macro', filepath, body)
+
+    def _macro_bodies(self, statements: List[str]):
+        stack: List[Tuple[str, List[str]]] = []
+        for stmt in statements:
+            start = MACRO_START_RE.match(stmt)
+            if start:
+                stack.append((start.group(1), []))
+            for _, body in stack:
+                body.append(stmt)
+            if MACRO_END_RE.search(stmt) and stack:
+                yield stack.pop()
+
+    def _add_item(self, name: str, kind: str, filepath: str, statements: List[str]):
+        items = shingles(statements, self.shingle_size)
+        if not items:
+            # Empty or comment-only: every such signature would match every other
+            logger.debug(f"Skipping {name}: no statements")
+            return
+        self.items.append({'item': name, 'kind': kind, 'file': filepath, 'statements': len(statements)})
+        self.signatures.append(self.hasher.signature(items))
+
+    def similarity(self, i: int, j: int) -> float:
+        return float(np.mean(self.signatures[i] == self.signatures[j]))
+
+    def clusters(self) -> List[List[Tuple[int, float]]]:
+        """Groups of (item index, similarity to the cluster representative), largest first."""
+        parent = list(range(len(self.items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        compared = set()
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            start = band * self.rows
+            for i, signature in enumerate(self.signatures):
+                # Programs are only compared with programs, macros with macros
+                key = (self.items[i]['kind'], signature[start:start + self.rows].tobytes())
+                buckets[key].append(i)
+            for members in buckets.values():
+                for pair in combinations(members, 2):
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    if self.similarity(*pair) >= self.threshold:
+                        parent[find(pair[1])] = find(pair[0])
+
+        groups = defaultdict(list)
+        for i in range(len(self.items)):
+            groups[find(i)].append(i)
+
+        result = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            representative = max(members, key=lambda i: (self.items[i]['statements'], -i))
+            ranked = sorted(((i, self.similarity(representative, i)) for i in members),
+                            key=lambda pair: (pair[0] != representative, -pair[1]))
+            result.append(ranked)
+        return sorted(result, key=len, reverse=True)
+
+    def report(self) -> pd.DataFrame:
+        rows = []
+        for cluster_id, members in enumerate(self.clusters(), start=1):
+            representative = self.items[members[0][0]]['item']
+            for i, similarity in members:
+                rows.append({
+                    'cluster_id': cluster_id,
+                    'kind': self.items[i]['kind'],
+                    'item': self.items[i]['item'],
+                    'statements': self.items[i]['statements'],
+                    'representative': representative,
+                    'is_representative': self.items[i]['item'] == representative,
+                    'similarity': round(similarity, 3),
+                })
+        return pd.DataFrame(rows)
+
+
+def find_near_duplicates(pattern: str, threshold: float = 0.8, num_perm: int = 128,
+                         include_macros: bool = True) -> pd.DataFrame:
+    finder = NearDuplicateFinder(threshold=threshold, num_perm=num_perm, include_macros=include_macros)
+    sas_files = glob.glob(pattern, recursive=True)
+    logger.info(f"Fingerprinting {len(sas_files)} SAS files (bands={finder.bands}, rows={finder.rows})")
+    for sas_file in sas_files:
+        try:
+            finder.add_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to fingerprint {sas_file}: {str(e)}")
+    return finder.report()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate SAS programs and macros with MinHash/LSH")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--threshold', type=float, default=0.8, help="Minimum estimated Jaccard similarity")
+    parser.add_argument('--num-perm', type=int, default=128, help="MinHash signature length")
+    parser.add_argument('--no-macros', action='store_true', help="Only compare whole programs")
+    parser.add_argument('--output', default='near_duplicates.xlsx')
+    args = parser.parse_args(argv)
+
+    report = find_near_duplicates(args.pattern, args.threshold, args.num_perm, not args.no_macros)
+    if report.empty:
+        print("No near-duplicate clusters found")
+        return report
+
+    report.to_excel(args.output, index=False)
+    print("\n=== NEAR-DUPLICATE CLUSTERS ===")
+    for cluster_id, cluster in report.groupby('cluster_id'):
+        print(f"\nCluster {cluster_id} ({len(cluster)} {cluster['kind'].iloc[0]}s)")
+        for _, row in cluster.iterrows():
+            marker = '*' if row['is_representative'] else ' '
+            print(f"  {marker} {row['similarity']:.2f}  {os.path.basename(row['item'])}")
+    print(f"\nMigrate {report['cluster_id'].nunique()} representatives instead of {len(report)} items "
+          f"(details in {args.output})")
+    return report
+
+
+if __name__ == "__main__":
+    main()
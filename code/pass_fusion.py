@@ -0,0 +1,160 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from sas_steps import StepGrouper, libref_of, load_table_sizes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# SET options that depend on reading a stored dataset (random access, observation counts)
+STORED_ACCESS_RE = re.compile(r'\b(point|nobs|key)\s*=', re.IGNORECASE)
+# Inline data cannot be read by a view and is too small to matter
+INLINE_DATA_RE = re.compile(r'^\s*(datalines|cards|lines|parmcards)4?\b', re.IGNORECASE)
+# PROCs that only display their input: the table is usually kept for the report, not worth a view
+REPORT_PROCS = {'PRINT', 'REPORT', 'TABULATE', 'CONTENTS', 'SGPLOT', 'SGPANEL', 'SGSCATTER', 'GPLOT', 'GCHART',
+                'PLOT', 'CHART', 'EXPORT'}
+
+
+class PassFusionAdvisor:
+    """
+    Finds chains of steps linked by WORK datasets that have exactly one consumer,
+    e.g. 'data a; set raw; ... data b; set a; ... data c; set b;'. Every intermediate
+    is written once and read back once; fusing the chain into one DATA step, or
+    turning the producing DATA step into a view for a PROC consumer, saves both
+    passes.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None):
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+
+    def analyze_file(self, filepath: str) -> List[Dict]:
+        steps = self.grouper.file_steps(filepath)
+        writers = defaultdict(list)     # table -> steps writing it
+        readers = defaultdict(list)     # table -> steps reading it
+        for step in steps:
+            for ref in step['outputs']:
+                writers[ref['table']].append(step['step_id'])
+            for ref in step['inputs']:
+                readers[ref['table']].append(step['step_id'])
+
+        # next_step[producer] = (consumer, intermediate table) for every fusable link
+        next_step = {}
+        for step in steps:
+            link = self._fusable_link(step, steps, writers, readers)
+            if link:
+                next_step[step['step_id']] = link
+
+        consumers = {consumer for consumer, _ in next_step.values()}
+        chains = []
+        for step_id in next_step:
+            if step_id in consumers:
+                continue
+            chain, tables = [step_id], []
+            while chain[-1] in next_step:
+                consumer, table = next_step[chain[-1]]
+                chain.append(consumer)
+                tables.append(table)
+            chains.append(self._chain_row(filepath, [steps[i] for i in chain], tables))
+        return chains
+
+    @staticmethod
+    def _fusable_link(step, steps, writers, readers):
+        if step['kind'] != 'DATA' or any(INLINE_DATA_RE.match(stmt) for stmt, _ in step['statements']):
+            return None
+        outputs = step['outputs']
+        if len(outputs) != 1 or 'view' in outputs[0]['options'].lower():
+            return None
+        table = outputs[0]['table']
+        if libref_of(table) != 'work' or writers[table] != [step['step_id']] or len(readers[table]) != 1:
+            return None
+        consumer = steps[readers[table][0]]
+        if consumer['step_id'] <= step['step_id'] or len({ref['table'] for ref in consumer['inputs']}) != 1:
+            return None
+        if consumer['kind'] == 'DATA':
+            set_refs = [ref for ref in consumer['inputs'] if ref['role'] == 'set']
+            code = ' '.join(stmt for stmt, _ in consumer['statements'])
+            if len(set_refs) != 1 or len(consumer['inputs']) != 1 or consumer['by'] or STORED_ACCESS_RE.search(code):
+                return None
+        elif consumer['proc'] in ('SORT', 'SQL', 'DATASETS', 'APPEND', 'COPY'):
+            # These need (or rewrite) the stored table
+            return None
+        elif consumer['proc'] in REPORT_PROCS:
+            return None
+        return consumer['step_id'], table
+
+    def _chain_row(self, filepath, chain, tables) -> Dict:
+        sources = [ref['table'] for ref in chain[0]['inputs']]
+        known = [self.sizes[table]['bytes'] for table in sources
+                 if table in self.sizes and self.sizes[table].get('bytes') is not None]
+        # Each intermediate is at most about as large as the inputs: written once, read once
+        io_saved = 2 * sum(known) * len(tables) if known else None
+        ends_in_proc = chain[-1]['kind'] == 'PROC'
+        if ends_in_proc and len(chain) == 2:
+            recommendation = (f"Define {tables[-1]} as a DATA step view (data {tables[-1]} / view={tables[-1]};) "
+                              f"so PROC {chain[-1]['proc']} reads the rows as they are produced")
+        elif ends_in_proc:
+            recommendation = (f"Combine the {len(chain) - 1} DATA steps into one and define its output as a view "
+                              f"read by PROC {chain[-1]['proc']}")
+        else:
+            recommendation = f"Combine the {len(chain)} DATA steps into one pass writing only {chain[-1]['outputs'][0]['table'] if chain[-1]['outputs'] else '_null_'}"
+        return {
+            'file': filepath,
+            'start_line': chain[0]['start_line'],
+            'end_line': chain[-1]['end_line'],
+            'steps': ' -> '.join(f"PROC {step['proc']}" if step['proc'] else 'DATA' for step in chain),
+            'chain': ' -> '.join([', '.join(sources) or '(none)'] + tables),
+            'intermediates': len(tables),
+            'passes_saved': 2 * len(tables),
+            'est_io_saved_bytes': io_saved,
+            'recommendation': recommendation,
+        }
+
+
+def advise(pattern: str, sizes_file: Optional[str] = None) -> pd.DataFrame:
+    advisor = PassFusionAdvisor(load_table_sizes(sizes_file))
+    rows = []
+    for sas_file in glob.glob(pattern, recursive=True):
+        try:
+            rows.extend(advisor.analyze_file(sas_file))
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df['_known'] = df['est_io_saved_bytes'].notna()
+    df = df.sort_values(['_known', 'est_io_saved_bytes', 'intermediates'], ascending=False).drop(columns='_known')
+    return df.reset_index(drop=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Find chains of single-consumer steps that could run in one pass")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='pass_fusion.xlsx')
+    args = parser.parse_args(argv)
+
+    df = advise(args.pattern, args.sizes)
+    if df.empty:
+        print("No fusable step chains found")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== PASS FUSION CANDIDATES ===")
+    for _, row in df.head(20).iterrows():
+        saved = f", ~{row['est_io_saved_bytes'] / 1e9:.2f} GB I/O saved" if pd.notna(row['est_io_saved_bytes']) else ''
+        print(f"  {os.path.basename(row['file'])}:{row['start_line']}-{row['end_line']} {row['chain']} "
+              f"({row['passes_saved']} passes{saved})")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import glob
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from sas_steps import StepGrouper, libref_of, load_table_sizes
+from session_sim import read_flow
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Librefs whose tables are created by the program itself or are small system tables
+TRANSIENT_LIBREFS = {'work', 'sashelp', 'dictionary', 'sasuser'}
+
+DEFAULT_MIN_PASSES = 3
+
+
+class ReadCounter:
+    """
+    Counts the passes each permanent dataset gets: every SET/MERGE/UPDATE/MODIFY,
+    PROC DATA= and SQL FROM/JOIN reference is one read of the table. Counts are
+    kept per program and summed per flow, so a table read by five programs of
+    one flow shows up as a single load-once candidate.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None):
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+        self.program_reads: Dict[str, Dict[str, List[Tuple[int, str]]]] = {}   # file -> table -> [(line, step)]
+
+    def count_file(self, filepath: str) -> Dict[str, List[Tuple[int, str]]]:
+        if filepath not in self.program_reads:
+            reads = defaultdict(list)
+            for step in self.grouper.file_steps(filepath):
+                step_name = f"PROC {step['proc']}" if step['proc'] else 'DATA'
+                for ref in step['inputs']:
+                    if libref_of(ref['table']) not in TRANSIENT_LIBREFS and '&' not in ref['table']:
+                        reads[ref['table']].append((ref['line'], step_name))
+            self.program_reads[filepath] = dict(reads)
+        return self.program_reads[filepath]
+
+    def program_rows(self, filepath: str, min_passes: int) -> List[Dict]:
+        rows = []
+        for table, reads in self.count_file(filepath).items():
+            if len(reads) >= min_passes:
+                rows.append(self._row('program', filepath, table, len(reads), 1, reads))
+        return rows
+
+    def flow_rows(self, flow: str, programs: List[str], min_passes: int) -> List[Dict]:
+        totals = defaultdict(list)
+        readers = defaultdict(set)
+        for program in programs:
+            for table, reads in self.count_file(program).items():
+                totals[table].extend((f"{os.path.basename(program)}:{line}", step) for line, step in reads)
+                readers[table].add(program)
+        return [self._row('flow', flow, table, len(reads), len(readers[table]), reads)
+                for table, reads in totals.items() if len(reads) >= min_passes and len(readers[table]) > 1]
+
+    def _row(self, scope: str, name: str, table: str, passes: int, programs: int, reads) -> Dict:
+        size = self.sizes.get(table, {})
+        est_bytes = size.get('bytes')
+        return {
+            'scope': scope,
+            'name': name,
+            'table': table,
+            'passes': passes,
+            'programs': programs,
+            'est_rows': size.get('rows'),
+            'est_bytes': est_bytes,
+            'bytes_read': est_bytes * passes if est_bytes is not None else None,
+            'reads': ', '.join(f"{step}@{line}" for line, step in reads),
+            'recommendation': self._recommend(scope, table, passes),
+        }
+
+    @staticmethod
+    def _recommend(scope: str, table: str, passes: int) -> str:
+        libref, member = table.split('.', 1)
+        if scope == 'flow':
+            return (f"Load {table} into CAS once at the start of the flow and PROMOTE it to global scope "
+                    f"(PROC CASUTIL LOAD DATA={table} CASOUT=\"{member}\" PROMOTE) so every program reads it from memory")
+        return (f"Load {table} into CAS (or the SAS memory library with SASFILE {table} LOAD) once before the "
+                f"first read and point the {passes} steps at the in-memory copy")
+
+
+def analyze(pattern: str, flows: Optional[List[str]] = None, sizes_file: Optional[str] = None,
+            min_passes: int = DEFAULT_MIN_PASSES) -> pd.DataFrame:
+    counter = ReadCounter(load_table_sizes(sizes_file))
+    rows = []
+    for sas_file in glob.glob(pattern, recursive=True):
+        try:
+            rows.extend(counter.program_rows(sas_file, min_passes))
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+
+    base_dir = os.path.dirname(pattern.split('*', 1)[0]) or '.'
+    for flow in flows or []:
+        programs = []
+        for program in read_flow(flow):
+            path = program if os.path.isfile(program) else os.path.join(base_dir, program)
+            if os.path.isfile(path):
+                programs.append(path)
+            else:
+                logger.warning(f"Program {program} from flow {flow} not found")
+        rows.extend(counter.flow_rows(flow, programs, min_passes))
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df['_known'] = df['bytes_read'].notna()
+    df = df.sort_values(['passes', '_known', 'bytes_read'], ascending=[False, False, False]).drop(columns='_known')
+    return df.reset_index(drop=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Find permanent datasets read in many passes")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--flow', action='append', help="File listing the programs of one flow in run order")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--min-passes', type=int, default=DEFAULT_MIN_PASSES)
+    parser.add_argument('--output', default='repeated_reads.xlsx')
+    args = parser.parse_args(argv)
+
+    df = analyze(args.pattern, args.flow, args.sizes, args.min_passes)
+    if df.empty:
+        print(f"No permanent dataset is read {args.min_passes} or more times")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== REPEATED READS ===")
+    for _, row in df.head(20).iterrows():
+        size = f", {row['bytes_read'] / 1e9:.2f} GB read" if pd.notna(row['bytes_read']) else ''
+        print(f"  {row['table']:<30} {row['passes']:>3} passes in {os.path.basename(row['name'])}{size}")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
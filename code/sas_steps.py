@@ -0,0 +1,328 @@
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from claudeCode import SASAnalyzer
+from result_store import split_table_name
+from sql_parser import sql_tables
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STEP_START_RE = re.compile(r'^\s*(data|proc)\b(?!\s*=)\s*(\w*)', re.IGNORECASE)
+STEP_END_RE = re.compile(r'^\s*(run|quit)\b', re.IGNORECASE)
+STATEMENT_RE = re.compile(r'^\s*(\w+)', re.IGNORECASE)
+# BY ... NOTSORTED groups consecutive rows only; it neither needs nor sets a sort order
+NOTSORTED_RE = re.compile(r'\bnotsorted\b', re.IGNORECASE)
+
+# PROCs that do not read the most recently created dataset when DATA= is omitted
+NO_DATA_PROCS = {
+    'sql', 'datasets', 'format', 'import', 'options', 'catalog', 'printto', 'template', 'iml', 'fcmp', 'ds2',
+    'http', 'cas', 'casutil', 'delete', 'pwencode', 'optsave', 'optload', 'odstext', 'odslist', 'sgrender',
+    'contents', 'fedsql', 'groovy', 'lua', 'python', 'javainfo', 'setinit', 'product_status', 'geocode',
+}
+
+# SET/MERGE statement options that are not dataset names
+SET_OPTIONS = {'end', 'nobs', 'point', 'key', 'indsname', 'open', 'curobs', 'unique', 'keyreset', 'keys'}
+
+DATASET_NAME_RE = re.compile(r'[\w.&%]+')
+OPTION_VALUE_RE = re.compile(r'=\s*[\w.&]+')
+
+Step = Dict[str, object]
+TableRef = Dict[str, object]
+
+
+def normalize_table(name: str) -> str:
+    """Lower-case a dataset name and make one-level names explicit WORK tables."""
+    name = name.strip().rstrip('.')
+    if name.startswith('_') and '.' not in name:
+        # Automatic names (_null_, _last_, _data_) are not WORK tables
+        return name.lower()
+    return '.'.join(split_table_name(name))
+
+
+def libref_of(table: str) -> str:
+    return table.split('.', 1)[0]
+
+
+def parse_dataset_list(text: str) -> List[Tuple[str, str]]:
+    """
+    Split 'a(keep=x where=(y>1)) lib.b(in=inb) end=eof' into [(name, options)],
+    keeping the text inside each dataset's parentheses.
+    """
+    datasets = []
+    i, length = 0, len(text)
+    while i < length:
+        if text[i].isspace() or text[i] == ',':
+            i += 1
+            continue
+        if text[i] == ';':
+            break
+        match = DATASET_NAME_RE.match(text, i)
+        if not match:
+            i += 1
+            continue
+        name = match.group(0)
+        i = match.end()
+        while i < length and text[i].isspace():
+            i += 1
+
+        if i < length and text[i] == '=':
+            # SET options such as end=eof or nobs=n: skip the value
+            value = OPTION_VALUE_RE.match(text, i)
+            i = value.end() if value else i + 1
+            continue
+
+        options = ''
+        if i < length and text[i] == '(':
+            depth, start = 0, i
+            while i < length:
+                if text[i] == '(':
+                    depth += 1
+                elif text[i] == ')':
+                    depth -= 1
+                    if depth == 0:
+                        i += 1
+                        break
+                i += 1
+            options = text[start + 1:i - 1].strip()
+        if name.lower() not in SET_OPTIONS:
+            datasets.append((name, options))
+    return datasets
+
+
+def dataset_option(options: str, name: str) -> Optional[str]:
+    """Value of one dataset option (where=, keep=, rename=, ...), parentheses removed."""
+    match = re.search(r'\b' + name + r'\s*=\s*', options, re.IGNORECASE)
+    if not match:
+        return None
+    i = match.end()
+    if i < len(options) and options[i] == '(':
+        depth = 0
+        for j in range(i, len(options)):
+            if options[j] == '(':
+                depth += 1
+            elif options[j] == ')':
+                depth -= 1
+                if depth == 0:
+                    return options[i + 1:j].strip()
+        return options[i + 1:].strip()
+    value = re.match(r'[^\s=]+(?:\s+(?![\w]+\s*=)[^\s=]+)*', options[i:])
+    return value.group(0).strip() if value else ''
+
+
+def parse_by(text: str) -> List[Tuple[str, bool]]:
+    """BY variables as (name, descending) pairs."""
+    keys, descending = [], False
+    for word in re.findall(r'[\w&.]+', text):
+        lowered = word.lower()
+        if lowered == 'descending':
+            descending = True
+        elif lowered not in ('notsorted', 'groupformat'):
+            keys.append((lowered, descending))
+            descending = False
+    return keys
+
+
+class StepGrouper:
+    """
+    Groups the statement stream from SASAnalyzer.split_sas_statements into DATA and
+    PROC steps with their input/output datasets (dataset options kept), BY keys and
+    WHERE clauses. Shared by the step-level advisors (hotspots, sorts, reads, ...).
+    """
+
+    def __init__(self, analyzer: Optional[SASAnalyzer] = None):
+        self.analyzer = analyzer or SASAnalyzer()
+
+    def file_steps(self, filepath: str, resolve_macros: bool = False) -> List[Step]:
+        if resolve_macros:
+            from macro_symbols import MacroVariableResolver
+            rows = MacroVariableResolver().resolve_file(filepath)
+            statements = [(row['resolved_statement'], row['line_number']) for row in rows]
+        else:
+            text, _ = self.analyzer.load_sas_file(filepath)
+            statements = self.analyzer.split_sas_statements(text)
+        return self.group(statements, filepath)
+
+    def group(self, statements: List[Tuple[str, int]], filepath: str = '') -> List[Step]:
+        steps: List[Step] = []
+        current: Optional[Step] = None
+        last_output: Optional[str] = None
+
+        for stmt, line in statements:
+            start = STEP_START_RE.match(stmt)
+            if start:
+                if current:
+                    last_output = self._finish(current, steps, last_output)
+                kind = start.group(1).upper()
+                current = {
+                    'file': filepath,
+                    'step_id': len(steps),
+                    'kind': kind,
+                    'proc': start.group(2).upper() if kind == 'PROC' else None,
+                    'start_line': line,
+                    'end_line': line,
+                    'statements': [],
+                }
+            if current is None:
+                continue
+            current['statements'].append((stmt.strip(), line))
+            current['end_line'] = line
+            if STEP_END_RE.match(stmt):
+                last_output = self._finish(current, steps, last_output)
+                current = None
+
+        if current:
+            self._finish(current, steps, last_output)
+        return steps
+
+    def _finish(self, step: Step, steps: List[Step], last_output: Optional[str]) -> Optional[str]:
+        step.update({'inputs': [], 'outputs': [], 'by': [], 'by_notsorted': False, 'where': []})
+        if step['kind'] == 'DATA':
+            self._data_tables(step)
+        elif step['proc'] == 'SQL':
+            self._sql_tables(step)
+        else:
+            self._proc_tables(step, last_output)
+        steps.append(step)
+        outputs = [ref['table'] for ref in step['outputs'] if ref['table'] != 'work._null_']
+        return outputs[-1] if outputs else last_output
+
+    @staticmethod
+    def _ref(name: str, options: str, line: int, role: str) -> TableRef:
+        return {'table': normalize_table(name), 'name': name, 'options': options, 'line': line, 'role': role}
+
+    def _data_tables(self, step: Step):
+        for stmt, line in step['statements']:
+            keyword = STATEMENT_RE.match(stmt)
+            keyword = keyword.group(1).lower() if keyword else ''
+            body = stmt.strip()[len(keyword):].rstrip(';')
+            if keyword == 'data':
+                step['outputs'].extend(self._ref(name, options, line, 'write')
+                                       for name, options in parse_dataset_list(body)
+                                       if name.lower() != '_null_')
+            elif keyword in ('set', 'merge', 'update', 'modify'):
+                step['inputs'].extend(self._ref(name, options, line, keyword)
+                                      for name, options in parse_dataset_list(body))
+            elif keyword == 'by':
+                step['by'] = parse_by(body)
+                step['by_notsorted'] = bool(NOTSORTED_RE.search(body))
+            elif keyword == 'where':
+                step['where'].append(body.strip())
+
+    def _proc_tables(self, step: Step, last_output: Optional[str]):
+        proc = step['proc'].lower()
+        for stmt, line in step['statements']:
+            keyword = STATEMENT_RE.match(stmt)
+            keyword = keyword.group(1).lower() if keyword else ''
+            for option, role in (('data', 'read'), ('base', 'append'), ('out', 'write'), ('outfile', None)):
+                for match in re.finditer(r'\b' + option + r'\s*=\s*', stmt, re.IGNORECASE):
+                    if role is None:
+                        continue
+                    datasets = parse_dataset_list(stmt[match.end():])
+                    if not datasets:
+                        continue
+                    name, options = datasets[0]
+                    target = step['inputs'] if role == 'read' else step['outputs']
+                    target.append(self._ref(name, options, line, role))
+            if keyword == 'by':
+                step['by'] = parse_by(stmt.strip()[2:].rstrip(';'))
+                step['by_notsorted'] = bool(NOTSORTED_RE.search(stmt))
+            elif keyword == 'where':
+                step['where'].append(stmt.strip()[5:].rstrip(';').strip())
+
+        if not step['inputs'] and proc not in NO_DATA_PROCS and last_output:
+            # DATA= omitted: the PROC reads the most recently created dataset (_LAST_)
+            step['inputs'].append({'table': last_output, 'name': '_last_', 'options': '', 'line': step['start_line'],
+                                   'role': 'read'})
+        if proc == 'sort' and step['inputs'] and not any(ref['role'] == 'write' for ref in step['outputs']):
+            # Without OUT= the input is sorted in place
+            source = step['inputs'][0]
+            step['outputs'].append(dict(source, options='', role='write'))
+
+    def _sql_tables(self, step: Step):
+        step['queries'] = []
+        for stmt, line in step['statements']:
+            if STATEMENT_RE.match(stmt) and STATEMENT_RE.match(stmt).group(1).lower() in ('proc', 'quit', 'run'):
+                continue
+            inputs, outputs = sql_tables(stmt)
+            inputs = [name for name in inputs if libref_of(name.lower()) != 'dictionary']
+            query_inputs = [self._ref(name, '', line, 'read') for name in inputs]
+            query_outputs = [self._ref(name, '', line, 'write') for name in outputs]
+            step['queries'].append({'text': stmt.strip(), 'line': line,
+                                    'inputs': query_inputs, 'outputs': query_outputs})
+            step['inputs'].extend(query_inputs)
+            step['outputs'].extend(query_outputs)
+
+
+def load_table_sizes(path: Optional[str]) -> Dict[str, Dict]:
+    """
+    Table sizes keyed by 'libref.table', from the table_sizes sheet written by
+    extractorProj/catalog_scanner.py or any CSV/Excel file with table, rows and bytes columns.
+    """
+    if not path:
+        return {}
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+    else:
+        sheets = pd.read_excel(path, sheet_name=None)
+        df = sheets.get('table_sizes', next(iter(sheets.values())))
+    sizes = {}
+    for row in df.to_dict('records'):
+        if isinstance(row.get('table'), str):
+            sizes[normalize_table(row['table'])] = {
+                'rows': None if pd.isna(row.get('rows')) else int(row['rows']),
+                'bytes': None if pd.isna(row.get('bytes')) else int(row['bytes']),
+            }
+    logger.info(f"Loaded sizes for {len(sizes)} tables from {os.path.basename(path)}")
+    return sizes
+
+
+SUBSETTING_IF_RE = re.compile(r'^\s*if\b(?!.*\bthen)', re.IGNORECASE | re.DOTALL)
+DELETE_RE = re.compile(r'^\s*(?:if\b.*\bthen\s+)?delete\s*;', re.IGNORECASE | re.DOTALL)
+SQL_AGGREGATE_RE = re.compile(r'\bgroup\s+by\b|\b(?:sum|count|avg|mean|min|max|std|var|n)\s*\(', re.IGNORECASE)
+AGGREGATE_PROCS = {'MEANS', 'SUMMARY', 'FREQ', 'TABULATE', 'UNIVARIATE', 'REPORT'}
+
+
+def step_operations(step: Step) -> Dict[str, int]:
+    """Local work done by a step: filter, aggregate, join and sort, each with its first line."""
+    ops: Dict[str, int] = {}
+    for ref in step['inputs']:
+        if dataset_option(ref['options'], 'where') is not None:
+            ops.setdefault('filter', ref['line'])
+    if step['where']:
+        ops.setdefault('filter', step['start_line'])
+
+    if step['kind'] == 'DATA':
+        for stmt, line in step['statements']:
+            if SUBSETTING_IF_RE.match(stmt) or DELETE_RE.match(stmt):
+                ops.setdefault('filter', line)
+            if re.match(r'^\s*merge\b', stmt, re.IGNORECASE) or re.search(r'\bkey\s*=', stmt, re.IGNORECASE):
+                ops.setdefault('join', line)
+        if len({ref['table'] for ref in step['inputs'] if ref['role'] == 'set'}) > 1 and 'join' not in ops:
+            # Several SET statements read in parallel
+            set_lines = [ref['line'] for ref in step['inputs'] if ref['role'] == 'set']
+            if len(set(set_lines)) > 1:
+                ops['join'] = set_lines[1]
+        if step['by'] and any(re.search(r'\b(first|last)\.', stmt, re.IGNORECASE) for stmt, _ in step['statements']):
+            ops.setdefault('aggregate', step['start_line'])
+    elif step['proc'] == 'SQL':
+        for query in step.get('queries', []):
+            text = query['text']
+            if re.search(r'\bwhere\b', text, re.IGNORECASE):
+                ops.setdefault('filter', query['line'])
+            if SQL_AGGREGATE_RE.search(text):
+                ops.setdefault('aggregate', query['line'])
+            if len({ref['table'] for ref in query['inputs']}) > 1:
+                ops.setdefault('join', query['line'])
+            if re.search(r'\border\s+by\b', text, re.IGNORECASE):
+                ops.setdefault('sort', query['line'])
+    elif step['proc'] in AGGREGATE_PROCS:
+        ops.setdefault('aggregate', step['start_line'])
+    elif step['proc'] == 'SORT':
+        ops.setdefault('sort', step['start_line'])
+    return ops
@@ -0,0 +1,190 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from sas_steps import StepGrouper, dataset_option, load_table_sizes, parse_by
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SortKeys = Tuple[Tuple[str, bool], ...]
+
+# PROC SORT options that change the rows, so the sort is not only about order
+DEDUP_OPTIONS_RE = re.compile(r'\b(nodupkey|nodupkeys|nodup|nodups|noduprec|noduprecs|dupout\s*=)', re.IGNORECASE)
+ORDER_BY_LIST_RE = re.compile(r'[\w.]+(?:\s+(?:asc|desc))?(?:\s*,\s*[\w.]+(?:\s+(?:asc|desc))?)*',
+                              re.IGNORECASE)
+IN_FLAG_RE = re.compile(r'\bin\s*=\s*(\w+)', re.IGNORECASE)
+
+# Below this many rows the smaller MERGE input fits comfortably in a hash object
+HASH_ROW_LIMIT = 5_000_000
+
+
+def is_prefix(keys: SortKeys, order: SortKeys) -> bool:
+    """True when data in 'order' is already grouped and ordered by 'keys'."""
+    return bool(keys) and len(keys) <= len(order) and tuple(order[:len(keys)]) == tuple(keys)
+
+
+def format_keys(keys: SortKeys) -> str:
+    return ' '.join(('descending ' if desc else '') + name for name, desc in keys)
+
+
+class SortAdvisor:
+    """
+    Follows the sort order of every dataset through the steps of a program:
+    PROC SORT and SORTEDBY= set it, DATA steps with BY (or a single SET) pass it
+    on, SQL ORDER BY sets it and any other write clears it. BY ... NOTSORTED only
+    groups consecutive rows, so it neither sets nor needs an order. With that state
+    it reports PROC SORTs on data already in the requested order and MERGE ... BY
+    steps whose pre-sorts could be dropped by joining with a hash object or SQL.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None):
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+
+    def analyze_file(self, filepath: str) -> List[Dict]:
+        findings = []
+        order: Dict[str, Tuple[SortKeys, int]] = {}     # table -> (sort keys, line where the order was set)
+        sorted_by_step: Dict[str, Dict] = {}            # table -> PROC SORT step that last ordered it
+
+        for step in self.grouper.file_steps(filepath):
+            if step['proc'] == 'SORT':
+                findings.extend(self._sort_step(filepath, step, order, sorted_by_step))
+                continue
+            if step['kind'] == 'DATA' and step['by'] and not step['by_notsorted'] and any(ref['role'] == 'merge' for ref in step['inputs']):
+                findings.append(self._merge_step(filepath, step, order, sorted_by_step))
+            self._propagate(step, order, sorted_by_step)
+        return findings
+
+    def _sort_step(self, filepath, step, order, sorted_by_step) -> List[Dict]:
+        findings = []
+        keys = tuple(step['by'])
+        source = step['inputs'][0]['table'] if step['inputs'] else None
+        target = next((ref['table'] for ref in step['outputs'] if ref['role'] == 'write'), source)
+        statement = step['statements'][0][0]
+        current = order.get(source)
+
+        if source and keys and current and is_prefix(keys, current[0]) and not DEDUP_OPTIONS_RE.search(statement):
+            findings.append(self._finding(
+                filepath, step['start_line'], 'redundant_sort', source, keys,
+                f"{source} is already ordered by {format_keys(current[0])} (line {current[1]})",
+                "Drop the PROC SORT" + (f" and read {source} directly instead of {target}" if target != source else "")
+                + "; in Viya, BY-group processing in CAS does not need a pre-sort"))
+        if target:
+            order[target] = (keys, step['start_line'])
+            sorted_by_step[target] = step
+        return findings
+
+    def _merge_step(self, filepath, step, order, sorted_by_step) -> Dict:
+        keys = tuple(step['by'])
+        merges = [ref for ref in step['inputs'] if ref['role'] == 'merge']
+        presorts = [sorted_by_step[ref['table']] for ref in merges if ref['table'] in sorted_by_step]
+        unsorted = [ref['table'] for ref in merges if not (ref['table'] in order and is_prefix(keys, order[ref['table']][0]))]
+        in_flags = [flag for ref in merges for flag in IN_FLAG_RE.findall(ref['options'])]
+        code = ' '.join(stmt for stmt, _ in step['statements'])
+        subset = [flag for flag in in_flags if re.search(r'\bif\b[^;]*\b' + flag + r'\b', code, re.IGNORECASE)]
+
+        known = {ref['table']: self.sizes[ref['table']].get('rows') for ref in merges
+                 if ref['table'] in self.sizes and self.sizes[ref['table']].get('rows') is not None}
+        if len(merges) == 2 and len(known) == 2 and min(known.values()) <= HASH_ROW_LIMIT:
+            small = min(known, key=known.get)
+            recommendation = (f"Load {small} ({known[small]:,} rows) into a hash object keyed on "
+                              f"{format_keys(keys)} and read the other table with SET; no sorts needed")
+        elif len(merges) == 2 and len(subset) == len(in_flags):
+            join = {0: 'FULL', 1: 'LEFT', 2: 'INNER'}[min(len(subset), 2)]
+            recommendation = (f"Rewrite as a PROC SQL/FedSQL {join} JOIN on {format_keys(keys)}; "
+                              f"check for many-to-many keys, which MERGE and SQL treat differently")
+        else:
+            recommendation = "Use a hash object for the smaller inputs, or an SQL join when keys are unique"
+        if presorts:
+            recommendation += f"; removes {len(presorts)} PROC SORT step(s)"
+
+        detail = f"MERGE of {', '.join(ref['table'] for ref in merges)}"
+        if presorts:
+            detail += f", pre-sorted at line(s) {', '.join(str(s['start_line']) for s in presorts)}"
+        if unsorted:
+            detail += f"; no sort seen for {', '.join(unsorted)}"
+        return self._finding(filepath, step['start_line'], 'merge_to_join', ', '.join(ref['table'] for ref in merges),
+                             keys, detail, recommendation)
+
+    @staticmethod
+    def _propagate(step, order, sorted_by_step):
+        """Order of the step's outputs, from BY, a single SET/MERGE input, SORTEDBY= or SQL ORDER BY."""
+        inherited = None
+        if step['kind'] == 'DATA':
+            if step['by'] and not step['by_notsorted']:
+                inherited = (tuple(step['by']), step['start_line'])
+            elif len(step['inputs']) == 1 and step['inputs'][0]['role'] in ('set', 'modify'):
+                inherited = order.get(step['inputs'][0]['table'])
+        for ref in step['outputs']:
+            table = ref['table']
+            sortedby = dataset_option(ref['options'], 'sortedby')
+            sorted_by_step.pop(table, None)
+            query = next((q for q in step.get('queries', []) if any(out['table'] == table for out in q['outputs'])), None)
+            order_by = re.search(r'\border\s+by\s+(.*?)(?:;|$)', query['text'], re.IGNORECASE | re.DOTALL) if query else None
+            if sortedby:
+                order[table] = (tuple(parse_by(sortedby)), ref['line'])
+            elif order_by and ORDER_BY_LIST_RE.fullmatch(order_by.group(1).strip()):
+                columns = [column.split() for column in order_by.group(1).split(',')]
+                order[table] = (tuple((column[0].split('.')[-1].lower(), column[-1].lower() == 'desc')
+                                      for column in columns), ref['line'])
+            elif inherited and step['kind'] == 'DATA':
+                order[table] = inherited
+            else:
+                order.pop(table, None)
+
+    @staticmethod
+    def _finding(filepath, line, finding, table, keys, detail, recommendation) -> Dict:
+        return {
+            'file': filepath,
+            'line_number': line,
+            'finding': finding,
+            'table': table,
+            'by_keys': format_keys(keys),
+            'detail': detail,
+            'recommendation': recommendation,
+        }
+
+
+def advise(pattern: str, sizes_file: Optional[str] = None) -> pd.DataFrame:
+    sas_files = glob.glob(pattern, recursive=True)
+    advisor = SortAdvisor(load_table_sizes(sizes_file))
+    rows = []
+    for sas_file in sas_files:
+        try:
+            rows.extend(advisor.analyze_file(sas_file))
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    logger.info(f"{len(rows)} sort/merge findings in {len(sas_files)} SAS files")
+    return pd.DataFrame(rows)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Find redundant PROC SORTs and sort-merge steps that could be joins")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='sort_advice.xlsx')
+    args = parser.parse_args(argv)
+
+    df = advise(args.pattern, args.sizes)
+    if df.empty:
+        print("No redundant sorts or sort-merge patterns found")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== SORT / MERGE ADVICE ===")
+    for finding, group in df.groupby('finding'):
+        print(f"{finding}: {len(group)}")
+        for _, row in group.head(10).iterrows():
+            print(f"  {os.path.basename(row['file'])}:{row['line_number']} {row['table']} BY {row['by_keys']}")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
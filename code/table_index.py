@@ -0,0 +1,252 @@
+import argparse
+import bisect
+import fnmatch
+import glob
+import itertools
+import json
+import logging
+import os
+import struct
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from claudeCode import SASAnalyzer
+from sas_steps import normalize_table
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'SASIDX1\n'
+FOOTER = struct.Struct('<Q')
+
+ROLES = ['read', 'write', 'create', 'append', 'define', 'call']
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+# SASAnalyzer table types -> posting role
+TABLE_ROLES = {
+    'SET': 'read',
+    'MERGE': 'read',
+    'FROM': 'read',
+    'PROC_EXPORT': 'read',
+    'DATA': 'write',
+    'CREATE_TABLE': 'create',
+    'PROC_APPEND': 'append',
+    'INSERT_INTO': 'append',
+}
+
+TERM_KINDS = ['table', 'libref', 'macro', 'fileref']
+
+Posting = Tuple[str, int, str]
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varints(data: bytes) -> Iterator[int]:
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+class TableIndex:
+    """
+    Inverted index from normalized table names, librefs, macro names and filerefs
+    to (file, line, role) postings, built from SASAnalyzer results.
+
+    On disk, postings are varint/delta encoded per term and followed by a sorted
+    lexicon, so a query only reads the lexicon and the postings of matching terms.
+    """
+
+    def __init__(self):
+        self.files: List[str] = []
+        self._file_ids: Dict[str, int] = {}
+        self.postings: Dict[str, set] = defaultdict(set)
+
+    def _file_id(self, path: str) -> int:
+        if path not in self._file_ids:
+            self._file_ids[path] = len(self.files)
+            self.files.append(path)
+        return self._file_ids[path]
+
+    def add(self, kind: str, name: str, path: str, line, role: str):
+        if not isinstance(name, str) or not name.strip():
+            return
+        line = 0 if line is None or pd.isna(line) else int(line)
+        self.postings[f'{kind}:{name.strip().lower()}'].add((self._file_id(path), line, ROLE_CODES[role]))
+
+    def add_results(self, df: pd.DataFrame):
+        """Add the combined DataFrame produced by SASAnalyzer.analyze_files."""
+        if df.empty:
+            return
+        path_column = 'source_path' if 'source_path' in df.columns else 'source_file'
+
+        for row in df.to_dict('records'):
+            kind = row.get('extracted_type')
+            path = row[path_column]
+
+            if kind in ('input_tables', 'output_tables'):
+                role = TABLE_ROLES.get(row.get('type'))
+                if role is None or not isinstance(row.get('table'), str):
+                    continue
+                table = normalize_table(row['table'])
+                self.add('table', table, path, row.get('line_number'), role)
+                self.add('libref', table.split('.', 1)[0], path, row.get('line_number'), role)
+            elif kind == 'libname':
+                self.add('libref', row.get('libref'), path, row.get('line_number'), 'define')
+            elif kind == 'macro':
+                self.add('macro', row.get('macro_name'), path, row.get('start_line'), 'define')
+            elif kind == 'macro_calls':
+                self.add('macro', row.get('macro_name'), path, row.get('line_number'), 'call')
+            elif kind == 'filenames':
+                self.add('fileref', row.get('fileref'), path, row.get('line_number'), 'define')
+            elif kind == '%include':
+                target = row.get('include_file')
+                # Unquoted %include targets are filerefs
+                if isinstance(target, str) and not target.startswith(('"', "'")):
+                    self.add('fileref', target, path, row.get('include_line_number'), 'read')
+
+    def save(self, index_path: str):
+        terms = sorted(self.postings)
+        offsets = []
+        with open(index_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            for term in terms:
+                offsets.append(f.tell())
+                encoded = bytearray()
+                previous_file = 0
+                for file_id, line, role in sorted(self.postings[term]):
+                    _encode_varint(file_id - previous_file, encoded)
+                    _encode_varint(line, encoded)
+                    _encode_varint(role, encoded)
+                    previous_file = file_id
+                f.write(encoded)
+            lexicon_offset = f.tell()
+            offsets.append(lexicon_offset)
+            f.write(json.dumps({'files': self.files, 'terms': terms, 'offsets': offsets}).encode('utf-8'))
+            f.write(FOOTER.pack(lexicon_offset))
+        logger.info(f"Wrote {len(terms)} terms over {len(self.files)} files to {index_path}")
+
+
+class IndexReader:
+    """Read-only access to an index written by TableIndex.save."""
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        with open(index_path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{index_path} is not a table index")
+            f.seek(-FOOTER.size, os.SEEK_END)
+            end = f.tell()
+            (lexicon_offset,) = FOOTER.unpack(f.read(FOOTER.size))
+            f.seek(lexicon_offset)
+            lexicon = json.loads(f.read(end - lexicon_offset).decode('utf-8'))
+        self.files: List[str] = lexicon['files']
+        self.terms: List[str] = lexicon['terms']
+        self.offsets: List[int] = lexicon['offsets']
+
+    def matching_terms(self, kind: str, pattern: str) -> List[str]:
+        """Terms of one kind matching a literal, prefix ('ora*') or wildcard ('*.sales') pattern."""
+        pattern = pattern.strip().lower()
+        if kind == 'table' and '.' not in pattern and not any(char in pattern for char in '*?['):
+            pattern = f'work.{pattern}'
+
+        literal = pattern
+        for i, char in enumerate(pattern):
+            if char in '*?[':
+                literal = pattern[:i]
+                break
+
+        # Only the lexicon range sharing the literal prefix needs to be checked
+        prefix = f'{kind}:{literal}'
+        start = bisect.bisect_left(self.terms, prefix)
+        matches = []
+        for term in itertools.islice(self.terms, start, None):
+            if not term.startswith(prefix):
+                break
+            if literal == pattern:
+                if term == prefix:
+                    matches.append(term)
+            elif fnmatch.fnmatchcase(term, f'{kind}:{pattern}'):
+                matches.append(term)
+        return matches
+
+    def postings(self, terms: List[str]) -> Iterator[Tuple[str, Posting]]:
+        with open(self.index_path, 'rb') as f:
+            for term in terms:
+                position = bisect.bisect_left(self.terms, term)
+                start, end = self.offsets[position], self.offsets[position + 1]
+                f.seek(start)
+                values = list(_decode_varints(f.read(end - start)))
+                file_id = 0
+                for i in range(0, len(values), 3):
+                    file_id += values[i]
+                    yield term, (self.files[file_id], values[i + 1], ROLES[values[i + 2]])
+
+    def query(self, pattern: str, kind: str = 'table', roles: Optional[List[str]] = None) -> List[Tuple[str, Posting]]:
+        return [(term, posting) for term, posting in self.postings(self.matching_terms(kind, pattern))
+                if not roles or posting[2] in roles]
+
+
+def build_index(pattern: str, index_path: str, from_excel: Optional[str] = None) -> TableIndex:
+    """Build an index from SAS files (via SASAnalyzer) or from a saved analyze_files Excel output."""
+    index = TableIndex()
+    if from_excel:
+        index.add_results(pd.read_excel(from_excel))
+    else:
+        analyzer = SASAnalyzer()
+        sas_files = glob.glob(pattern, recursive=True)
+        logger.info(f"Indexing {len(sas_files)} SAS files")
+        for sas_file in sas_files:
+            results = analyzer.combine_results(analyzer.extract_sas_info(sas_file))
+            if not results.empty:
+                results['source_path'] = sas_file
+                index.add_results(results)
+    index.save(index_path)
+    return index
+
+
+def main():
+    """
+    Build or query the table reference index, e.g.
+        python table_index.py build "extractorProj/SAS Files/*.sas"
+        python table_index.py query "source.*" --role read
+    """
+    parser = argparse.ArgumentParser(description="Inverted index of table, libref, macro and fileref references")
+    parser.add_argument('--index', default='table_index.idx', help="Index file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Index SAS files")
+    build.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    build.add_argument('--from-excel', help="Index an existing SASAnalyzer results workbook instead")
+
+    query = commands.add_parser('query', help="Look up references")
+    query.add_argument('pattern', help="Name, prefix (sales*) or wildcard (*.adsl) pattern")
+    query.add_argument('--kind', choices=TERM_KINDS, default='table')
+    query.add_argument('--role', action='append', choices=ROLES, help="Filter by role (repeatable)")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_index(args.pattern, args.index, args.from_excel)
+        return
+
+    reader = IndexReader(args.index)
+    results = reader.query(args.pattern, args.kind, args.role)
+    for term, (path, line, role) in results:
+        print(f"{term.split(':', 1)[1]:<35} {role:<7} {path}:{line}")
+    print(f"\n{len(results)} postings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for cas_threading.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cas_threading import BY_PARTITIONABLE, SINGLE_THREADED, THREAD_SAFE, classify_step
+from sas_steps import StepGrouper
+
+
+def classified(program):
+    grouper = StepGrouper()
+    steps = grouper.group(grouper.analyzer.split_sas_statements(program), 'prog.sas')
+    return [classify_step(step) for step in steps if step['kind'] == 'DATA']
+
+
+def test_thread_safe_and_put_to_log():
+    (row,) = classified("data out; set in; x = a * 2; put 'row ' x=; run;")
+    assert row['label'] == THREAD_SAFE and row['blockers'] == ''
+
+
+def test_by_group_constructs():
+    (row,) = classified("data out; set in; by id; retain total; if first.id then total = 0; total + x; run;")
+    assert row['label'] == BY_PARTITIONABLE
+    assert row['by_group_constructs'].startswith('RETAIN@')
+    assert 'FIRST./LAST.' in row['by_group_constructs'] and 'sum statement' in row['by_group_constructs']
+
+
+def test_single_threaded_blockers():
+    rows = classified("""data out; set in; if _n_ = 1 then call symputx('n', 1); run;
+data _null_; set in end=eof; file 'out.txt'; put x; run;
+data out; merge a b; run;
+data out; retain total; set in; run;
+""")
+    assert [row['label'] for row in rows] == [SINGLE_THREADED] * 4
+    assert rows[0]['blockers'].startswith('_N_@') and 'CALL SYMPUT' in rows[0]['blockers']
+    assert 'FILE@' in rows[1]['blockers'] and 'END=' in rows[1]['blockers'] and 'PUT' not in rows[1]['blockers']
+    assert rows[2]['blockers'].startswith('MERGE without BY')
+    # RETAIN without BY cannot be partitioned
+    assert rows[3]['blockers'].startswith('RETAIN@')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for column_lineage.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from column_lineage import ColumnGraph, ColumnLineage, normalize_column, variable_list
+
+PROGRAM = """data work.clean(drop=tmp rename=(amt=amount));
+  set dw.sales(keep=id amt region tmp);
+  amt_usd = amt * 1.1;
+run;
+proc sql;
+  create table work.summary as
+    select c.region, sum(c.amount) as total, r.manager
+    from work.clean c join ref.regions r on c.region = r.region
+    group by c.region, r.manager;
+quit;
+proc sort data=work.summary out=mart.summary; by region; run;
+"""
+
+
+def lineage_of(tmp_path, program=PROGRAM):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    lineage = ColumnLineage()
+    lineage.add_file(str(path))
+    return lineage
+
+
+def related(frame):
+    return dict(zip(frame['related_column'], frame['distance']))
+
+
+def test_variable_list_and_normalize_column():
+    assert variable_list("a x1-x3 &skip b") == ['a', 'x1', 'x2', 'x3', 'b']
+    assert normalize_column('Clean.Amount') == 'work.clean.amount'
+
+
+def test_data_step_options_and_assignments(tmp_path):
+    edges = lineage_of(tmp_path).build().edges_frame()
+    pairs = set(zip(edges['source_column'], edges['target_column'], edges['kind']))
+    assert ('dw.sales.amt', 'work.clean.amount', 'rename') in pairs
+    assert ('dw.sales.amt', 'work.clean.amt_usd', 'derive') in pairs
+    assert ('dw.sales.id', 'work.clean.id', 'copy') in pairs
+    # Dropped in the output options
+    assert not any(target == 'work.clean.tmp' for _, target, _ in pairs)
+
+
+def test_impact_and_lineage_across_steps(tmp_path):
+    lineage = lineage_of(tmp_path)
+    impact = related(lineage.impact('dw.sales.amt'))
+    assert impact['work.clean.amount'] == 1
+    assert impact['work.summary.total'] == 2
+    assert impact['mart.summary.total'] == 3
+
+    upstream = related(lineage.lineage('mart.summary.manager'))
+    assert upstream == {'work.summary.manager': 1, 'ref.regions.manager': 2}
+    assert related(lineage.impact('mart.summary.total', max_depth=1)) == {}
+
+
+def test_edge_storage_is_13_bytes_per_edge():
+    graph = ColumnGraph()
+    count = 200_000
+    # 40 columns, each copied along a chain of 5000 tables
+    for i in range(count):
+        table, column = i % 5000, i // 5000
+        graph.add(f'lib.t{table}.c{column}', f'lib.t{table + 1}.c{column}', 'copy', f'p{table % 100}.sas:1')
+    stored = sum(len(column) * column.itemsize for column in (graph.source, graph.target, graph.kind, graph.site))
+    assert stored == 13 * count
+
+    start = time.perf_counter()
+    reached = graph.reachable('lib.t0.c0')
+    assert len(reached) == 5000 and reached[-1] == ('lib.t5000.c0', 5000)
+    assert time.perf_counter() - start < 10
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for db_hotspots.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_hotspots import HotspotAnalyzer, find_hotspots
+
+DB_LIBREFS = {'ora': 'oracle', 'td': 'teradata'}
+
+
+def hotspots(tmp_path, program, sizes=None):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    return HotspotAnalyzer(DB_LIBREFS, sizes).analyze_file(str(path))
+
+
+def test_copies_and_downstream_ops(tmp_path):
+    (copy,) = hotspots(tmp_path, """data sales;
+  set ora.sales;
+run;
+data big;
+  set sales;
+  if amount > 100;
+run;
+proc sort data=big; by region; run;
+proc means data=big; class region; var amount; run;
+data local; set work.other; if x; run;
+""", {'ora.sales': {'rows': 1000, 'bytes': 50000}})
+    assert copy['line_number'] == 1 and copy['step'] == 'DATA'
+    assert copy['db_inputs'] == 'ora.sales' and copy['engines'] == 'oracle' and copy['sas_outputs'] == 'work.sales'
+    assert copy['full_table_pull'] and copy['est_rows'] == 1000 and copy['est_bytes'] == 50000
+    # The copy itself does nothing; the filter, sort and summary happen in later steps
+    assert copy['local_ops'] == 'filter@6, sort@8, aggregate@9' and copy['op_count'] == 3
+    assert 'push the filter into the database' in copy['recommendation']
+
+
+def test_in_step_ops_and_sql(tmp_path):
+    data, sql_join, sql_one_libref, writeback = hotspots(tmp_path, """data recent;
+  set ora.orders(where=(year = 2024) keep=id year amount);
+run;
+proc sql;
+  create table joined as select * from ora.orders o, td.customers c where o.id = c.id;
+quit;
+proc sql;
+  create table totals as select region, sum(amount) as total from ora.orders group by region;
+quit;
+data ora.copy; set ora.orders; run;
+data back; set ora.copy; run;
+""")
+    assert not data['full_table_pull'] and data['local_ops'] == 'filter@2' and data['est_bytes'] is None
+    assert sql_join['step'] == 'PROC SQL' and sql_join['engines'] == 'oracle, teradata'
+    assert sql_join['local_ops'] == 'filter@5, join@5'
+    # A query over a single database libref is passed through implicitly
+    assert sql_one_libref['local_ops'] == '' and sql_one_libref['recommendation'] == \
+        "check whether the copy is needed at all"
+    # Database-to-database writes are not movement into SAS
+    assert writeback['db_inputs'] == 'ora.copy' and writeback['line_number'] == 11
+
+
+def test_find_hotspots_ranking(tmp_path):
+    (tmp_path / 'setup.sas').write_text("libname ora oracle user=x;\nlibname loc '/data';\n")
+    (tmp_path / 'load.sas').write_text("""data small; set ora.small; run;
+data big; set ora.big; run;
+data unknown_busy; set ora.unknown; where x > 1; run;
+proc sort data=unknown_busy; by x; run;
+data unknown_idle; set ora.idle; run;
+data local; set loc.table; run;
+""")
+    sizes = tmp_path / 'sizes.csv'
+    sizes.write_text("table,rows,bytes\nORA.SMALL,10,100\nora.big,1000,90000\n")
+
+    df = find_hotspots(str(tmp_path / '*.sas'), str(sizes))
+    assert list(df['rank']) == [1, 2, 3, 4]
+    # Known sizes first (largest first), then by the number of local operations
+    assert list(df['db_inputs']) == ['ora.big', 'ora.small', 'ora.unknown', 'ora.idle']
+    assert list(df['op_count']) == [0, 0, 2, 0]
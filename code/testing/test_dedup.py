@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash dedup in SASAnalyzer.analyze_files and SASCodeParser.parse_directory
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from claudeCode import SASAnalyzer
+from claudeParser import SASCodeParser
+
+PROGRAM = """data work.orders;
+  set src.orders;
+run;
+proc sort data=work.orders out=out.sorted;
+  by id;
+run;
+"""
+OTHER = """data work.orders;
+  set src.orders;
+run;
+proc means data=src.sales;
+  output out=out.stats;
+run;
+"""
+
+
+def write_corpus(tmp_path):
+    for name, text in (("a.sas", PROGRAM), ("copy.sas", PROGRAM), ("other.sas", OTHER)):
+        (tmp_path / name).write_text(text)
+
+
+def test_analyze_files_copies_get_their_own_rows(tmp_path):
+    write_corpus(tmp_path)
+    results = SASAnalyzer().analyze_files(str(tmp_path / "*.sas"), str(tmp_path / "out.xlsx"))
+
+    by_file = {name: group for name, group in results.groupby('source_file')}
+    assert set(by_file) == {"a.sas", "copy.sas", "other.sas"}
+    original, copy = by_file["a.sas"], by_file["copy.sas"]
+    assert set(copy['source_path']) == {str(tmp_path / "copy.sas")}
+    assert set(original['source_path']) == {str(tmp_path / "a.sas")}
+    columns = ['extracted_type', 'type', 'table', 'line_number']
+    assert copy[columns].fillna('').values.tolist() == original[columns].fillna('').values.tolist()
+
+
+def test_parse_directory_reuses_files_and_blocks(tmp_path):
+    write_corpus(tmp_path)
+    parser = SASCodeParser()
+    results = parser.parse_directory(str(tmp_path))
+
+    by_file = {name: group for name, group in results.groupby('file_name')}
+    assert set(by_file) == {"a.sas", "copy.sas", "other.sas"}
+    original, copy = by_file["a.sas"], by_file["copy.sas"]
+    assert copy['raw_code'].tolist() == original['raw_code'].tolist()
+    assert [sorted(tables) for tables in copy['input_tables']] == [sorted(tables) for tables in original['input_tables']]
+
+    assert parser.dedup_stats['files'] == 3 and parser.dedup_stats['unique_files'] == 2
+    # The DATA step shared by a.sas and other.sas is parsed once
+    assert parser.dedup_stats['reused_blocks'] == 1
+    data_steps = results[results['block_type'] == 'DATA']
+    assert all(tables == ['src.orders'] for tables in data_steps['input_tables'])
+    stats = results[(results['file_name'] == "other.sas") & (results['block_type'] == 'PROC')].iloc[0]
+    assert stats['input_tables'] == ['src.sales'] and stats['output_tables'] == ['out.stats']
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for include_resolver.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from include_resolver import IncludeResolver
+
+FILES = {
+    "main.sas": """%let root = common;
+filename macros "lib";
+%include "common/setup.sas";
+%include macros(helpers);
+%include "C:\\old\\unique.sas";
+%include "/folders/myfolders/util.sas" / source2;
+%include "&undefined/x.sas";
+%include nosuch;
+data out.t; set &lib..t; run;
+""",
+    "common/setup.sas": """%let lib = stage;
+%include "loop.sas";
+""",
+    "common/loop.sas": """%include "setup.sas";
+""",
+    "lib/helpers.sas": """%put helpers;
+""",
+    "lib/unique.sas": """%put unique;
+""",
+    "team_a/util.sas": """%put a;
+""",
+    "team_b/util.sas": """%put b;
+""",
+}
+
+
+def make_corpus(tmp_path):
+    for name, text in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    # The corpus root and its subfolders are all search directories
+    return [str(tmp_path)] + [str(path) for path in sorted(tmp_path.iterdir()) if path.is_dir()]
+
+
+def test_include_statuses(tmp_path):
+    resolver = IncludeResolver(make_corpus(tmp_path))
+    rows = resolver.resolve_file(str(tmp_path / "main.sas"))
+    edges = {edge['target']: edge for edge in resolver.includes}
+
+    assert edges['"common/setup.sas"']['status'] == 'resolved'
+    assert edges['"loop.sas"']['depth'] == 2
+    assert edges['"setup.sas"']['status'] == 'cycle'
+    assert os.path.samefile(edges['macros(helpers)']['resolved_path'], tmp_path / "lib" / "helpers.sas")
+    assert edges['"&undefined/x.sas"']['status'] == 'unresolved_variable'
+    assert edges['nosuch']['status'] == 'unknown_fileref'
+
+    # A path from another machine falls back to a unique file name ...
+    unique = edges['"C:\\old\\unique.sas"']
+    assert unique['status'] == 'resolved'
+    assert os.path.samefile(unique['resolved_path'], tmp_path / "lib" / "unique.sas")
+    # ... but is not guessed when the name exists in several places
+    util = edges['"/folders/myfolders/util.sas"']
+    assert util['status'] == 'ambiguous' and util['resolved_path'] is None
+    assert util['candidates'] == ", ".join(sorted([str(tmp_path / "team_a" / "util.sas"),
+                                                   str(tmp_path / "team_b" / "util.sas")]))
+
+    # Included code runs in the session: &lib was set by common/setup.sas
+    assert 'set stage.t;' in [row['resolved_statement'] for row in rows]
+
+
+def test_parse_cache_is_shared(tmp_path):
+    resolver = IncludeResolver(make_corpus(tmp_path))
+    resolver.resolve_file(str(tmp_path / "main.sas"))
+    parsed = resolver.cache_stats['parsed']
+    resolver.reset()
+    resolver.resolve_file(str(tmp_path / "main.sas"))
+    assert resolver.cache_stats['parsed'] == parsed and resolver.cache_stats['reused'] >= parsed
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for index_advisor.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from index_advisor import IndexAdvisor, key_terms
+
+
+def workload(tmp_path, program):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    advisor = IndexAdvisor()
+    advisor.add_file(str(path))
+    return {key: dict(entry['uses']) for key, entry in advisor.workload.items()}
+
+
+def test_key_terms():
+    assert key_terms("a = 1 and (b = 2 or c = 3)") == [('a = 1', True), ('b = 2', False), ('c = 3', False)]
+    assert key_terms("x between 1 and 5 and y = 'p and q'") == [("x between 1 and 5 and y = 'p and q'", True)]
+
+
+def test_and_is_composite_or_is_simple(tmp_path):
+    keys = workload(tmp_path, """data a; set dw.sales; where region = 'N' and year = 2024; run;
+data b; set dw.sales(where=(region = 'S' or store = 7)); run;
+""")
+    assert keys[('dw.sales', ('region', 'year'))] == {'where': 1}
+    assert keys[('dw.sales', ('region',))] == {'where': 1}
+    assert keys[('dw.sales', ('store',))] == {'where': 1}
+    assert ('dw.sales', ('region', 'store')) not in keys
+
+
+def test_merge_where_and_descending_by(tmp_path):
+    keys = workload(tmp_path, """data m; merge dw.a dw.b(where=(flag = 1)); by id descending dt; where amount > 0; run;
+""")
+    assert keys[('dw.a', ('id', 'descending dt'))] == {'merge_by': 1}
+    assert keys[('dw.b', ('flag',))] == {'where': 1}
+    assert not any(columns == ('amount',) for _, columns in keys)
+
+
+def test_sql_join_and_where(tmp_path):
+    keys = workload(tmp_path, """proc sql;
+  create table x as select * from dw.orders o join dw.customers c
+    on o.cust_id = c.cust_id and o.region = c.region
+    where o.status = 'open' or c.segment = 'B';
+quit;
+""")
+    assert keys[('dw.orders', ('cust_id', 'region'))] == {'join': 1}
+    assert keys[('dw.orders', ('status',))] == {'where': 1}
+    assert keys[('dw.customers', ('segment',))] == {'where': 1}
+
+
+def test_recommendations(tmp_path):
+    path = tmp_path / 'prog.sas'
+    path.write_text("proc sort data=dw.sales out=s; by descending amount; run;\n"
+                    "data a; set dw.sales; where region = 'N' and year = 2024; run;\n")
+    advisor = IndexAdvisor()
+    advisor.add_file(str(path))
+    df = advisor.recommendations().set_index('key_columns')
+    assert df.loc['region, year', 'recommendation'].startswith('composite index on (region, year)')
+    assert 'sorted by descending amount' in df.loc['descending amount', 'recommendation']
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for macro_index.py
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from macro_index import MacroIndex
+
+LIBRARY = """%macro load(table);
+  data work.&table; set src.&table; run;
+%mend load;
+%macro report;
+  proc print data=work.x; run;
+%mend report;
+"""
+OTHER_LIBRARY = """%macro report;
+  proc means data=work.x; run;
+%mend report;
+"""
+PROGRAM = """%load(orders);
+%macro load(table);
+  data work.&table; set stage.&table; run;
+%mend load;
+%load(customers);
+%macro load(table);
+  %put reloading &table;
+%mend load;
+%macro driver;
+  %load(returns);
+  %report;
+%mend driver;
+%driver;
+%missing_macro(1);
+%let x = %sysfunc(today());
+"""
+
+
+def build(tmp_path):
+    index = MacroIndex()
+    for name, text in (("library.sas", LIBRARY), ("other.sas", OTHER_LIBRARY), ("program.sas", PROGRAM)):
+        path = tmp_path / name
+        path.write_text(text)
+        index.add_file(str(path))
+    return index
+
+
+def test_resolution(tmp_path):
+    index = build(tmp_path)
+    program = str(tmp_path / "program.sas")
+    calls = index.resolved_calls()
+    calls = calls[calls['file'] == program].sort_values('line_number')
+    rows = {}
+    for row in calls.to_dict('records'):
+        rows.setdefault(row['macro_name'].lower(), []).append(row)
+    first, second = sorted(d['start_line'] for d in index.definitions['load'] if d['file'] == program)
+
+    # Builtins are not calls, and each call site is listed once
+    assert sorted(rows) == ['driver', 'load', 'missing_macro', 'report']
+
+    # Same-file definitions win: the last one compiled before the call, else the first
+    before, between, inside = rows['load']
+    assert {before['status'], between['status'], inside['status']} == {'resolved_local'}
+    assert (before['definition_line'], between['definition_line'], inside['definition_line']) == (first, first, second)
+    assert inside['candidate_definitions'] == 2 and inside['caller'] == 'driver'
+    assert pd.isna(before['caller'])
+
+    report, = rows['report']
+    assert report['status'] == 'ambiguous' and report['candidate_definitions'] == 2
+    driver, = rows['driver']
+    assert driver['status'] == 'resolved_local' and pd.isna(driver['caller'])
+    assert rows['missing_macro'][0]['status'] == 'unresolved'
+
+
+def test_call_graph(tmp_path):
+    graph = build(tmp_path).call_graph()
+    edges = {(row['caller'], row['callee'], row['status']) for row in graph.to_dict('records')}
+    assert ('driver', 'load', 'resolved_local') in edges
+    assert ('<program.sas>', 'driver', 'resolved_local') in edges
+    assert ('<program.sas>', 'missing_macro', 'unresolved') in edges
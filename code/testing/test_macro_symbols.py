@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for macro_symbols.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from macro_symbols import MacroVariableResolver, SymbolTable, split_arguments
+
+
+def test_nested_scopes():
+    symbols = SymbolTable()
+    symbols.assign('lib', 'prod')
+    symbols.push('outer')
+    symbols.declare('local', ['lib'])
+    symbols.assign('lib', 'dev')
+    symbols.push('inner')
+    # Updates the nearest scope holding the variable, otherwise creates it innermost
+    symbols.assign('lib', 'test')
+    symbols.assign('tmp', 'x')
+    assert symbols.resolve('&lib..t &tmp') == ('test.t x', ())
+    symbols.pop()
+    assert symbols.resolve('&lib..t &tmp') == ('test.t &tmp', ('tmp',))
+    symbols.pop()
+    assert symbols.resolve('&lib..t') == ('prod.t', ())
+    symbols.declare('global', ['run_date'])
+    assert symbols.lookup('RUN_DATE') == ''
+
+
+def test_indirect_references():
+    symbols = SymbolTable()
+    for name, value in (('n', '2'), ('ds1', 'sales'), ('ds2', 'returns'), ('i', '1'), ('which', 'ds')):
+        symbols.assign(name, value)
+    assert symbols.resolve('&&ds&i') == ('sales', ())
+    # The second rescan consumes another dot
+    assert symbols.resolve('&&ds&n..sas7bdat') == ('returnssas7bdat', ())
+    assert symbols.resolve('&&ds&n...sas7bdat') == ('returns.sas7bdat', ())
+    assert symbols.resolve('&&&which&n') == ('returns', ())
+    assert symbols.resolve('&&ds&missing') == ('&ds&missing', ('ds', 'missing'))
+
+
+def test_cycles_are_reported():
+    symbols = SymbolTable()
+    symbols.assign('a', '&b')
+    symbols.assign('b', 'x&a')
+    text, unresolved = symbols.resolve('value=&a')
+    assert text == 'value=x&a' and unresolved == ('a',)
+    assert symbols.cycles == {'a'}
+
+
+def test_memo_follows_the_symbol_table_version():
+    symbols = SymbolTable()
+    symbols.assign('lib', 'prod')
+    before = symbols.version
+    assert symbols.resolve('&lib..t')[0] == 'prod.t'
+    symbols.assign('lib', 'prod')
+    assert symbols.version == before
+
+    symbols.push('m')
+    symbols.declare('local', ['lib'])
+    symbols.assign('lib', 'dev')
+    assert symbols.resolve('&lib..t')[0] == 'dev.t'
+    symbols.pop()
+    # Back in the caller's state: the earlier entry applies again
+    assert symbols.version == before and (before, '&lib..t') in symbols._memo
+    assert symbols.resolve('&lib..t')[0] == 'prod.t'
+
+    # A macro assigning an existing global variable changes the caller's state
+    symbols.push('m')
+    symbols.assign('lib', 'uat')
+    symbols.pop()
+    assert symbols.version != before
+    assert symbols.resolve('&lib..t')[0] == 'uat.t'
+
+
+def test_split_arguments():
+    assert split_arguments("a, b=%str(x,y), c='1,2'") == ['a', 'b=%str(x,y)', "c='1,2'"]
+
+
+def test_resolver_binds_macro_parameters(tmp_path):
+    path = tmp_path / "prog.sas"
+    path.write_text("""%let lib = stage;
+%macro load(table, src=raw);
+  data &lib..&table; set &src..&table; run;
+%mend load;
+%load(orders, src=ext);
+data out.copy; set &lib..orders; run;
+""")
+    rows = MacroVariableResolver().resolve_file(str(path))
+    resolved = [row['resolved_statement'] for row in rows]
+    assert 'data stage.orders;' in resolved and 'set ext.orders;' in resolved
+    scopes = {row['resolved_statement']: row['scope'] for row in rows}
+    assert scopes['set ext.orders;'] == 'load' and scopes['set stage.orders;'] == 'GLOBAL'
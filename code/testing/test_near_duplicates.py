@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for near_duplicates.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from near_duplicates import NearDuplicateFinder, normalize_statement
+
+PROGRAM = """data work.a; set src.orders; where year = 2023; run;
+proc sort data=work.a; by id; run;
+proc means data=work.a; var amount; output out=work.s sum=total; run;
+data out.summary; set work.s; label total='Total'; run;
+proc print data=out.summary; run;
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_normalize_statement():
+    assert normalize_statement("WHERE  Year = 2023 and name='Bob'") == "where year = 0 and name='?'"
+
+
+def test_copies_cluster_and_empty_programs_are_skipped(tmp_path):
+    finder = NearDuplicateFinder(include_macros=False)
+    finder.add_file(write(tmp_path, "a.sas", PROGRAM))
+    finder.add_file(write(tmp_path, "b.sas", PROGRAM.replace("2023", "2024").upper()))
+    finder.add_file(write(tmp_path, "c.sas", "proc datasets lib=work kill; run; %put done;"))
+    finder.add_file(write(tmp_path, "empty.sas", ""))
+    finder.add_file(write(tmp_path, "comments.sas", "/* nothing here */\n* retired job;\n"))
+
+    assert [item['item'] for item in finder.items] == [str(tmp_path / name) for name in ("a.sas", "b.sas", "c.sas")]
+    clusters = finder.clusters()
+    assert len(clusters) == 1
+    assert {finder.items[i]['item'] for i, _ in clusters[0]} == {str(tmp_path / "a.sas"), str(tmp_path / "b.sas")}
+
+
+def test_all_pairs_in_a_bucket_are_compared():
+    # 2 bands of 2 rows: all three share band 0, only b and c are similar enough
+    finder = NearDuplicateFinder(threshold=0.75, num_perm=4)
+    assert (finder.bands, finder.rows) == (2, 2)
+    for name, signature in (("a", [1, 1, 8, 9]), ("b", [1, 1, 5, 6]), ("c", [1, 1, 5, 7])):
+        finder.items.append({'item': name, 'kind': 'program', 'file': name, 'statements': 4})
+        finder.signatures.append(np.array(signature, dtype=np.uint64))
+
+    clusters = finder.clusters()
+    assert [sorted(finder.items[i]['item'] for i, _ in cluster) for cluster in clusters] == [["b", "c"]]
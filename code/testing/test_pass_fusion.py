@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for pass_fusion.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pass_fusion import PassFusionAdvisor
+
+
+def chains(tmp_path, program):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    return PassFusionAdvisor().analyze_file(str(path))
+
+
+def test_data_step_chain(tmp_path):
+    (row,) = chains(tmp_path, """data a; set dw.raw; x = 1; run;
+data b; set a; y = 2; run;
+data c; set b; z = 3; run;
+proc print data=c; run;
+""")
+    assert row['steps'] == 'DATA -> DATA -> DATA'
+    assert row['chain'] == 'dw.raw -> work.a -> work.b'
+    assert row['passes_saved'] == 4
+
+
+def test_view_for_analysis_proc(tmp_path):
+    (row,) = chains(tmp_path, "data a; set dw.raw; run;\nproc means data=a; var x; run;\n")
+    assert row['steps'] == 'DATA -> PROC MEANS' and 'view=work.a' in row['recommendation']
+
+
+def test_report_procs_and_shared_tables_are_not_fused(tmp_path):
+    assert chains(tmp_path, "data a; set dw.raw; run;\nproc print data=a; run;\n") == []
+    assert chains(tmp_path, "data a; set dw.raw; run;\nproc sort data=a; by x; run;\n") == []
+    # Two readers: the intermediate is needed twice
+    assert chains(tmp_path, "data a; set dw.raw; run;\ndata b; set a; run;\ndata c; set a; run;\n") == []
+    # Random access needs the stored table
+    assert chains(tmp_path, "data a; set dw.raw; run;\ndata b; set a nobs=n; run;\n") == []
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for repeated_reads.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from repeated_reads import ReadCounter, analyze
+
+FIRST = """data work.a; set dw.sales; run;
+proc means data=dw.sales; run;
+proc sql; create table work.b as select * from dw.sales s join dw.stores t on s.id = t.id; quit;
+data work.c; set work.a sashelp.class &lib..sales; run;
+"""
+SECOND = """proc freq data=dw.sales; run;
+proc print data=dw.stores; run;
+"""
+
+
+def write_programs(tmp_path):
+    (tmp_path / 'first.sas').write_text(FIRST)
+    (tmp_path / 'second.sas').write_text(SECOND)
+    flow = tmp_path / 'nightly.flow'
+    flow.write_text("# nightly run\nfirst.sas\nsecond.sas  # reports\nmissing.sas\n")
+    return flow
+
+
+def test_counts_permanent_reads_only(tmp_path):
+    write_programs(tmp_path)
+    reads = ReadCounter().count_file(str(tmp_path / 'first.sas'))
+    assert sorted(reads) == ['dw.sales', 'dw.stores']
+    assert [step for _, step in reads['dw.sales']] == ['DATA', 'PROC MEANS', 'PROC SQL']
+
+
+def test_program_and_flow_rows(tmp_path):
+    flow = write_programs(tmp_path)
+    df = analyze(str(tmp_path / '*.sas'), flows=[str(flow)], min_passes=3)
+
+    program = df[df['scope'] == 'program']
+    assert program[['table', 'passes']].values.tolist() == [['dw.sales', 3]]
+
+    flow_rows = df[df['scope'] == 'flow'].set_index('table')
+    assert flow_rows.loc['dw.sales', 'passes'] == 4 and flow_rows.loc['dw.sales', 'programs'] == 2
+    assert 'dw.stores' not in flow_rows.index
+    assert 'PROMOTE' in flow_rows.loc['dw.sales', 'recommendation']
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for sas_steps.py and the database libref lookup in db_hotspots.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_hotspots import database_librefs
+from sas_steps import StepGrouper, dataset_option, normalize_table, parse_by, parse_dataset_list
+
+
+def steps_of(program):
+    grouper = StepGrouper()
+    return grouper.group(grouper.analyzer.split_sas_statements(program), 'prog.sas')
+
+
+def test_normalize_table():
+    assert normalize_table(' Sales ') == 'work.sales'
+    assert normalize_table('ORA.Orders') == 'ora.orders'
+    assert normalize_table('_NULL_') == '_null_'
+    assert normalize_table('&lib..tbl') == '&lib..tbl'
+
+
+def test_parse_dataset_list():
+    datasets = parse_dataset_list("a(keep=x where=(y>1)) lib.b(in=inb) end=eof nobs=n, c;")
+    assert datasets == [('a', 'keep=x where=(y>1)'), ('lib.b', 'in=inb'), ('c', '')]
+    assert parse_dataset_list("&lib..t(where=(d > '01jan2020'd))") == [('&lib..t', "where=(d > '01jan2020'd)")]
+
+
+def test_dataset_option():
+    options = "keep=id amount where=(amount > (select 1)) rename=(a=b) obs=10"
+    assert dataset_option(options, 'where') == 'amount > (select 1)'
+    assert dataset_option(options, 'keep') == 'id amount'
+    assert dataset_option(options, 'rename') == 'a=b'
+    assert dataset_option(options, 'obs') == '10'
+    assert dataset_option(options, 'drop') is None
+
+
+def test_parse_by():
+    assert parse_by("region descending amount notsorted") == [('region', False), ('amount', True)]
+
+
+def test_data_and_proc_steps():
+    steps = steps_of("""data work.big(compress=yes) _null_;
+  set ora.sales(where=(year=2024)) end=eof;
+  by region;
+  where amount > 0;
+run;
+proc sort; by descending amount; run;
+proc print data=work.big(obs=5); run;
+""")
+    data, sort, report = steps
+    assert [ref['table'] for ref in data['outputs']] == ['work.big']
+    assert data['outputs'][0]['options'] == 'compress=yes'
+    assert [(ref['table'], ref['role']) for ref in data['inputs']] == [('ora.sales', 'set')]
+    assert data['by'] == [('region', False)] and data['where'] == ['amount > 0']
+
+    # PROC SORT without DATA= reads _LAST_ and sorts it in place
+    assert sort['inputs'][0]['name'] == '_last_' and sort['inputs'][0]['table'] == 'work.big'
+    assert sort['outputs'][0]['table'] == 'work.big' and sort['by'] == [('amount', True)]
+    assert report['inputs'][0]['options'] == 'obs=5'
+
+
+def test_last_skips_null_and_no_data_procs():
+    steps = steps_of("""data work.a; x = 1; run;
+data _null_; set work.a; run;
+proc datasets lib=work; run;
+proc means; run;
+""")
+    assert steps[2]['inputs'] == []
+    assert steps[3]['inputs'][0]['table'] == 'work.a'
+
+
+def test_sql_tables_integration():
+    (step,) = steps_of("""proc sql;
+  create table work.summary as
+    select region, sum(amount) as total from ora.sales s
+    inner join ref.regions r on s.region = r.region
+    group by region;
+  select * from dictionary.columns;
+quit;
+""")
+    assert sorted(ref['table'] for ref in step['inputs']) == ['ora.sales', 'ref.regions']
+    assert [ref['table'] for ref in step['outputs']] == ['work.summary']
+    assert len(step['queries']) == 2 and step['queries'][1]['inputs'] == []
+
+
+def test_database_librefs_use_the_registry(tmp_path):
+    (tmp_path / 'setup.sas').write_text("libname ora oracle user=x;\nlibname snow snowflake server=y;\n"
+                                        "libname loc '/data';\nlibname ora clear;\n")
+    assert database_librefs(str(tmp_path / '*.sas')) == {'ora': 'oracle', 'snow': 'snowflake'}
+
+
+def test_notsorted_by_is_flagged():
+    grouped, summary = steps_of("data b; set a; by region notsorted; run;\nproc means data=b; by region; run;\n")
+    assert grouped['by'] == [('region', False)] and grouped['by_notsorted']
+    assert not summary['by_notsorted']
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for sort_advisor.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sort_advisor import SortAdvisor, is_prefix
+
+
+def advise(tmp_path, program, sizes=None):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    return SortAdvisor(sizes).analyze_file(str(path))
+
+
+def test_is_prefix():
+    order = (('region', False), ('amount', True))
+    assert is_prefix((('region', False),), order)
+    assert not is_prefix((('amount', True),), order)
+    assert not is_prefix((), order)
+
+
+def test_sort_on_data_already_in_order(tmp_path):
+    findings = advise(tmp_path, """proc sort data=dw.sales out=sales; by region amount; run;
+data sales2; set sales; where amount > 0; run;
+proc sort data=sales2; by region; run;
+proc sort data=sales2 nodupkey; by region; run;
+""")
+    assert [(f['finding'], f['line_number'], f['table']) for f in findings] == [('redundant_sort', 3, 'work.sales2')]
+    assert 'line 1' in findings[0]['detail']
+
+
+def test_other_writes_clear_the_order(tmp_path):
+    findings = advise(tmp_path, """proc sort data=dw.sales out=sales; by region; run;
+data sales; set sales dw.extra; run;
+proc sort data=sales; by region; run;
+proc sql; create table ranked as select * from dw.sales order by region, amount desc; quit;
+proc sort data=ranked; by region descending amount; run;
+""")
+    assert [(f['finding'], f['line_number']) for f in findings] == [('redundant_sort', 5)]
+
+
+def test_notsorted_by_neither_sets_nor_needs_an_order(tmp_path):
+    findings = advise(tmp_path, """data grouped; set dw.sales; by region notsorted; run;
+proc sort data=grouped; by region; run;
+data runs; merge grouped dw.stores; by region notsorted; run;
+""")
+    assert findings == []
+
+
+def test_merge_after_presorts_becomes_join(tmp_path):
+    findings = advise(tmp_path, """proc sort data=dw.sales out=sales; by store_id; run;
+proc sort data=dw.stores out=stores; by store_id; run;
+data both;
+  merge sales(in=a) stores(in=b);
+  by store_id;
+  if a and b;
+run;
+""")
+    (merge,) = findings
+    assert merge['finding'] == 'merge_to_join' and merge['line_number'] == 3
+    assert merge['table'] == 'work.sales, work.stores' and merge['by_keys'] == 'store_id'
+    assert 'INNER JOIN' in merge['recommendation'] and 'removes 2 PROC SORT' in merge['recommendation']
+    assert 'line(s) 1, 2' in merge['detail']
+
+
+def test_merge_with_known_sizes_suggests_hash(tmp_path):
+    sizes = {'work.sales': {'rows': 10_000_000}, 'work.stores': {'rows': 500}}
+    findings = advise(tmp_path, """data both;
+  merge sales(in=a) stores;
+  by store_id;
+  if a;
+run;
+""", sizes)
+    (merge,) = findings
+    assert merge['recommendation'].startswith('Load work.stores (500 rows) into a hash object')
+    assert 'no sort seen for work.sales, work.stores' in merge['detail']
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for SASAnalyzer.split_sas_statements
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from claudeCode import SASAnalyzer
+
+PROGRAM = """data work.ae;
+  set raw.ae;
+run;
+
+proc sort
+  data=ae;
+  by usubjid;
+run;
+libname stage '/data/stage'
+proc print data=stage.ae(obs=5); run;
+%setup
+data work.x; put 'multi
+data line'; run;
+"""
+
+
+def test_keyword_line_without_semicolon_is_not_duplicated():
+    statements = SASAnalyzer().split_sas_statements(PROGRAM)
+    texts = [stmt for stmt, _ in statements]
+    assert 'proc sort' not in texts
+    assert 'proc sort   data=ae;' in texts
+    assert texts.count('%setup') == 1
+    assert "put 'multi data line';" in texts
+
+
+def test_start_lines():
+    statements = dict(SASAnalyzer().split_sas_statements(PROGRAM))
+    assert statements['data work.ae;'] == 1
+    assert statements['set raw.ae;'] == 2
+    assert statements['proc sort   data=ae;'] == 5
+    assert statements['by usubjid;'] == 7
+    assert statements['%setup'] == 11
+    assert statements["put 'multi data line';"] == 12
+
+
+def test_keyword_inside_parentheses_continues_the_statement():
+    statements = SASAnalyzer().split_sas_statements("proc sql;\n  select * from a where (\n"
+                                                    "    data > 1\n    or id = 2\n  );\nquit;\n")
+    assert [line for _, line in statements] == [1, 2, 6]
+    assert statements[1][0].startswith('select * from a where (')
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for table_index.py and the SASAnalyzer table outputs it indexes
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from claudeCode import SASAnalyzer
+from table_index import IndexReader, TableIndex, _decode_varints, _encode_varint, build_index
+
+PROGRAM = """libname ora oracle user=x;
+data work.staging;
+  set ora.sales ora.sales_2023;
+run;
+data work.joined;
+  merge work.staging(in=a) ref.regions;
+  by region;
+run;
+proc append base=ora.sales_hist data=work.joined; run;
+proc sql;
+  insert into ora.audit select * from work.joined;
+  create table work.summary as select region, count(*) as n from ora.sales group by region;
+quit;
+"""
+
+
+def write_program(tmp_path, name="prog.sas", text=PROGRAM):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_analyzer_table_types(tmp_path):
+    results = SASAnalyzer().extract_sas_info(write_program(tmp_path))
+    inputs = {(row['type'], row['table']) for row in results['input_tables'].to_dict('records')}
+    outputs = {(row['type'], row['table']) for row in results['output_tables'].to_dict('records')}
+
+    # SET and MERGE statements are reported under their own keyword only
+    assert ('SET', 'ora.sales') in inputs and ('SET', 'ora.sales_2023') in inputs
+    assert ('MERGE', 'ref.regions') in inputs
+    assert ('MERGE', 'ora.sales') not in inputs and ('SET', 'ref.regions') not in inputs
+    assert ('PROC_APPEND', 'ora.sales_hist') in outputs
+    assert ('INSERT_INTO', 'ora.audit') in outputs
+    assert ('CREATE_TABLE', 'work.summary') in outputs
+
+
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 300, 16384, 2 ** 31 + 5]
+    encoded = bytearray()
+    for value in values:
+        _encode_varint(value, encoded)
+    assert list(_decode_varints(bytes(encoded))) == values
+
+
+def test_index_round_trip(tmp_path):
+    index = TableIndex()
+    for file_id in range(3):
+        index.add('table', 'ORA.Sales', f'p{file_id}.sas', 10 + file_id, 'read')
+    index.add('table', 'ora.sales_hist', 'p9.sas', None, 'append')
+    index.add('macro', 'load', 'p1.sas', 4, 'define')
+    path = str(tmp_path / "t.idx")
+    index.save(path)
+
+    reader = IndexReader(path)
+    assert reader.query('ora.sales') == [('table:ora.sales', (f'p{i}.sas', 10 + i, 'read')) for i in range(3)]
+    assert reader.query('ora.sales_hist') == [('table:ora.sales_hist', ('p9.sas', 0, 'append'))]
+    assert reader.query('load', kind='macro') == [('macro:load', ('p1.sas', 4, 'define'))]
+    assert reader.query('ora.missing') == []
+
+
+def test_prefix_and_wildcard_queries(tmp_path):
+    path = str(tmp_path / "t.idx")
+    build_index(write_program(tmp_path), path)
+    reader = IndexReader(path)
+
+    assert reader.matching_terms('table', 'ora.sales*') == ['table:ora.sales', 'table:ora.sales_2023',
+                                                             'table:ora.sales_hist']
+    assert reader.matching_terms('table', '*.joined') == ['table:work.joined']
+    # One-level names are WORK tables
+    assert reader.matching_terms('table', 'staging') == ['table:work.staging']
+    roles = {posting[2] for _, posting in reader.query('ora.*', roles=['append'])}
+    assert roles == {'append'}
+    assert {term for term, _ in reader.query('ora.*', roles=['append'])} == {'table:ora.sales_hist', 'table:ora.audit'}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for where_advisor.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sas_steps import StepGrouper
+from where_advisor import WhereAdvisor, advise, computed_variables
+
+
+def first_step(program):
+    grouper = StepGrouper()
+    return grouper.group(grouper.analyzer.split_sas_statements(program), 'prog.sas')[0]
+
+
+def advice(tmp_path, program):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    return WhereAdvisor(db_librefs={'ora'}).analyze_file(str(path))
+
+
+def test_candidate():
+    assert WhereAdvisor._candidate("if age > 18;") == ('age > 18', 'age > 18')
+    assert WhereAdvisor._candidate("if sex='F' then delete;") == ("sex='F'", "not (sex='F')")
+    assert WhereAdvisor._candidate("if x then y = 1;") is None
+    assert WhereAdvisor._candidate("x = 1;") is None
+
+
+def test_computed_variables():
+    step = first_step("""data out;
+  set in(in=ina) end=eof;
+  length grade $2;
+  retain total 0;
+  array scores{3} s1-s3;
+  bmi = weight / height**2;
+  if bmi > 30 then flag = 1;
+run;
+""")
+    assert computed_variables(step) == {'ina', 'eof', 'grade', 'total', 'scores', 'bmi', 'flag'}
+
+
+def test_if_delete_row_keeps_the_original_statement(tmp_path):
+    (row,) = advice(tmp_path, "data women; set ora.dm; if sex='F' then delete; run;\n")
+    assert row['if_statement'] == "if sex='F' then delete;"
+    assert row['where'] == "not (sex='F')"
+    assert "where not (sex='F');" in row['recommendation'] and 'passed to the database' in row['recommendation']
+
+
+def test_exclusions(tmp_path):
+    # Computed variable, step-only value, MERGE input and parallel SET statements
+    assert advice(tmp_path, "data a; set b; bmi = w / h; if bmi > 30; run;\n") == []
+    assert advice(tmp_path, "data a; set b; if _n_ > 10; run;\n") == []
+    assert advice(tmp_path, "data a; merge b c; by id; if x > 1; run;\n") == []
+    assert advice(tmp_path, "data a; set b; set c; if x > 1; run;\n") == []
+    (row,) = advice(tmp_path, "data a; set b; retain n; if x > 1; run;\n")
+    assert row['caveats'] == 'RETAIN'
+
+
+def test_advise_finds_database_librefs(tmp_path):
+    (tmp_path / 'setup.sas').write_text("libname dw snowflake server=x;\nlibname dw clear;\n")
+    (tmp_path / 'prog.sas').write_text("data a; set dw.orders; if status = 'open'; run;\n")
+    df = advise(str(tmp_path / '*.sas'))
+    assert 'passed to the database for dw.orders' in df.loc[0, 'recommendation']
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for work_footprint.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from work_footprint import WorkFootprint
+
+SIZES = {'dw.sales': {'rows': 1000, 'bytes': 1000}, 'dw.stores': {'rows': 10, 'bytes': 100}}
+
+
+def footprint(tmp_path, program):
+    path = tmp_path / 'prog.sas'
+    path.write_text(program)
+    return WorkFootprint(SIZES).analyze_file(str(path))
+
+
+def test_peak_and_drop_candidates(tmp_path):
+    summary, timeline = footprint(tmp_path, """data a; set dw.sales; run;
+data b; set a; run;
+data c; merge b dw.stores; by id; run;
+proc print data=c; run;
+""")
+    assert [row['work_bytes'] for row in timeline] == [1000, 2000, 3000, 3000]
+    assert summary['peak_bytes'] == 3000 and summary['peak_line'] == 3
+    assert summary['peak_if_dropped_after_last_read'] == 2000
+    assert summary['drop_candidates'] == 'work.a, work.b'
+
+
+def test_proc_delete_removes_every_listed_table(tmp_path):
+    _, timeline = footprint(tmp_path, """data a; set dw.sales; run;
+data b; set dw.sales; run;
+data c; set dw.stores; run;
+proc delete data=a work.b; run;
+data d; set c; run;
+""")
+    assert [row['work_tables'] for row in timeline] == [1, 2, 3, 1, 2]
+
+
+def test_proc_datasets_kill_and_delete(tmp_path):
+    _, timeline = footprint(tmp_path, """data a; set dw.sales; run;
+data b; set dw.stores; run;
+proc datasets library=work nolist; delete a; run;
+proc datasets lib=perm; delete b; run;
+proc datasets library=work
+  nolist kill;
+run;
+""")
+    assert [row['work_tables'] for row in timeline] == [1, 2, 1, 1, 0]
+
+
+def test_sql_drop_table_removes_tables(tmp_path):
+    _, timeline = footprint(tmp_path, """data a; set dw.sales; run;
+data b; set dw.stores; run;
+proc sql;
+  create table tmp as select * from a;
+  create table c as select * from tmp;
+  drop table a, work.tmp;
+  drop table b;
+  create table b as select * from c;
+quit;
+data d; set c; run;
+""")
+    # c and the rebuilt b remain; a and tmp are gone after the SQL step
+    assert [row['work_tables'] for row in timeline] == [1, 2, 2, 3]
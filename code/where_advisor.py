@@ -0,0 +1,195 @@
+import argparse
+import glob
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from libref_registry import LibrefRegistry
+from sas_steps import StepGrouper, dataset_option, libref_of, load_table_sizes
+from sql_parser import tokenize
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SUBSETTING_IF_RE = re.compile(r'^\s*if\b(?!.*\bthen)(.*?);?\s*$', re.IGNORECASE | re.DOTALL)
+IF_DELETE_RE = re.compile(r'^\s*if\b(.*)\bthen\s+delete\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+ASSIGNMENT_RE = re.compile(r'(?:^|\bthen\b|\belse\b|\bdo\b)\s*([A-Za-z_]\w*)\s*(?:\{[^}]*\}|\[[^\]]*\])?\s*(?:=|\+)(?!=)',
+                           re.IGNORECASE)
+DECLARED_VARS_RE = re.compile(r'^\s*(?:retain|array|input|length)\s+([A-Za-z_]\w*)', re.IGNORECASE)
+SET_VARIABLE_OPTIONS_RE = re.compile(r'\b(?:in|end|nobs|point|curobs|indsname)\s*=\s*(\w+)', re.IGNORECASE)
+
+# Words in a condition that are operators, not variables
+OPERATOR_WORDS = {'and', 'or', 'not', 'in', 'eq', 'ne', 'gt', 'lt', 'ge', 'le', 'is', 'null', 'missing', 'between',
+                  'like', 'contains', 'sounds'}
+# Values that only exist while the DATA step runs, so WHERE cannot see them
+STEP_ONLY_RE = re.compile(r'\b(?:_n_|_error_|_iorc_|lag\d*|dif\d*)\b|\b(?:first|last)\.', re.IGNORECASE)
+# Statements whose result depends on which rows reach them
+ORDER_SENSITIVE = [
+    ('_N_', re.compile(r'\b_n_\b', re.IGNORECASE)),
+    ('LAG/DIF', re.compile(r'\b(?:lag|dif)\d*\s*\(', re.IGNORECASE)),
+    ('RETAIN', re.compile(r'^\s*retain\b', re.IGNORECASE)),
+    ('sum statement', re.compile(r'^\s*[A-Za-z_]\w*\s*\+\s*[^=;]+;?\s*$')),
+    ('OUTPUT', re.compile(r'^\s*output\b', re.IGNORECASE)),
+    ('PUT', re.compile(r'^\s*put\b', re.IGNORECASE)),
+    ('FIRST./LAST.', re.compile(r'\b(?:first|last)\.', re.IGNORECASE)),
+]
+
+
+def condition_variables(condition: str) -> Set[str]:
+    """Variable names in a SAS expression: names that are not functions, operators or literals."""
+    tokens = tokenize(condition)
+    variables = set()
+    for i, (kind, value) in enumerate(tokens):
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind != 'name' or following == '(' or value.lower() in OPERATOR_WORDS or value.startswith(('&', '%')):
+            continue
+        variables.add(value.lower())
+    return variables
+
+
+def computed_variables(step: Dict) -> Set[str]:
+    """Variables the step assigns, declares, reads from raw input or creates through SET options."""
+    computed = set()
+    for stmt, _ in step['statements']:
+        if re.match(r'^\s*(?:data|set|merge|where)\b', stmt, re.IGNORECASE):
+            computed.update(name.lower() for name in SET_VARIABLE_OPTIONS_RE.findall(stmt))
+            continue
+        computed.update(name.lower() for name in ASSIGNMENT_RE.findall(stmt))
+        declared = DECLARED_VARS_RE.match(stmt)
+        if declared:
+            keyword = stmt.strip().split(None, 1)[0].lower()
+            body = stmt.strip()[len(keyword):]
+            names = re.findall(r'\b([A-Za-z_]\w*)\b', re.sub(r'\([^)]*\)|\{[^}]*\}|\$|\d+\.?\d*', ' ', body))
+            computed.update(name.lower() for name in (names if keyword != 'array' else names[:1]))
+    for ref in step['inputs']:
+        computed.update(name.lower() for name in SET_VARIABLE_OPTIONS_RE.findall(ref['options']))
+    return computed
+
+
+class WhereAdvisor:
+    """
+    Finds subsetting IFs ('if x > 1;' and 'if x > 1 then delete;') in DATA steps
+    that read their data with SET only, where every variable in the condition
+    comes from the input datasets. Such an IF can become a WHERE statement, which
+    filters rows as they are read (and lets indexes or the database do the work)
+    instead of loading every observation into the program data vector.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None, db_librefs: Optional[Set[str]] = None):
+        self.sizes = sizes or {}
+        self.db_librefs = db_librefs or set()
+        self.grouper = StepGrouper()
+
+    def analyze_file(self, filepath: str) -> List[Dict]:
+        rows = []
+        for step in self.grouper.file_steps(filepath):
+            if step['kind'] != 'DATA' or not step['inputs'] or any(ref['role'] != 'set' for ref in step['inputs']):
+                continue
+            if sum(1 for stmt, _ in step['statements'] if re.match(r'^\s*set\b', stmt, re.IGNORECASE)) > 1:
+                # Several SET statements read in parallel; a WHERE would apply to each of them
+                continue
+            computed = computed_variables(step)
+            for index, (stmt, line) in enumerate(step['statements']):
+                candidate = self._candidate(stmt)
+                if candidate is None:
+                    continue
+                condition, where = candidate
+                variables = condition_variables(condition)
+                if not variables or variables & computed or STEP_ONLY_RE.search(condition):
+                    continue
+                caveats = [name for name, pattern in ORDER_SENSITIVE
+                           if any(pattern.search(before) for before, _ in step['statements'][:index])]
+                rows.append(self._row(filepath, step, stmt, line, condition, where, variables, caveats))
+        return rows
+
+    @staticmethod
+    def _candidate(stmt: str):
+        """(IF condition, equivalent WHERE condition) for a subsetting IF, else None."""
+        delete = IF_DELETE_RE.match(stmt)
+        if delete:
+            condition = delete.group(1).strip()
+            return condition, f"not ({condition})"
+        subset = SUBSETTING_IF_RE.match(stmt)
+        if subset and subset.group(1).strip():
+            condition = subset.group(1).strip()
+            return condition, condition
+        return None
+
+    def _row(self, filepath, step, stmt, line, condition, where, variables, caveats) -> Dict:
+        tables = list(dict.fromkeys(ref['table'] for ref in step['inputs']))
+        known = [self.sizes[table] for table in tables if table in self.sizes]
+        existing = step['where'] + [dataset_option(ref['options'], 'where') for ref in step['inputs']
+                                    if dataset_option(ref['options'], 'where')]
+        db_inputs = [table for table in tables if libref_of(table) in self.db_librefs]
+        recommendation = f"Replace the IF with 'where {where};'"
+        if existing:
+            recommendation += ", combined with the existing WHERE using AND"
+        if db_inputs:
+            recommendation += f"; the WHERE is passed to the database for {', '.join(db_inputs)}"
+        return {
+            'file': filepath,
+            'line_number': step['start_line'],
+            'if_line': line,
+            'input_tables': ', '.join(tables),
+            'if_statement': stmt.strip(),
+            'condition': condition,
+            'where': where,
+            'variables': ', '.join(sorted(variables)),
+            'est_rows': sum(size['rows'] or 0 for size in known) if known else None,
+            'est_bytes': sum(size['bytes'] or 0 for size in known) if known else None,
+            'caveats': ', '.join(caveats),
+            'recommendation': recommendation,
+        }
+
+
+def advise(pattern: str, sizes_file: Optional[str] = None) -> pd.DataFrame:
+    sas_files = glob.glob(pattern, recursive=True)
+    registry = LibrefRegistry()
+    analyzer = StepGrouper().analyzer
+    for sas_file in sas_files:
+        text, _ = analyzer.load_sas_file(sas_file)
+        registry.add_libnames(text, sas_file, db_only=True, clears=False)
+
+    advisor = WhereAdvisor(load_table_sizes(sizes_file), set(registry))
+    rows = []
+    for sas_file in sas_files:
+        try:
+            rows.extend(advisor.analyze_file(sas_file))
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df['_known'] = df['est_bytes'].notna()
+    df = df.sort_values(['_known', 'est_bytes'], ascending=False).drop(columns='_known')
+    return df.reset_index(drop=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Find subsetting IFs that could be WHERE clauses")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='where_advice.xlsx')
+    args = parser.parse_args(argv)
+
+    df = advise(args.pattern, args.sizes)
+    if df.empty:
+        print("No subsetting IF can be turned into a WHERE")
+        return df
+
+    df.to_excel(args.output, index=False)
+    print("\n=== SUBSETTING IF -> WHERE ===")
+    for _, row in df.head(20).iterrows():
+        size = f" ({row['est_bytes'] / 1e9:.2f} GB)" if pd.notna(row['est_bytes']) else ''
+        print(f"  {os.path.basename(row['file'])}:{row['if_line']} {row['input_tables']}{size}: "
+              f"{row['if_statement']} -> where {row['where']};")
+    print(f"\nDetails written to {args.output}")
+    return df
+
+
+if __name__ == "__main__":
+    main()
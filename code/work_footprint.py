@@ -0,0 +1,229 @@
+import argparse
+import bisect
+import glob
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import extractor_path  # noqa: F401
+from catalog_scanner import format_bytes
+from sas_steps import StepGrouper, libref_of, load_table_sizes, normalize_table, parse_dataset_list
+from sql_parser import parse_sql
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# PROCs whose OUT= holds statistics or counts, far smaller than their input
+AGGREGATE_PROCS = {'MEANS', 'SUMMARY', 'FREQ', 'TABULATE', 'UNIVARIATE', 'CORR', 'REG', 'LOGISTIC', 'GLM',
+                   'CONTENTS', 'COMPARE', 'NPAR1WAY', 'TTEST'}
+DELETE_STMT_RE = re.compile(r'^\s*delete\s+([^;/]*)', re.IGNORECASE)
+LIBRARY_RE = re.compile(r'\b(?:library|lib)\s*=\s*(\w+)', re.IGNORECASE)
+KILL_RE = re.compile(r'\bkill\b', re.IGNORECASE)
+DATA_OPTION_RE = re.compile(r'\bdata\s*=\s*', re.IGNORECASE)
+
+
+class WorkFootprint:
+    """
+    Walks the steps of a program in order and keeps the set of WORK tables that
+    exist after each step: tables appear when a step writes them, are replaced
+    when rewritten (old and new copies coexist while the step runs) and leave on
+    PROC DELETE, PROC DATASETS DELETE or KILL and PROC SQL DROP TABLE. Sizes come
+    from the sizes file or are derived from the step inputs. The same walk with every table dropped after
+    its last read gives the smallest footprint the program could have.
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Dict]] = None):
+        self.sizes = sizes or {}
+        self.grouper = StepGrouper()
+
+    def analyze_file(self, filepath: str) -> Tuple[Dict, List[Dict]]:
+        steps = self.grouper.file_steps(filepath)
+        events = self._events(steps)
+        estimates: Dict[str, Optional[int]] = {}
+        actual: Dict[str, Optional[int]] = {}      # WORK tables on disk, as the program is written
+        minimal: Dict[str, Optional[int]] = {}     # the same, with tables dropped after their last read
+        timeline, unknown = [], set()
+        peak = {'bytes': -1, 'step': None, 'tables': []}
+        peak_key = (-1, -1)
+        peak_minimal = 0
+
+        for index, step in enumerate(steps):
+            deleted = self._deleted_tables(step, actual)
+            written = {} if step['proc'] in ('DELETE', 'DATASETS') else {
+                ref['table']: self._estimate(ref['table'], step, estimates)
+                for ref in step['outputs'] if libref_of(ref['table']) == 'work' and ref['table'] != 'work._null_'}
+            for table, size in written.items():
+                estimates[table] = size
+                if size is None:
+                    unknown.add(table)
+
+            # While the step runs, replaced tables still exist next to their new versions
+            running = self._total(actual) + self._total(written)
+            running_minimal = self._total(minimal) + self._total(written)
+            # Without sizes, the step with the most WORK tables on disk stands in for the peak
+            tables = set(actual) | set(written)
+            if (running, len(tables)) > peak_key:
+                peak_key = (running, len(tables))
+                peak = {'bytes': running, 'step': step, 'tables': sorted(tables)}
+            peak_minimal = max(peak_minimal, running_minimal)
+
+            actual.update(written)
+            minimal.update(written)
+            for table in deleted or []:
+                actual.pop(table, None)
+                minimal.pop(table, None)
+            for table in list(minimal):
+                if not self._read_later(events.get(table, []), index):
+                    del minimal[table]
+
+            timeline.append({
+                'file': filepath,
+                'line_number': step['start_line'],
+                'step': f"PROC {step['proc']}" if step['proc'] else 'DATA',
+                'work_tables': len(actual),
+                'work_bytes': running,
+                'work_bytes_if_dropped': running_minimal,
+            })
+
+        kept_after_last_read = [table for table in peak['tables']
+                                if peak['step'] is not None
+                                and not self._read_later(events.get(table, []), peak['step']['step_id'])]
+        summary = {
+            'file': filepath,
+            'steps': len(steps),
+            'work_tables': len(estimates),
+            'peak_bytes': max(peak['bytes'], 0),
+            'peak_line': peak['step']['start_line'] if peak['step'] else None,
+            'peak_step': timeline[peak['step']['step_id']]['step'] if peak['step'] else None,
+            'tables_at_peak': ', '.join(peak['tables']),
+            'peak_table_count': len(peak['tables']),
+            'peak_if_dropped_after_last_read': peak_minimal,
+            'drop_candidates': ', '.join(kept_after_last_read),
+            'unknown_size_tables': ', '.join(sorted(unknown)),
+        }
+        return summary, timeline
+
+    @staticmethod
+    def _events(steps) -> Dict[str, List[Tuple[int, str]]]:
+        """table -> [(step index, 'r' or 'w')]; a step reading and writing a table counts as a read."""
+        events = defaultdict(list)
+        for index, step in enumerate(steps):
+            reads = {ref['table'] for ref in step['inputs']}
+            for table in reads:
+                events[table].append((index, 'r'))
+            for table in {ref['table'] for ref in step['outputs']} - reads:
+                events[table].append((index, 'w'))
+        return events
+
+    @staticmethod
+    def _read_later(table_events: List[Tuple[int, str]], index: int) -> bool:
+        """True when the next event after step 'index' reads the current version of the table."""
+        position = bisect.bisect_right(table_events, (index, 'w'))
+        return position < len(table_events) and table_events[position][1] == 'r'
+
+    @staticmethod
+    def _deleted_tables(step, actual) -> Optional[List[str]]:
+        """Tables removed by PROC DELETE / PROC DATASETS / SQL DROP TABLE, or None for any other step."""
+        if step['proc'] == 'SQL':
+            # Only tables the step does not create again after dropping them
+            dropped = {}
+            for query in step['queries']:
+                for statement in parse_sql(query['text']):
+                    if statement['statement'] == 'drop table':
+                        dropped.update((normalize_table(name), True) for name in statement['targets'])
+                dropped.update((ref['table'], False) for ref in query['outputs'])
+            return [table for table, is_dropped in dropped.items() if is_dropped]
+        if step['proc'] not in ('DELETE', 'DATASETS'):
+            return None
+        library = LIBRARY_RE.search(step['statements'][0][0])
+        libref = library.group(1).lower() if library else 'work'
+        deleted = []
+        if step['proc'] == 'DELETE':
+            # proc delete [lib=x] data=a b c;
+            for stmt, _ in step['statements']:
+                for match in DATA_OPTION_RE.finditer(stmt):
+                    deleted.extend(normalize_table(name if '.' in name else f"{libref}.{name}")
+                                   for name, _ in parse_dataset_list(stmt[match.end():]))
+            return deleted
+        if libref != 'work':
+            return []
+        if any(KILL_RE.search(stmt) for stmt, _ in step['statements'] if not DELETE_STMT_RE.match(stmt)):
+            return list(actual)
+        for stmt, _ in step['statements']:
+            match = DELETE_STMT_RE.match(stmt)
+            if match:
+                deleted.extend(normalize_table(name) for name in match.group(1).split())
+        return deleted
+
+    def _estimate(self, table, step, estimates) -> Optional[int]:
+        if table in self.sizes and self.sizes[table].get('bytes') is not None:
+            return self.sizes[table]['bytes']
+        if step['proc'] in AGGREGATE_PROCS:
+            return 0
+        inputs = {ref['table'] for ref in step['inputs']}
+        if not inputs:
+            return None
+        sizes = [estimates.get(name) if libref_of(name) == 'work' else self.sizes.get(name, {}).get('bytes')
+                 for name in inputs]
+        if any(size is None for size in sizes):
+            return None
+        joined = step['proc'] == 'SQL' or any(ref['role'] in ('merge', 'update') for ref in step['inputs'])
+        # Concatenation adds the inputs up; a join or merge is taken to be as large as its largest input
+        return max(sizes) if joined else sum(sizes)
+
+    @staticmethod
+    def _total(tables: Dict[str, Optional[int]]) -> int:
+        return sum(size for size in tables.values() if size)
+
+
+def analyze(pattern: str, sizes_file: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    footprint = WorkFootprint(load_table_sizes(sizes_file))
+    summaries, timelines = [], []
+    for sas_file in glob.glob(pattern, recursive=True):
+        try:
+            summary, timeline = footprint.analyze_file(sas_file)
+        except Exception as e:
+            logger.error(f"Failed to analyze {sas_file}: {str(e)}")
+            continue
+        summaries.append(summary)
+        timelines.extend(timeline)
+    summary_df = pd.DataFrame(summaries)
+    if not summary_df.empty:
+        summary_df = summary_df.sort_values(['peak_bytes', 'peak_table_count'], ascending=False).reset_index(drop=True)
+    return summary_df, pd.DataFrame(timelines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Estimate the peak WORK library footprint of each program")
+    parser.add_argument('pattern', nargs='?', default='../data/**/*.sas', help="Glob of SAS files")
+    parser.add_argument('--sizes', help="Table sizes (catalog_scanner output or CSV with table, rows, bytes)")
+    parser.add_argument('--output', default='work_footprint.xlsx')
+    args = parser.parse_args(argv)
+
+    summary, timeline = analyze(args.pattern, args.sizes)
+    if summary.empty:
+        print("No SAS programs found")
+        return summary
+
+    with pd.ExcelWriter(args.output) as writer:
+        summary.to_excel(writer, sheet_name='programs', index=False)
+        timeline.to_excel(writer, sheet_name='timeline', index=False)
+    print("\n=== PEAK WORK FOOTPRINT ===")
+    for _, row in summary.head(20).iterrows():
+        known = row['peak_bytes'] or not row['unknown_size_tables']
+        line = int(row['peak_line']) if pd.notna(row['peak_line']) else '-'
+        peak = format_bytes(row['peak_bytes']) if known else 'unknown'
+        dropped = format_bytes(row['peak_if_dropped_after_last_read']) if known else 'unknown'
+        print(f"  {os.path.basename(row['file']):<40} peak {peak:>10} "
+              f"({row['peak_table_count']} tables) at line {line} ({row['peak_step']}), {dropped} "
+              f"if tables are dropped after their last read")
+    print(f"\nDetails written to {args.output}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()